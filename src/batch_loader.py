@@ -0,0 +1,77 @@
+"""
+Load many glossary repositories in parallel across a process pool.
+"""
+import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from models import GlossaryEntry, GlossaryManager
+from parse_cache import pack_entries, unpack_entries
+
+
+class LoadResult(NamedTuple):
+  base_dir: str
+  glossary: Optional[GlossaryManager]  # None if loading failed; lines skipped in its load_errors
+  error: Optional[str]
+
+
+class _CollectingHandler(logging.Handler):
+  """Keep the messages of warnings logged while loading, to report them as the error."""
+
+  def __init__(self):
+    super().__init__(logging.WARNING)
+    self.messages: List[str] = []
+
+  def emit(self, record: logging.LogRecord) -> None:
+    self.messages.append(record.getMessage())
+
+
+# Entries as sent back by a worker: packed with their count when possible
+_Transfer = Union[Tuple[str, int], Dict[str, GlossaryEntry]]
+
+
+def _load_entries(base_dir: str, use_cache: bool) -> Tuple[_Transfer, List[Tuple[int, str, str]]]:
+  """Load one repository in a worker process and return its entries and load errors."""
+  manager = GlossaryManager(base_dir)
+  handler = _CollectingHandler()
+  manager.logger.addHandler(handler)
+  try:
+    if not manager.load(use_cache=use_cache):
+      raise RuntimeError("; ".join(handler.messages) or "Loading failed")
+  finally:
+    manager.logger.removeHandler(handler)
+  packed = pack_entries(manager.entries)
+  transfer = dict(manager.entries) if packed is None else (packed, len(manager.entries))
+  return transfer, manager.load_errors
+
+
+def load_many(base_dirs: Iterable[str], max_workers: Optional[int] = None,
+              use_cache: bool = True, compact: bool = False) -> Iterator[LoadResult]:
+  """Load glossary repositories concurrently.
+
+  Args:
+      base_dirs: Directories holding the glossary files
+      max_workers: Number of worker processes, default one per CPU
+      use_cache: Let the workers use and refresh the parse cache
+      compact: Build the glossaries with a ColumnarEntryStore
+
+  Yields:
+      One result per directory, in the order the loads finish; a failed
+      load carries the reason instead of a glossary, the malformed lines of
+      a successful one are in the load_errors of its glossary
+  """
+  with ProcessPoolExecutor(max_workers) as pool:
+    futures = {pool.submit(_load_entries, str(base_dir), use_cache): str(base_dir)
+               for base_dir in base_dirs}
+    for future in as_completed(futures):
+      base_dir = futures[future]
+      try:
+        transfer, load_errors = future.result()
+        entries = unpack_entries(*transfer) if isinstance(transfer, tuple) else transfer
+      except Exception as e:
+        yield LoadResult(base_dir, None, str(e) or type(e).__name__)
+        continue
+      glossary = GlossaryManager(base_dir, compact=compact)
+      glossary.adopt_entries(entries)
+      glossary.load_errors = load_errors
+      yield LoadResult(base_dir, glossary, None)
@@ -0,0 +1,525 @@
+"""
+Performance benchmarks for the glossary model and list view.
+
+Run from the ``src`` directory::
+
+    python benchmark.py parser load --sizes 1000 100000 --json run.json
+    python benchmark.py --compare run.json
+
+Every benchmark runs on a synthetic glossary (see synthetic_glossary.py)
+and reports a flat dict of metrics; --json writes them in machine-readable
+form and --compare prints the ratio to a previous run. Benchmarks that need
+PyQt6 are reported as skipped when it is not installed.
+"""
+import argparse
+import csv
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from batch_loader import load_many
+from bulk_import import import_file
+from entry_store import ColumnarEntryStore
+from fuzzy_search import FuzzySearchIndex
+from glossary_merge import GlossaryMerger
+from glossary_validator import EntryValidator, check_entry
+from models import GlossaryManager
+from nomenclature_parser import parse_many
+from search_index import SubstringIndex
+from symbol_index import DuplicateIndex
+from synthetic_glossary import generate_entries, synthetic_lines, write_glossary
+from usage_scanner import scan_usage
+
+
+class BenchmarkSkipped(Exception):
+  """Raised by a benchmark that cannot run in this environment."""
+
+
+def legacy_parse_line(line: str) -> tuple[str, str, str, str]:
+  """Character-by-character parser that GlossaryManager used before the scanner, kept as baseline."""
+  if not line.startswith(r'\NomenclaturEntry'):
+    raise ValueError("Line does not start with \\NomenclaturEntry")
+
+  line = line[len(r'\NomenclaturEntry'):].strip()
+
+  if line.startswith('{}'):
+    line = line[2:].lstrip()
+  elif not line.startswith('{'):
+    raise ValueError("Invalid format: missing opening brace")
+
+  args = []
+  current = []
+  in_braces = 0
+
+  for char in line:
+    if char == '{':
+      if in_braces > 0:
+        current.append(char)
+      in_braces += 1
+    elif char == '}':
+      in_braces -= 1
+      if in_braces == 0:
+        args.append(''.join(current))
+        current = []
+      else:
+        current.append(char)
+    elif in_braces > 0:
+      current.append(char)
+
+    if len(args) == 4:
+      break
+
+  if len(args) != 4:
+    raise ValueError(f"Expected 4 arguments, got {len(args)}")
+
+  return tuple(args)
+
+
+def _timed(func: Callable[[], object]) -> float:
+  start = time.perf_counter()
+  func()
+  return time.perf_counter() - start
+
+
+def bench_parser(size: int) -> Dict[str, float]:
+  """Compare lines per second of the legacy parser and the scanner."""
+  lines = synthetic_lines(size)
+
+  def legacy():
+    entries = {}
+    for line in lines:
+      hash_name, symbol, description, sort_key = legacy_parse_line(line.strip())
+      entries[hash_name] = {'symbol': symbol, 'description': description, 'sort_key': sort_key}
+
+  def parse_lines():
+    parse = manager._parse_line
+    for line in stripped:
+      parse(line)
+
+  stripped = [line.strip() for line in lines]
+  legacy_time = _timed(legacy)
+  scanner_time = _timed(lambda: parse_many(lines))
+  with tempfile.TemporaryDirectory() as tmpdir:
+    manager = GlossaryManager(tmpdir)
+    parse_line_time = _timed(parse_lines)
+  return {
+          'legacy_lines_per_s' : size / legacy_time,
+          'scanner_lines_per_s': size / scanner_time,
+          'speedup'            : legacy_time / scanner_time,
+          'parse_line_us'      : parse_line_time / size * 1e6,
+          }
+
+
+def bench_load(size: int) -> Dict[str, float]:
+  """Time GlossaryManager.load without the parse cache, buffered and memory-mapped."""
+  with tempfile.TemporaryDirectory() as tmpdir:
+    write_glossary(Path(tmpdir), size)
+    buffered_time = _timed(lambda: GlossaryManager(tmpdir).load(use_cache=False))
+    mmap_time = _timed(lambda: GlossaryManager(tmpdir).load(use_mmap=True, use_cache=False))
+  return {
+          'load_s'       : buffered_time,
+          'load_mmap_s'  : mmap_time,
+          'entries_per_s': size / buffered_time,
+          }
+
+
+def bench_save(size: int) -> Dict[str, float]:
+  """Time a full save of every file and an incremental save after one edit."""
+  entries = generate_entries(size)
+  with tempfile.TemporaryDirectory() as tmpdir:
+    manager = GlossaryManager(tmpdir)
+    for hash_name, entry in entries.items():
+      manager.set_entry(hash_name, entry['symbol'], entry['description'], entry['sort_key'])
+    full_time = _timed(manager.save)
+
+    hash_name = next(iter(entries))
+    manager.set_entry(hash_name, entries[hash_name]['symbol'], "edited", entries[hash_name]['sort_key'])
+    incremental_time = _timed(manager.save)
+  return {
+          'full_save_s'       : full_time,
+          'incremental_save_s': incremental_time,
+          }
+
+
+def bench_cache(size: int) -> Dict[str, float]:
+  """Compare a cold load (parse and fill the cache) with a warm load from the cache."""
+  with tempfile.TemporaryDirectory() as tmpdir:
+    write_glossary(Path(tmpdir), size)
+    cold_time = _timed(lambda: GlossaryManager(tmpdir).load())
+    warm_time = _timed(lambda: GlossaryManager(tmpdir).load())
+    uncached_time = _timed(lambda: GlossaryManager(tmpdir).load(use_cache=False))
+  return {
+          'uncached_s': uncached_time,
+          'cold_s'    : cold_time,
+          'warm_s'    : warm_time,
+          'speedup'   : uncached_time / warm_time,
+          }
+
+
+MULTILOAD_REPOSITORIES = 8
+
+
+def bench_multiload(size: int) -> Dict[str, float]:
+  """Compare loading several repositories of ``size`` entries one after another and in a process pool."""
+  with tempfile.TemporaryDirectory() as tmpdir:
+    base_dirs = []
+    for i in range(MULTILOAD_REPOSITORIES):
+      base_dir = Path(tmpdir) / f"repo{i}"
+      base_dir.mkdir()
+      write_glossary(base_dir, size, seed=i)
+      base_dirs.append(str(base_dir))
+
+    def serial():
+      for base_dir in base_dirs:
+        GlossaryManager(base_dir).load(use_cache=False)
+
+    serial_time = _timed(serial)
+    parallel_time = _timed(lambda: list(load_many(base_dirs, use_cache=False)))
+  return {
+          'serial_s'  : serial_time,
+          'parallel_s': parallel_time,
+          'speedup'   : serial_time / parallel_time,
+          'cpus'      : os.cpu_count() or 1,
+          }
+
+
+def bench_import(size: int) -> Dict[str, float]:
+  """Import ``size`` csv rows into an empty glossary, saved once at the end."""
+  entries = generate_entries(size)
+  with tempfile.TemporaryDirectory() as tmpdir:
+    rows = Path(tmpdir) / 'rows.csv'
+    with rows.open('w', newline='') as f:
+      writer = csv.writer(f)
+      writer.writerow(('hash_name', 'symbol', 'description', 'sort_key'))
+      writer.writerows((hash_name, *entry.values()) for hash_name, entry in entries.items())
+    glossary_dir = Path(tmpdir) / 'glossary'
+    glossary_dir.mkdir()
+    import_time = _timed(lambda: import_file(GlossaryManager(glossary_dir), rows))
+  return {
+          'import_s'  : import_time,
+          'rows_per_s': size / import_time,
+          }
+
+
+MERGE_SOURCES = 8
+
+
+def bench_merge(size: int) -> Dict[str, float]:
+  """Merge MERGE_SOURCES glossaries of ``size`` entries sharing most hash names."""
+  sources = [generate_entries(size, seed=i) for i in range(MERGE_SOURCES)]
+
+  def merge():
+    merger = GlossaryMerger([str(i) for i in range(MERGE_SOURCES)])
+    for i, entries in enumerate(sources):
+      merger.add(i, entries)
+    return merger.result()
+
+  merge_time = _timed(merge)
+  return {
+          'merge_s'      : merge_time,
+          'entries_per_s': size * MERGE_SOURCES / merge_time,
+          'conflicts'    : len(merge().conflicts),
+          }
+
+
+def bench_duplicates(size: int) -> Dict[str, float]:
+  """Build the reverse symbol index, update it entry by entry and report the duplicates."""
+  entries = generate_entries(size)
+  build_time = _timed(lambda: DuplicateIndex(entries))
+  index = DuplicateIndex(entries)
+  names = list(entries)[:1000]
+
+  def update():
+    for hash_name in names:
+      index.set(hash_name, {'symbol': 'T', 'description': 'edited'})
+
+  update_time = _timed(update)
+  return {
+          'build_s'  : build_time,
+          'update_us': update_time / len(names) * 1e6,
+          'report_ms': _timed(index.duplicates) * 1e3,
+          }
+
+
+def bench_validate(size: int) -> Dict[str, float]:
+  """Validate every entry uncached, after a reload from the cache of results, and after one edit."""
+  entries = generate_entries(size)
+  validator = EntryValidator()
+  first_time = _timed(lambda: validator.validate(entries))
+  reload_time = _timed(lambda: validator.validate(dict(entries)))
+  hash_name = next(iter(entries))
+  entries[hash_name] = {**entries[hash_name], 'description': 'edited {'}
+  edit_time = _timed(lambda: validator.validate(entries, [hash_name]))
+  return {
+          'checks_per_s': size / _timed(lambda: [check_entry(*item) for item in entries.items()]),
+          'full_s'      : first_time,
+          'reload_s'    : reload_time,
+          'edit_us'     : edit_time * 1e6,
+          }
+
+
+USAGE_FILES = 200
+USAGE_LINES = 500
+
+
+def bench_usage(size: int) -> Dict[str, float]:
+  """Scan a synthetic document of USAGE_FILES files for the macros of ``size`` entries."""
+  names = sorted(generate_entries(size))
+  rng = random.Random(0)
+  with tempfile.TemporaryDirectory() as tmpdir:
+    for i in range(USAGE_FILES):
+      lines = (f"The \\{rng.choice(names)} over $\\hat{{\\{rng.choice(names)}}}$ text text text\n"
+               for _ in range(USAGE_LINES))
+      (Path(tmpdir) / f"chapter{i}.tex").write_text("".join(lines))
+
+    megabytes = sum(path.stat().st_size for path in Path(tmpdir).iterdir()) / 1e6
+    serial_time = _timed(lambda: scan_usage(names, [tmpdir], max_workers=1))
+    parallel_time = _timed(lambda: scan_usage(names, [tmpdir]))
+  return {
+          'serial_s'   : serial_time,
+          'parallel_s' : parallel_time,
+          'serial_MB_s': megabytes / serial_time,
+          'cpus'       : os.cpu_count() or 1,
+          }
+
+
+def _retained_bytes(build: Callable[[], object]) -> int:
+  """Bytes still allocated after ``build`` returns, while its result is alive."""
+  tracemalloc.start()
+  result = build()
+  retained, _ = tracemalloc.get_traced_memory()
+  tracemalloc.stop()
+  del result
+  return retained
+
+
+def bench_store(size: int) -> Dict[str, float]:
+  """Compare memory and lookup time of the dict store and ColumnarEntryStore."""
+  lines = synthetic_lines(size)
+  dict_bytes = _retained_bytes(lambda: parse_many(lines))
+  columnar_bytes = _retained_bytes(lambda: ColumnarEntryStore(parse_many(lines)))
+
+  entries = parse_many(lines)
+  store = ColumnarEntryStore(entries)
+  keys = random.Random(0).sample(list(entries), min(size, 100_000))
+
+  def lookups(mapping):
+    for key in keys:
+      mapping[key]['symbol']
+
+  return {
+          'dict_bytes_per_entry'    : dict_bytes / size,
+          'columnar_bytes_per_entry': columnar_bytes / size,
+          'dict_lookup_us'          : _timed(lambda: lookups(entries)) / len(keys) * 1e6,
+          'columnar_lookup_us'      : _timed(lambda: lookups(store)) / len(keys) * 1e6,
+          }
+
+
+def _keystrokes(keys: List[str]) -> List[str]:
+  """Queries as typed, character by character, when looking up a few of ``keys``."""
+  targets = random.Random(0).sample(keys, min(len(keys), 5))
+  return [target[:end] for target in targets for end in range(1, len(target) + 1)]
+
+
+def bench_search(size: int) -> Dict[str, float]:
+  """Per-keystroke latency of the SubstringIndex against the former linear scan."""
+  keys = sorted(generate_entries(size))
+  queries = _keystrokes(keys)
+  build_time = _timed(lambda: SubstringIndex(keys))
+  index = SubstringIndex(keys)
+
+  def latencies(search) -> List[float]:
+    return [_timed(lambda: search(query)) for query in queries]
+
+  def linear(query):
+    query = query.lower()
+    return [row for row, key in enumerate(keys) if query in key.lower()]
+
+  indexed, scanned = latencies(index.search), latencies(linear)
+  return {
+          'build_ms'       : build_time * 1e3,
+          'indexed_mean_ms': sum(indexed) / len(indexed) * 1e3,
+          'indexed_max_ms' : max(indexed) * 1e3,
+          'linear_mean_ms' : sum(scanned) / len(scanned) * 1e3,
+          'linear_max_ms'  : max(scanned) * 1e3,
+          }
+
+
+FUZZY_QUERIES = ['t', 'temp', 'temperature', 'tempreature', 'pressure 12', 'hat', 'unit 7', 'zzz']
+
+
+def bench_fuzzy(size: int) -> Dict[str, float]:
+  """Build time of the FuzzySearchIndex, query latency for the top 50, and incremental updates."""
+  entries = generate_entries(size)
+  index = None
+
+  def build():
+    nonlocal index
+    index = FuzzySearchIndex(entries)
+
+  build_time = _timed(build)
+  latencies = [_timed(lambda: index.search(query, 50)) for query in FUZZY_QUERIES]
+  updated = list(entries.items())[:100]
+  update_time = _timed(lambda: [index.add(hash_name, entry) for hash_name, entry in updated])
+  return {
+          'build_s'      : build_time,
+          'query_mean_ms': sum(latencies) / len(latencies) * 1e3,
+          'query_max_ms' : max(latencies) * 1e3,
+          'update_100_ms': update_time * 1e3,
+          }
+
+
+CLI_RUNS = 5
+
+
+def _process_ms(args: List[str]) -> float:
+  """Median wall time of running a command in a fresh Python process."""
+  def run():
+    subprocess.run([sys.executable, *args], cwd=Path(__file__).parent, check=True, stdout=subprocess.DEVNULL)
+  return statistics.median(_timed(run) for _ in range(CLI_RUNS)) * 1e3
+
+
+def bench_cli(size: int) -> Dict[str, float]:
+  """Cold-start time of glossary_cli.py subcommands, each run in a new process."""
+  with tempfile.TemporaryDirectory() as tmpdir:
+    write_glossary(Path(tmpdir), size)
+    hash_name = next(iter(generate_entries(1)))
+    python_ms = _process_ms(['-c', 'pass'])
+    return {
+            'python_ms'         : python_ms,
+            'help_ms'           : _process_ms(['glossary_cli.py', '--help']),
+            'lookup_uncached_ms': _process_ms(['glossary_cli.py', '--no-cache', 'lookup', tmpdir, hash_name]),
+            'lookup_ms'         : _process_ms(['glossary_cli.py', 'lookup', tmpdir, hash_name]),
+            'regenerate_ms'     : _process_ms(['glossary_cli.py', 'regenerate', tmpdir]),
+            }
+
+
+def _qt_application():
+  """Return the QApplication, creating an offscreen one if needed."""
+  os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+  try:
+    from PyQt6.QtWidgets import QApplication
+  except ImportError as e:
+    raise BenchmarkSkipped(f"PyQt6 is not available: {e}") from e
+  return QApplication.instance() or QApplication([])
+
+
+FILTER_QUERIES = ['t', 'temp', 'pressure1', 'velocity12', 'zzz', '']
+
+
+def bench_listview(size: int) -> Dict[str, float]:
+  """Time the first and a repeated opening of the list view and the average filter_items call."""
+  app = _qt_application()
+  from listview_impl import UI_ListView
+  from macro_list_model import MacroListModel
+
+  glossary = GlossaryManager(Path(tempfile.gettempdir()))
+  glossary.adopt_entries(generate_entries(size))
+  view = UI_ListView()
+  model = MacroListModel()
+
+  def open_list():
+    model.sync(glossary)
+    view.open_model(model)
+
+  build_time = _timed(open_list)
+  app.processEvents()
+  view.close()
+  reopen_time = _timed(open_list)
+  app.processEvents()
+
+  def filter_all():
+    for query in FILTER_QUERIES:
+      view.filter_items(query)
+
+  filter_time = _timed(filter_all)
+  view.close()
+  return {
+          'build_s'  : build_time,
+          'reopen_ms': reopen_time * 1e3,
+          'filter_ms': filter_time / len(FILTER_QUERIES) * 1e3,
+          }
+
+
+BENCHMARKS: Dict[str, Callable[[int], Dict[str, float]]] = {
+        'parser'    : bench_parser,
+        'load'      : bench_load,
+        'save'      : bench_save,
+        'cache'     : bench_cache,
+        'multiload' : bench_multiload,
+        'import'    : bench_import,
+        'merge'     : bench_merge,
+        'duplicates': bench_duplicates,
+        'validate'  : bench_validate,
+        'usage'     : bench_usage,
+        'store'     : bench_store,
+        'search'    : bench_search,
+        'fuzzy'     : bench_fuzzy,
+        'cli'       : bench_cli,
+        'listview'  : bench_listview,
+        }
+
+
+def _compare(results: List[dict], baseline_path: Path) -> None:
+  """Print the ratio of every metric to the same metric in a previous run."""
+  baseline = {(record['benchmark'], record['size']): record.get('metrics', {})
+              for record in json.loads(baseline_path.read_text())['results']}
+  for record in results:
+    previous = baseline.get((record['benchmark'], record['size']))
+    if not previous or 'metrics' not in record:
+      continue
+    ratios = "  ".join(f"{key}={value / previous[key]:.2f}x"
+                       for key, value in record['metrics'].items() if previous.get(key))
+    print(f"{record['benchmark']:<10} n={record['size']:<9,} vs baseline: {ratios}")
+
+
+def run(names: List[str], sizes: List[int]) -> List[dict]:
+  """Run benchmarks and return one record per benchmark and size."""
+  results = []
+  for name in names:
+    for size in sizes:
+      record = {'benchmark': name, 'size': size}
+      try:
+        record['metrics'] = BENCHMARKS[name](size)
+        values = "  ".join(f"{key}={value:,.2f}" for key, value in record['metrics'].items())
+      except BenchmarkSkipped as e:
+        record['skipped'] = str(e)
+        values = f"skipped: {e}"
+      print(f"{name:<10} n={size:<9,} {values}")
+      results.append(record)
+  return results
+
+
+def main(argv=None) -> None:
+  arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+  arg_parser.add_argument('benchmarks', nargs='*', choices=list(BENCHMARKS))
+  arg_parser.add_argument('--sizes', nargs='+', type=int, default=[1_000, 10_000, 100_000])
+  arg_parser.add_argument('--json', type=Path, help="write the results to this file")
+  arg_parser.add_argument('--compare', type=Path, help="compare with the results in this file")
+  args = arg_parser.parse_args(argv)
+  logging.getLogger('models').setLevel(logging.WARNING)
+
+  results = run(args.benchmarks or list(BENCHMARKS), args.sizes)
+  if args.json:
+    args.json.write_text(json.dumps({
+            'python'   : platform.python_version(),
+            'machine'  : platform.machine(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'results'  : results,
+            }, indent=2))
+  if args.compare:
+    _compare(results, args.compare)
+
+
+if __name__ == "__main__":
+  main()
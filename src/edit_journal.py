@@ -0,0 +1,324 @@
+"""
+Append-only journal of the edits made to a glossary, with undo and redo.
+
+Every edit is appended to the journal next to the glossary, one json line
+holding the entries before and after it, before it is applied. The .tex
+files are the checkpoint: compact() saves the glossary and starts the
+journal again with a base record, the fingerprint of nomenclature.tex the
+following records apply to. After a crash, recover() replays the journal
+onto the glossary loaded from the .tex files. Records hold whole entries
+rather than differences, so replaying edits that were already saved changes
+nothing. Edits made to nomenclature.tex by other tools are not journaled:
+when the file no longer matches the base record, recover() only replays
+if every journaled entry is still in a state the journal knows.
+"""
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from models import GlossaryEntry, GlossaryManager
+from parse_cache import fingerprint
+
+# Kinds of records: an edit and a redo apply the entries after the change, an
+# undo those before; a rebase applies entries changed outside the journal and
+# starts a new history
+EDIT, UNDO, REDO, REBASE = 'edit', 'undo', 'redo', 'rebase'
+# Kind of the first record, holding the digest of nomenclature.tex
+BASE = 'base'
+
+
+@dataclass
+class Change:
+  # hash name -> (entry before, entry after), None where there was or is no entry
+  steps: Dict[str, Tuple[Optional[GlossaryEntry], Optional[GlossaryEntry]]]
+
+  def states(self, after: bool) -> Dict[str, Optional[GlossaryEntry]]:
+    """The entries after the change, or before it."""
+    return {hash_name: step[after] for hash_name, step in self.steps.items()}
+
+
+class JournalConflict(Exception):
+  """Raised by recover() when nomenclature.tex changed journaled entries since the journal started."""
+
+  def __init__(self, hash_names: List[str]):
+    super().__init__(f"Changed outside the editor: {', '.join(hash_names)}")
+    self.hash_names = hash_names
+
+
+class EditJournal:
+  """Record the edits of a glossary so that they can be undone, redone and recovered.
+
+  Undo and redo apply the entries of one change, whatever the size of the
+  glossary or the length of the history. The history lasts until the
+  editor closes; after a crash it is rebuilt from the journal, which only
+  holds the edits made since the last compaction.
+  """
+
+  # Records written before the journal compacts itself
+  COMPACT_AFTER = 1000
+
+  def __init__(self, glossary: GlossaryManager, path: Optional[Path] = None, durable: bool = True):
+    """
+    Args:
+        glossary: The loaded glossary
+        path: The journal file, by default glossary.files.journal
+        durable: fsync every record, so that it survives a power loss
+    """
+    self.glossary = glossary
+    self.path = Path(path) if path is not None else glossary.files.journal
+    self.durable = durable
+    self._undo: List[Change] = []
+    self._redo: List[Change] = []
+    self._records = 0  # records in the journal file
+    self._file: Optional[IO[bytes]] = None
+
+  @property
+  def can_undo(self) -> bool:
+    return bool(self._undo)
+
+  @property
+  def can_redo(self) -> bool:
+    return bool(self._redo)
+
+  def recover(self, force: bool = False) -> int:
+    """Replay the journal onto the glossary as loaded from the .tex files.
+
+    A record cut short by a crash, and anything after it, is dropped from
+    the journal.
+
+    Args:
+        force: Replay even over entries changed outside the editor
+
+    Returns:
+        The number of records replayed
+
+    Raises:
+        JournalConflict: If nomenclature.tex no longer matches the base
+            record and holds journaled entries in a state the journal does
+            not know; nothing is replayed then
+    """
+    if not self.path.exists():
+      return 0
+    base = None
+    records: List[Tuple[str, Change]] = []
+    valid_length = 0
+    with open(self.path, 'rb') as f:
+      for line in f:
+        if not line.endswith(b'\n'):
+          break
+        try:
+          record = json.loads(line)
+          kind = record['kind']
+          if kind == BASE:
+            base = record['digest']
+          else:
+            records.append((kind, Change({hash_name: (before, after)
+                                          for hash_name, before, after in record['steps']})))
+        except (ValueError, KeyError, TypeError):
+          break
+        valid_length += len(line)
+    if records and not force and base != self._digest():
+      conflicts = self._conflicts(records)
+      if conflicts:
+        raise JournalConflict(conflicts)
+
+    for kind, change in records:
+      self._replay(kind, change)
+    if valid_length < self.path.stat().st_size:
+      self.glossary.logger.warning("Dropping the damaged end of the edit journal %s", self.path)
+      os.truncate(self.path, valid_length)
+    self._records = len(records)
+    return len(records)
+
+  def _conflicts(self, records: List[Tuple[str, Change]]) -> List[str]:
+    """Return the journaled entries whose state in the glossary appears in no record."""
+    known: Dict[str, List[Optional[GlossaryEntry]]] = {}
+    for _kind, change in records:
+      for hash_name, states in change.steps.items():
+        known.setdefault(hash_name, []).extend(states)
+    conflicts = []
+    for hash_name, states in known.items():
+      entry = self.glossary.entries.get(hash_name)
+      if (dict(entry) if entry is not None else None) not in states:
+        conflicts.append(hash_name)
+    return sorted(conflicts)
+
+  def set_aside(self) -> Path:
+    """Move the journal out of the way instead of recovering it; returns where it went."""
+    self._close_file()
+    target = self.path.with_name(self.path.name + '.rejected')
+    os.replace(self.path, target)
+    self._records = 0
+    return target
+
+  def _replay(self, kind: str, change: Change) -> None:
+    """Apply a record and update the history as when it was written."""
+    self._apply(change.states(after=kind != UNDO))
+    if kind == EDIT:
+      self._undo.append(change)
+      self._redo.clear()
+    elif kind == REBASE:
+      self._undo.clear()
+      self._redo.clear()
+    elif kind == UNDO:
+      if self._undo:
+        self._undo.pop()
+      self._redo.append(change)
+    else:
+      if self._redo:
+        self._redo.pop()
+      self._undo.append(change)
+
+  def record(self, states: Mapping[str, Optional[GlossaryEntry]]) -> Optional[Change]:
+    """Journal and apply one edit of any number of entries, undone as a whole.
+
+    Args:
+        states: hash name -> the new entry, or None to delete the entry
+
+    Returns:
+        The change, or None if it changes nothing
+    """
+    with self.glossary.lock:
+      steps = {}
+      for hash_name, entry in states.items():
+        before = self.glossary.entries.get(hash_name)
+        before = dict(before) if before is not None else None
+        if before != entry:
+          steps[hash_name] = (before, dict(entry) if entry is not None else None)
+      if not steps:
+        return None
+      change = Change(steps)
+      self._append(EDIT, change)
+      self._apply(change.states(after=True))
+      self._undo.append(change)
+      self._redo.clear()
+    self._compact_if_full()
+    return change
+
+  def set_entry(self, hash_name: str, symbol: str, description: str, sort_key: str) -> Optional[Change]:
+    """Add or update an entry; see GlossaryManager.set_entry()."""
+    return self.record({hash_name: {'symbol': symbol, 'description': description, 'sort_key': sort_key}})
+
+  def delete_entry(self, hash_name: str) -> Optional[Change]:
+    """Delete an entry; see GlossaryManager.delete_entry().
+
+    Raises:
+        KeyError: If there is no such entry
+    """
+    if hash_name not in self.glossary.entries:
+      raise KeyError(hash_name)
+    return self.record({hash_name: None})
+
+  def undo(self) -> Optional[Change]:
+    """Revert the latest change that is not undone yet; returns it, or None if there is none."""
+    with self.glossary.lock:
+      if not self._undo:
+        return None
+      change = self._undo[-1]
+      self._append(UNDO, change)
+      self._apply(change.states(after=False))
+      self._redo.append(self._undo.pop())
+    self._compact_if_full()
+    return change
+
+  def redo(self) -> Optional[Change]:
+    """Apply the latest undone change again; returns it, or None if there is none."""
+    with self.glossary.lock:
+      if not self._redo:
+        return None
+      change = self._redo[-1]
+      self._append(REDO, change)
+      self._apply(change.states(after=True))
+      self._undo.append(self._redo.pop())
+    self._compact_if_full()
+    return change
+
+  def rebase(self, hash_names: Iterable[str]) -> bool:
+    """Forget the history after entries were changed outside the journal, e.g. by GlossaryManager.reload().
+
+    Undoing an older change would otherwise revert the outside change. The
+    history is only forgotten if it holds one of the entries; the new
+    states of those are journaled, so that recover() knows them.
+
+    Returns:
+        Whether the history was forgotten
+    """
+    with self.glossary.lock:
+      journaled = {hash_name for change in (*self._undo, *self._redo) for hash_name in change.steps}
+      rebased = journaled.intersection(hash_names)
+      if not rebased:
+        return False
+      steps = {}
+      for hash_name in sorted(rebased):
+        entry = self.glossary.entries.get(hash_name)
+        steps[hash_name] = (None, dict(entry) if entry is not None else None)
+      self._append(REBASE, Change(steps))
+      self._undo.clear()
+      self._redo.clear()
+    self._compact_if_full()
+    return True
+
+  def compact(self) -> bool:
+    """Save the glossary durably and start the journal again; the history is kept.
+
+    Returns:
+        Whether the glossary was saved; if not, the journal is kept
+    """
+    if not self.glossary.save(durable=True):
+      return False
+    with self.glossary.lock:
+      self._close_file()
+      self._start()
+    return True
+
+  def close(self) -> None:
+    """Close the journal file, keeping its records for the next recover()."""
+    self._close_file()
+
+  def _compact_if_full(self) -> None:
+    if self._records >= self.COMPACT_AFTER:
+      self.compact()
+
+  def _append(self, kind: str, change: Change) -> None:
+    steps = [[hash_name, before, after] for hash_name, (before, after) in change.steps.items()]
+    if self._file is None:
+      if self._records:
+        self._file = open(self.path, 'ab')
+      else:
+        self._start()
+    self._write({'kind': kind, 'steps': steps})
+    self._records += 1
+
+  def _start(self) -> None:
+    """Empty the journal and write the base record, the digest of nomenclature.tex as it is now."""
+    self._file = open(self.path, 'wb')
+    self._write({'kind': BASE, 'digest': self._digest()})
+    self._records = 0
+
+  def _write(self, record: Dict[str, object]) -> None:
+    line = json.dumps(record, ensure_ascii=False, separators=(',', ':'))
+    self._file.write(line.encode('utf-8') + b'\n')
+    self._file.flush()
+    if self.durable:
+      os.fsync(self._file.fileno())
+
+  def _digest(self) -> Optional[str]:
+    try:
+      return fingerprint(self.glossary.files.nomenclature).digest.hex()
+    except FileNotFoundError:
+      return None
+
+  def _apply(self, states: Mapping[str, Optional[GlossaryEntry]]) -> None:
+    for hash_name, entry in states.items():
+      if entry is None:
+        if hash_name in self.glossary.entries:
+          self.glossary.delete_entry(hash_name)
+      else:
+        self.glossary.set_entry(hash_name, entry['symbol'], entry['description'], entry['sort_key'])
+
+  def _close_file(self) -> None:
+    if self._file is not None:
+      self._file.close()
+      self._file = None
@@ -1,5 +1,5 @@
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 
 from PyQt6 import QtCore
 from PyQt6 import QtWidgets, QtGui
@@ -7,12 +7,18 @@ from PyQt6.QtWidgets import QApplication
 from PyQt6.QtWidgets import QFileDialog
 from PyQt6.QtWidgets import QMenu
 from PyQt6.QtWidgets import QMessageBox
+from PyQt6.QtWidgets import QProgressDialog
 from PyQt6.QtWidgets import QToolTip
 
 from directory_history import DirectoryHistory
+from edit_journal import Change, EditJournal, JournalConflict
 from editor import Ui_Form
+from glossary_loader import GlossaryLoader, start_loading
+from glossary_validator import check_entry
 from listview_impl import UI_ListView
+from macro_list_model import MacroListModel
 from models import GlossaryManager
+from save_scheduler import SaveScheduler
 
 
 class UI_EntitiesControl():
@@ -82,11 +88,24 @@ class UI_EntitiesControl():
 
 
 class UI(QtWidgets.QWidget):
+  # Emitted from the saver thread; queued to the GUI thread
+  saveFailed = QtCore.pyqtSignal()
+
   def __init__(self):
     super().__init__()
     self.ui = Ui_Form()
     self.ui.setupUi(self)
     self.glossary: Optional[GlossaryManager] = None
+    self._saver: Optional[SaveScheduler] = None
+    # Every accepted edit is journaled before it is applied, for undo and crash recovery
+    self._journal: Optional[EditJournal] = None
+    # Glossary being loaded in the background, if any
+    self._loader: Optional[GlossaryLoader] = None
+    self._loader_thread: Optional[QtCore.QThread] = None
+    self._load_progress: Optional[QProgressDialog] = None
+    # Kept between openings of the list; refreshed only when the keys change
+    self.list_view: Optional[UI_ListView] = None
+    self._macro_model = MacroListModel(self)
     self.dir_history = DirectoryHistory("glossary_editor")
     self._setup_ui()
 
@@ -151,6 +170,9 @@ class UI(QtWidgets.QWidget):
     self.ui.pushButtonDelete.clicked.connect(self.on_delete_macro_clicked)
     self.ui.pushButtonCancel.clicked.connect(self.on_cancel_macro_definition_clicked)
     self.ui.pushButtonAccept.clicked.connect(self.on_accept_macro_clicked)
+    self.ui.lineEditSymbol.textEdited.connect(self._on_symbol_edited)
+    QtGui.QShortcut(QtGui.QKeySequence.StandardKey.Undo, self, self.on_undo)
+    QtGui.QShortcut(QtGui.QKeySequence.StandardKey.Redo, self, self.on_redo)
 
     # Setup input validation for hash (LaTeX command name)
     hash_validator = QtGui.QRegularExpressionValidator(QtCore.QRegularExpression('^[a-zA-Z][a-zA-Z0-9]*$'), self)
@@ -160,6 +182,12 @@ class UI(QtWidgets.QWidget):
     self._ui_entities = UI_EntitiesControl(self.ui)
     self._ui_entities.control("start")
 
+    # Follow edits of the nomenclature file made by other processes
+    self._file_watcher = QtCore.QFileSystemWatcher(self)
+    self._file_watcher.fileChanged.connect(self._on_glossary_file_changed)
+
+    self.saveFailed.connect(self._on_save_failed)
+
   def _create_new_repository(self) -> None:
     """Create a new glossary repository with empty files."""
     # Ask user to select a directory
@@ -224,7 +252,6 @@ class UI(QtWidgets.QWidget):
               "Success",
               f"New glossary repository created at {dir_path}"
               )
-      self._ui_entities.control("select")
 
     except Exception as e:
       QMessageBox.critical(
@@ -242,7 +269,6 @@ class UI(QtWidgets.QWidget):
     if dir_path:
       # Directory was provided (from recent directories)
       self._load_glossary(dir_path)
-      self._ui_entities.control("select")
       return
 
     # Show recent directories in a menu
@@ -281,11 +307,12 @@ class UI(QtWidgets.QWidget):
       return
 
     try:
-      # Create and show the list view dialog
-      self.list_view = UI_ListView(pattern="%s", parent=self)
-      self.list_view.build(sorted(self.glossary.entries.keys()))
-      self.list_view.newSelection.connect(self._on_macro_selected)
-      self.list_view.show()
+      # Create the list view dialog once and reuse it
+      if self.list_view is None:
+        self.list_view = UI_ListView(pattern="%s", parent=self)
+        self.list_view.newSelection.connect(self._on_macro_selected)
+      self._macro_model.sync(self.glossary)
+      self.list_view.open_model(self._macro_model)
 
     except Exception as e:
       QMessageBox.critical(self, "Error", f"Failed to show entry list: {str(e)}")
@@ -393,35 +420,69 @@ class UI(QtWidgets.QWidget):
 
       try:
         # Add or update the entry
-        self.glossary.entries[hash_name] = {
-                'symbol'     : symbol,
-                'description': description,
-                'sort_key'   : sort_key
-                }
-
-        # Save the glossary
+        states = {hash_name: {'symbol': symbol, 'description': description, 'sort_key': sort_key}}
         if hasattr(self, '_original_hash') and self._original_hash and self._original_hash != hash_name:
-          # If the hash was changed, remove the old entry
+          # If the hash was changed, remove the old entry in the same undo step
           if self._original_hash in self.glossary.entries:
-            del self.glossary.entries[self._original_hash]
-
-        # Save to disk - this updates all related files (nomenclature.tex, def_vars.tex, macros.tex)
-        if self.glossary.save():
-          # Switch back to view mode
-          self._ui_entities.control("select")
-          self._ui_entities.formEditMode(False)
-          QMessageBox.information(self, "Success", "Entry saved successfully.")
+            states[self._original_hash] = None
+        self._journal.record(states)
+        self._show_duplicate_symbol([])
+
+        # Save to disk in the background - this updates the affected files among
+        # nomenclature.tex, def_vars.tex and macros.tex
+        self._saver.request()
+        # Switch back to view mode
+        self._ui_entities.control("select")
+        self._ui_entities.formEditMode(False)
+        problems = self._symbol_problems(hash_name)
+        if problems:
+          QMessageBox.warning(self, "Entry accepted", "Entry accepted, but:\n" + "\n".join(problems))
         else:
-          QMessageBox.warning(
-                  self,
-                  "Error",
-                  "Failed to save entry. Check the log for details."
-                  )
-          self._ui_entities.control("select")
+          QMessageBox.information(self, "Success", "Entry accepted; it is saved in the background.")
 
       except Exception as e:
         QMessageBox.critical(self, "Error", f"Failed to save entry: {str(e)}")
 
+  def _symbol_problems(self, hash_name: str) -> List[str]:
+    """Describe cycles and undefined macros in the symbol of an entry."""
+    graph = self.glossary.macro_graph
+    problems = []
+    cycle = graph.find_cycle(hash_name)
+    if cycle:
+      problems.append("the symbol uses itself: " + " -> ".join(f"\\{name}" for name in cycle))
+    missing = graph.missing_references(hash_name)
+    if missing:
+      problems.append("undefined macros: " + ", ".join(f"\\{name}" for name in missing))
+    entry = self.glossary.entries[hash_name]
+    problems.extend(issue.message for issue in check_entry(hash_name, entry))
+    same_symbol = self.glossary.duplicate_index.with_symbol(entry['symbol'], exclude=[hash_name])
+    if same_symbol:
+      problems.append("same symbol as " + ", ".join(f"\\{name}" for name in same_symbol))
+    same_description = self.glossary.duplicate_index.with_description(entry['description'], exclude=[hash_name])
+    if same_description:
+      problems.append("same description as " + ", ".join(f"\\{name}" for name in same_description))
+    return problems
+
+  def _on_symbol_edited(self, symbol: str) -> None:
+    """Warn while the user types a symbol that another entry already renders."""
+    duplicates = []
+    if self.glossary and symbol.strip():
+      own = [self.ui.lineEditHash.text().strip(), getattr(self, '_original_hash', '')]
+      duplicates = self.glossary.duplicate_index.with_symbol(symbol, exclude=own)
+    self._show_duplicate_symbol(duplicates)
+
+  def _show_duplicate_symbol(self, duplicates: List[str]) -> None:
+    line_edit = self.ui.lineEditSymbol
+    if not duplicates:
+      line_edit.setStyleSheet("")
+      QToolTip.hideText()
+      return
+    line_edit.setStyleSheet("QLineEdit { border: 1px solid #d08000; }")
+    shown = ", ".join(f"\\{name}" for name in duplicates[:5])
+    if len(duplicates) > 5:
+      shown += f" and {len(duplicates) - 5} more"
+    QToolTip.showText(line_edit.mapToGlobal(line_edit.rect().bottomLeft()), f"Same symbol as {shown}", line_edit)
+
   def on_delete_macro_clicked(self) -> None:
     """Handle delete button click for the current entry."""
     if not self.glossary:
@@ -441,14 +502,39 @@ class UI(QtWidgets.QWidget):
             )
 
     if reply == QMessageBox.StandardButton.Yes:
-      # Delete the entry
-      del self.glossary.entries[hash_name]
+      # Delete the entry and save in the background like any other edit
+      self._journal.delete_entry(hash_name)
+      self._saver.request()
 
       # Update the UI
       self._populate_ui()
 
+  def on_undo(self) -> None:
+    """Revert the latest accepted edit."""
+    if self._journal is not None and self.ui.lineEditHash.isReadOnly():
+      self._show_change(self._journal.undo(), after=False)
+
+  def on_redo(self) -> None:
+    """Apply the latest undone edit again."""
+    if self._journal is not None and self.ui.lineEditHash.isReadOnly():
+      self._show_change(self._journal.redo(), after=True)
+
+  def _show_change(self, change: Optional[Change], after: bool) -> None:
+    """Save an undone or redone change and show an entry it leaves in place."""
+    if change is None:
+      return
+    self._saver.request()
+    remaining = [hash_name for hash_name, entry in change.states(after).items() if entry is not None]
+    if remaining:
+      self._populate_ui(remaining[0])
+    else:
+      self._clear_form()
+      self._populate_ui()
+    self._ui_entities.control("edit" if self.glossary.entries else "select")
+
   def _clear_form(self) -> None:
     """Clear all form fields."""
+    self._show_duplicate_symbol([])
     self.ui.lineEditHash.clear()
     self.ui.lineEditSymbol.clear()
     self.ui.lineEditDescription.clear()
@@ -534,23 +620,202 @@ class UI(QtWidgets.QWidget):
 
     if dir_path:  # User didn't cancel
       self._load_glossary(dir_path)
-      self._ui_entities.control("select")
 
   def _load_glossary(self, dir_path: str) -> None:
-    """Load glossary from the specified directory."""
-    try:
-      self.glossary = GlossaryManager(base_dir=dir_path)
-      self.glossary.load()
-      self._last_glossary_dir = dir_path  # Store the directory for future use
-      self.dir_history.add_directory(dir_path)  # Add this line to save to history
-      self.ui.labelDirectory.setText(dir_path)  # Update the directory label
-      self._ui_entities.control("load")
+    """Load glossary from the specified directory on a worker thread.
 
-    except Exception as e:
-      QMessageBox.critical(self, "Error", f"Failed to load glossary: {str(e)}")
-      self.glossary = None
+    The current glossary stays in use until the new one has loaded; a
+    running load is cancelled.
+    """
+    self._cancel_loading()
+    self._loader_thread, self._loader = start_loading(dir_path, self)
+    self._loader.loaded.connect(self._on_glossary_loaded)
+    self._loader.failed.connect(self._on_load_failed)
+    self._loader.finished.connect(self._on_loading_finished)
+
+    self._load_progress = QProgressDialog(f"Loading {dir_path}", "Cancel", 0, 100, self)
+    self._load_progress.setWindowModality(QtCore.Qt.WindowModality.WindowModal)
+    self._load_progress.setMinimumDuration(300)  # small glossaries load without flashing it
+    self._load_progress.setAutoClose(False)
+    self._load_progress.canceled.connect(self._loader.cancel)
+    self._loader.progress.connect(self._load_progress.setValue)
+    self._loader_thread.start()
+
+  def _cancel_loading(self) -> None:
+    """Stop a running load and wait for its thread."""
+    if self._loader is None:
+      return
+    self._loader.cancel()
+    self._loader_thread.quit()
+    self._loader_thread.wait()
+    self._forget_loader()
+
+  def _is_current_loader(self) -> bool:
+    """Whether the signal being handled comes from the running load, not a cancelled one."""
+    return self._loader is not None and self.sender() is self._loader
+
+  def _on_loading_finished(self) -> None:
+    if self._is_current_loader():
+      self._forget_loader()
+
+  def _forget_loader(self) -> None:
+    if self._load_progress is not None:
+      self._load_progress.canceled.disconnect()  # closing it emits canceled
+      self._load_progress.close()
+      self._load_progress = None
+    self._loader = None
+    self._loader_thread = None
+
+  def _on_glossary_loaded(self, glossary: GlossaryManager) -> None:
+    """Switch to a glossary loaded by the worker thread."""
+    if not self._is_current_loader():
+      return
+    dir_path = self._loader.dir_path
+    if not self._stop_saver() and not self._confirm_unsaved("Open the other glossary anyway?"):
+      self._restart_saver()
+      return
+    self._close_journal()
+    self.glossary = glossary
+    self._saver = SaveScheduler(self.glossary, on_error=self.saveFailed.emit)
+    self._journal = EditJournal(self.glossary)
+    recovered = self._recover_journal()
+    if recovered:
+      self._saver.request()
+    self._last_glossary_dir = dir_path  # Store the directory for future use
+    self.dir_history.add_directory(dir_path)  # Add this line to save to history
+    self.ui.labelDirectory.setText(dir_path)  # Update the directory label
+    self._watch_glossary_file()
+    self._clear_form()
+    self._ui_entities.control("select")
+
+    if recovered:
+      QMessageBox.information(
+              self,
+              "Edits Recovered",
+              f"Recovered {recovered} edits that had not been saved when the editor last stopped."
+              )
+    if glossary.load_errors:
+      shown = glossary.load_errors[:10]
+      details = "\n".join(f"line {number}: {reason}" for number, _line, reason in shown)
+      if len(glossary.load_errors) > len(shown):
+        details += f"\n... and {len(glossary.load_errors) - len(shown)} more"
+      QMessageBox.warning(
+              self,
+              "Malformed Entries",
+              f"Loaded {len(glossary.entries)} entries. These lines could not be read "
+              f"and will be dropped on the next save:\n{details}"
+              )
+
+  def _recover_journal(self) -> int:
+    """Replay the edits journaled before a crash, asking first if other tools changed them since."""
+    try:
+      return self._journal.recover()
+    except JournalConflict as e:
+      shown = ", ".join(e.hash_names[:10]) + (", ..." if len(e.hash_names) > 10 else "")
+      reply = QMessageBox.question(
+              self,
+              "Recover Edits?",
+              "The editor stopped with unsaved edits, but nomenclature.tex has been changed "
+              f"since in entries these edits touch: {shown}.\n"
+              "Replay the edits over these changes?",
+              QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+              QMessageBox.StandardButton.No
+              )
+      if reply == QMessageBox.StandardButton.Yes:
+        return self._journal.recover(force=True)
+      target = self._journal.set_aside()
+      QMessageBox.information(self, "Edits Not Recovered", f"The journal of the edits was moved to {target}.")
+      return 0
+
+  def _on_load_failed(self, message: str) -> None:
+    if not self._is_current_loader():
+      return
+    QMessageBox.critical(self, "Error", f"Failed to load glossary: {message}")
+    if self.glossary is None:
       self._ui_entities.control("start")
 
+  def _stop_saver(self) -> bool:
+    """Write pending changes of the current glossary and stop its saver."""
+    if self._saver is None:
+      return True
+    saved = self._saver.shutdown()
+    self._saver = None
+    return saved
+
+  def _confirm_unsaved(self, question: str) -> bool:
+    reply = QMessageBox.question(
+            self,
+            'Unsaved Changes',
+            f'Some changes could not be saved. {question}',
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+            QMessageBox.StandardButton.No
+            )
+    return reply == QMessageBox.StandardButton.Yes
+
+  def _restart_saver(self) -> None:
+    """Keep saving the current glossary after _stop_saver(), retrying its unsaved changes."""
+    self._saver = SaveScheduler(self.glossary, on_error=self.saveFailed.emit)
+    if self.glossary.is_dirty:
+      self._saver.request()
+
+  def _close_journal(self) -> None:
+    """Fold the journal of the current glossary into its files if they are saved."""
+    if self._journal is None:
+      return
+    if not self.glossary.is_dirty:
+      self._journal.compact()
+    self._journal.close()
+    self._journal = None
+
+  def _on_save_failed(self) -> None:
+    QMessageBox.warning(
+            self,
+            "Error",
+            "Failed to save entry. Check the log for details."
+            )
+
+  def closeEvent(self, event: QtGui.QCloseEvent) -> None:
+    """Make sure no accepted edit is lost when the window closes."""
+    self._cancel_loading()
+    if not self._stop_saver() and not self._confirm_unsaved("Close anyway?"):
+      self._restart_saver()
+      event.ignore()
+      return
+    self._close_journal()  # kept if changes could not be saved, and recovered next time
+    if self.list_view is not None:
+      self.list_view.shutdown()
+    super().closeEvent(event)
+
+  def _watch_glossary_file(self) -> None:
+    """Watch the nomenclature file of the loaded glossary only."""
+    watched = self._file_watcher.files()
+    if watched:
+      self._file_watcher.removePaths(watched)
+    if self.glossary.files.nomenclature.exists():
+      self._file_watcher.addPath(str(self.glossary.files.nomenclature))
+
+  def _on_glossary_file_changed(self, path: str) -> None:
+    """Apply external changes of the nomenclature file incrementally."""
+    if not self.glossary:
+      return
+
+    # Editors saving by rename drop the file from the watch list
+    if path not in self._file_watcher.files() and Path(path).exists():
+      self._file_watcher.addPath(path)
+
+    delta = self.glossary.reload()
+    if delta and self._journal is not None:
+      self._journal.rebase((*delta.added, *delta.changed, *delta.removed))  # undo must not revert them
+    if not delta or not self.ui.lineEditHash.isReadOnly():
+      return  # nothing changed, or the user is editing the form
+
+    shown = self.ui.lineEditHash.text().strip()
+    if shown in delta.changed:
+      self._populate_ui(shown)
+    elif shown in delta.removed:
+      self._clear_form()
+      self._ui_entities.control("select")
+
   def _populate_ui(self, macro_name: str = None) -> None:
     """Populate UI with glossary entries and display the specified macro.
     
@@ -559,6 +824,7 @@ class UI(QtWidgets.QWidget):
     """
     if not self.glossary:
       return
+    self._show_duplicate_symbol([])
 
     if macro_name in self.glossary.entries:
       # Populate form with the specified macro's data
@@ -569,9 +835,14 @@ class UI(QtWidgets.QWidget):
       self.ui.lineEditSortKey.setText(macro_data.get('sort_key', ''))
     elif not macro_name and self.glossary.entries:
       # If no macro specified but there are entries, show the first one
-      first_macro = next(iter(sorted(self.glossary.entries)))
+      first_macro = self.glossary.sorted_keys.first()
       macro_data = self.glossary.entries[first_macro]
       self.ui.lineEditHash.setText(first_macro)
       self.ui.lineEditSymbol.setText(macro_data.get('symbol', ''))
       self.ui.lineEditDescription.setText(macro_data.get('description', ''))
       self.ui.lineEditSortKey.setText(macro_data.get('sort_key', ''))
+
+    # Preview the symbol with the glossary macros it uses expanded
+    shown = self.ui.lineEditHash.text()
+    if shown in self.glossary.entries:
+      self.ui.lineEditSymbol.setToolTip(self.glossary.expand_symbol(shown))
@@ -0,0 +1,114 @@
+"""
+Compact column-oriented storage of glossary entries.
+"""
+from typing import TYPE_CHECKING, Dict, Iterator, List, MutableMapping, Optional
+
+if TYPE_CHECKING:
+  from models import GlossaryEntry
+
+
+class ColumnarEntryStore(MutableMapping[str, 'GlossaryEntry']):
+  """Mapping of hash name to entry that keeps each field in its own list.
+
+  Instead of one dict per entry, every entry is a row index into three
+  parallel lists. Symbols and sort keys, which repeat a lot, are interned in
+  a per-store pool, counting their uses so that a value leaves the pool
+  with the last row using it. Reading an entry returns a new GlossaryEntry dict, so
+  the store behaves like the plain dict GlossaryManager uses by default;
+  changing the returned dict does not change the store.
+  """
+
+  __slots__ = ('_rows', '_symbols', '_descriptions', '_sort_keys', '_free', '_pool', '_uses')
+
+  def __init__(self, entries: Optional[Dict[str, 'GlossaryEntry']] = None):
+    self._rows: Dict[str, int] = {}
+    self._symbols: List[Optional[str]] = []
+    self._descriptions: List[Optional[str]] = []
+    self._sort_keys: List[Optional[str]] = []
+    self._free: List[int] = []  # rows of deleted entries, reused first
+    self._pool: Dict[str, str] = {}
+    self._uses: Dict[str, int] = {}  # rows and fields holding each pooled value
+    if entries:
+      self.update(entries)
+
+  def _intern(self, value: str) -> str:
+    value = self._pool.setdefault(value, value)
+    self._uses[value] = self._uses.get(value, 0) + 1
+    return value
+
+  def _release(self, value: str) -> None:
+    uses = self._uses[value] - 1
+    if uses:
+      self._uses[value] = uses
+    else:
+      del self._uses[value]
+      del self._pool[value]
+
+  def __getitem__(self, hash_name: str) -> 'GlossaryEntry':
+    row = self._rows[hash_name]
+    return {
+            'symbol'     : self._symbols[row],
+            'description': self._descriptions[row],
+            'sort_key'   : self._sort_keys[row]
+            }
+
+  def __setitem__(self, hash_name: str, entry: 'GlossaryEntry') -> None:
+    symbol = self._intern(entry['symbol'])
+    description = entry['description']
+    sort_key = self._intern(entry['sort_key'])
+    row = self._rows.get(hash_name)
+    if row is None:
+      if self._free:
+        row = self._free.pop()
+      else:
+        row = len(self._symbols)
+        self._symbols.append(None)
+        self._descriptions.append(None)
+        self._sort_keys.append(None)
+      self._rows[hash_name] = row
+    else:
+      self._release(self._symbols[row])
+      self._release(self._sort_keys[row])
+    self._symbols[row] = symbol
+    self._descriptions[row] = description
+    self._sort_keys[row] = sort_key
+
+  def __delitem__(self, hash_name: str) -> None:
+    row = self._rows.pop(hash_name)
+    self._release(self._symbols[row])
+    self._release(self._sort_keys[row])
+    self._symbols[row] = self._descriptions[row] = self._sort_keys[row] = None
+    self._free.append(row)
+
+  def __iter__(self) -> Iterator[str]:
+    return iter(self._rows)
+
+  def __len__(self) -> int:
+    return len(self._rows)
+
+  def __contains__(self, hash_name: object) -> bool:
+    return hash_name in self._rows
+
+  def __repr__(self) -> str:
+    return f"{type(self).__name__}({len(self)} entries)"
+
+  def copy(self) -> 'ColumnarEntryStore':
+    """Return a shallow copy; the column lists and the pool are copied, the strings shared."""
+    clone = ColumnarEntryStore()
+    clone._rows = self._rows.copy()
+    clone._symbols = self._symbols.copy()
+    clone._descriptions = self._descriptions.copy()
+    clone._sort_keys = self._sort_keys.copy()
+    clone._free = self._free.copy()
+    clone._pool = self._pool.copy()
+    clone._uses = self._uses.copy()
+    return clone
+
+  def clear(self) -> None:
+    self._rows.clear()
+    self._symbols.clear()
+    self._descriptions.clear()
+    self._sort_keys.clear()
+    self._free.clear()
+    self._pool.clear()
+    self._uses.clear()
@@ -0,0 +1,93 @@
+"""
+Debounced filtering of a list on a worker thread.
+"""
+import threading
+import time
+from typing import Callable, List, Optional
+
+
+class FilterWorker:
+  """Run the latest filter query off the calling thread and report its rows.
+
+  A query runs ``delay`` seconds after it was submitted unless another
+  query replaces it first, so typing a word runs one search instead of one
+  per character. A result is reported only if no newer query was submitted
+  meanwhile; superseded queries are dropped before or after running.
+  """
+
+  def __init__(self, search: Callable[[str], List[int]],
+               on_result: Callable[[int, str, List[int]], None], delay: float = 0.15):
+    """
+    Args:
+        search: Returns the matching rows of a query; called on the worker thread
+        on_result: Called from the worker thread with (generation, query, rows),
+            holding the worker's lock, so never after shutdown() returned
+        delay: Seconds to wait for further input before searching
+    """
+    self.search = search
+    self.on_result = on_result
+    self.delay = delay
+    self._condition = threading.Condition()
+    self._generation = 0  # number of the latest submitted query
+    self._query: Optional[str] = None  # latest query not taken by the worker yet
+    self._submitted_at = 0.0
+    self._stopping = False
+    self._thread = threading.Thread(target=self._run, name="list-filter", daemon=True)
+    self._thread.start()
+
+  @property
+  def generation(self) -> int:
+    """Number of the latest query; results carrying another number are stale."""
+    with self._condition:
+      return self._generation
+
+  def submit(self, query: str) -> int:
+    """Schedule ``query``, replacing any query still waiting.
+
+    Returns:
+        The generation the result will be reported with
+    """
+    with self._condition:
+      if self._stopping:
+        raise RuntimeError("FilterWorker has been shut down")
+      self._generation += 1
+      self._query = query
+      self._submitted_at = time.monotonic()
+      self._condition.notify_all()
+      return self._generation
+
+  def cancel(self) -> None:
+    """Drop the waiting query and the result of the running one."""
+    with self._condition:
+      self._generation += 1
+      self._query = None
+
+  def shutdown(self, timeout: Optional[float] = None) -> None:
+    """Drop pending work and stop the worker thread."""
+    with self._condition:
+      self._stopping = True
+      self._query = None
+      self._condition.notify_all()
+    self._thread.join(timeout)
+
+  def _run(self) -> None:
+    while True:
+      with self._condition:
+        while self._query is None and not self._stopping:
+          self._condition.wait()
+        if self._stopping:
+          return
+        while self._query is not None and not self._stopping \
+                and (remaining := self._submitted_at + self.delay - time.monotonic()) > 0:
+          self._condition.wait(remaining)
+        if self._query is None or self._stopping:
+          continue  # cancelled while waiting
+        query, generation = self._query, self._generation
+        self._query = None
+
+      rows = self.search(query)
+
+      with self._condition:
+        if generation != self._generation or self._stopping:
+          continue  # superseded or stopped while searching
+        self.on_result(generation, query, rows)
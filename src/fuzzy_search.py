@@ -0,0 +1,250 @@
+"""
+Ranked fuzzy search over the hash names, symbols and descriptions of a glossary.
+"""
+import heapq
+import math
+import re
+from array import array
+from bisect import bisect_left
+from typing import TYPE_CHECKING, Dict, Iterable, List, Mapping, Tuple
+
+if TYPE_CHECKING:
+  from models import GlossaryEntry
+
+# Words in any script and numbers: 'qTemp' -> qTemp; '\hat{T}_{3}' -> hat, T, 3; 'Größe' -> Größe
+_TOKEN = re.compile(r'[^\W\d_]+|\d+')
+
+FIELDS = ('hash', 'symbol', 'description')
+FIELD_WEIGHTS = (3.0, 2.0, 1.0)
+
+# Score factors of the ways a query token can match an indexed token
+EXACT, PREFIX, TYPO = 1.0, 0.6, 0.4
+# Added when the query is a hash name, so typing it in full always finds it first
+EXACT_NAME_BONUS = 100.0
+MIN_PREFIX_LENGTH = 2
+MIN_TYPO_LENGTH = 4
+# Score of hash names that only contain the query, like 'ature' in temperature;
+# lower than any token match, so they follow the ranked results
+SUBSTRING_SCORE = 0.1
+
+
+def tokenize(text: str) -> List[str]:
+  """Split text into case-folded words, camelCase parts and numbers, in any script."""
+  tokens = []
+  for word in _TOKEN.findall(text):
+    if word.islower() or word.isupper() or word.istitle():
+      tokens.append(word.casefold())
+    else:
+      tokens.extend(part.casefold() for part in _camel_case_parts(word))
+  return tokens
+
+
+def _camel_case_parts(word: str) -> List[str]:
+  """Split a word where the case changes: 'qTemp' -> q, Temp; 'HTMLParser' -> HTML, Parser."""
+  parts = []
+  start = 0
+  for i in range(1, len(word)):
+    if word[i].isupper() and not word[i - 1].isupper():
+      cut = i
+    elif word[i].islower() and word[i - 1].isupper() and i - 1 > start:
+      cut = i - 1
+    else:
+      continue
+    parts.append(word[start:cut])
+    start = cut
+  parts.append(word[start:])
+  return parts
+
+
+def within_one_edit(a: str, b: str) -> bool:
+  """Whether ``b`` differs from ``a`` by at most one insertion, deletion or substitution."""
+  if abs(len(a) - len(b)) > 1:
+    return False
+  if len(a) > len(b):
+    a, b = b, a
+  i = 0
+  while i < len(a) and a[i] == b[i]:
+    i += 1
+  if len(a) == len(b):
+    return a[i + 1:] == b[i + 1:]
+  return a[i:] == b[i + 1:]
+
+
+def merge_substring_hits(ranked: List[Tuple[str, float]], names: Iterable[str],
+                         limit: int = 50) -> List[Tuple[str, float]]:
+  """Add hash names found by a substring search to ranked results, after them and up to ``limit``.
+
+  Args:
+      ranked: (hash name, score) pairs, as FuzzySearchIndex.search() returns them
+      names: Hash names containing the query, e.g. from a SubstringIndex; read
+          only until the results are full
+  """
+  results = ranked[:limit]
+  found = {name for name, _score in results}
+  for name in names:
+    if len(results) >= limit:
+      break
+    if name not in found:
+      results.append((name, SUBSTRING_SCORE))
+      found.add(name)
+  return results
+
+
+class FuzzySearchIndex:
+  """Inverted token index of glossary entries, ranked by field weight and rarity.
+
+  Every query token must match a token of the entry, exactly, as a prefix
+  or, if nothing else matches, with one typo. An entry scores the best
+  ``field weight * match factor * idf`` of each query token, summed over the
+  query tokens. Only the postings of matching tokens are visited and the
+  best ``limit`` entries are selected with a bounded heap.
+
+  Entries can be added and removed; removed ones leave a tombstone until the
+  next rebuild.
+  """
+
+  def __init__(self, entries: Mapping[str, 'GlossaryEntry'] = None):
+    self._names: List[str] = []  # by document id; '' marks a removed entry
+    self._ids: Dict[str, int] = {}
+    # One posting list (array of document ids) per field and token
+    self._postings: Tuple[Dict[str, array], ...] = ({}, {}, {})
+    self._vocabulary: List[str] = []
+    self._vocabulary_stale = False
+    if entries:
+      for hash_name, entry in entries.items():
+        if hash_name not in self._ids:
+          self._index(hash_name, entry)
+      self._sorted_vocabulary()
+
+  def __len__(self) -> int:
+    return len(self._ids)
+
+  def __contains__(self, hash_name: object) -> bool:
+    return hash_name in self._ids
+
+  def add(self, hash_name: str, entry: 'GlossaryEntry') -> None:
+    """Index an entry, replacing an earlier version of it."""
+    self.remove(hash_name)
+    self._index(hash_name, entry)
+
+  def _index(self, hash_name: str, entry: 'GlossaryEntry') -> None:
+    doc = len(self._names)
+    self._names.append(hash_name)
+    self._ids[hash_name] = doc
+    texts = (hash_name, entry['symbol'], entry['description'])
+    for postings, text in zip(self._postings, texts):
+      for token in set(tokenize(text)):
+        posting = postings.get(token)
+        if posting is None:
+          postings[token] = array('L', (doc,))
+          self._vocabulary_stale = True
+        else:
+          posting.append(doc)
+
+  def remove(self, hash_name: str) -> bool:
+    """Drop an entry from the results; returns False if it was not indexed."""
+    doc = self._ids.pop(hash_name, None)
+    if doc is None:
+      return False
+    self._names[doc] = ''
+    if len(self._names) > 2 * len(self._ids) + 1000:
+      self._compact()
+    return True
+
+  def _compact(self) -> None:
+    """Renumber the documents, dropping tombstones from the posting lists."""
+    renumbered = {}
+    names = []
+    for doc, hash_name in enumerate(self._names):
+      if hash_name:
+        renumbered[doc] = len(names)
+        names.append(hash_name)
+    for postings in self._postings:
+      for token in list(postings):
+        posting = array('L', (renumbered[doc] for doc in postings[token] if doc in renumbered))
+        if posting:
+          postings[token] = posting
+        else:
+          del postings[token]
+    self._names = names
+    self._ids = {hash_name: doc for doc, hash_name in enumerate(names)}
+    self._vocabulary_stale = True
+
+  def search(self, query: str, limit: int = 50) -> List[Tuple[str, float]]:
+    """Return up to ``limit`` (hash name, score) pairs, best first."""
+    tokens = tokenize(query)
+    if not tokens or limit <= 0:
+      return []
+
+    scores = None
+    # Start with the most selective token so that later ones only score survivors
+    for token_scores in sorted((self._score_token(token) for token in set(tokens)), key=len):
+      if scores is None:
+        scores = token_scores
+      else:
+        scores = {doc: score + token_scores[doc] for doc, score in scores.items()
+                  if doc in token_scores}
+      if not scores:
+        return []
+
+    exact = self._ids.get(query.strip())
+    if exact is not None and exact in scores:
+      scores[exact] += EXACT_NAME_BONUS
+
+    names = self._names
+    best = heapq.nsmallest(limit, scores.items(), key=lambda item: (-item[1], names[item[0]]))
+    return [(names[doc], score) for doc, score in best]
+
+  def _score_token(self, token: str) -> Dict[int, float]:
+    """Best score of every live document for one query token."""
+    scores: Dict[int, float] = {}
+    names = self._names
+    total = len(self._ids) + 1
+    for matched, factor in self._matches(token):
+      postings = [postings.get(matched) for postings in self._postings]
+      frequency = sum(len(posting) for posting in postings if posting is not None)
+      idf = math.log(1 + total / frequency)
+      for posting, weight in zip(postings, FIELD_WEIGHTS):
+        if posting is None:
+          continue
+        score = weight * factor * idf
+        for doc in posting:
+          if score > scores.get(doc, 0.0) and names[doc]:
+            scores[doc] = score
+    return scores
+
+  def _matches(self, token: str) -> Iterable[Tuple[str, float]]:
+    """Indexed tokens matching a query token, with their match factor."""
+    vocabulary = self._sorted_vocabulary()
+    matches = []
+    start = bisect_left(vocabulary, token)
+    if len(token) < MIN_PREFIX_LENGTH:
+      if start < len(vocabulary) and vocabulary[start] == token:
+        matches.append((token, EXACT))
+      return matches
+
+    for i in range(start, len(vocabulary)):
+      candidate = vocabulary[i]
+      if not candidate.startswith(token):
+        break
+      # A prefix covering more of the token ranks higher
+      matches.append((candidate, EXACT if candidate == token
+                      else PREFIX * (1 + len(token) / len(candidate)) / 2))
+    if matches or len(token) < MIN_TYPO_LENGTH or not token.isalpha():
+      return matches
+
+    # Typos rarely hit the first letter; only compare tokens sharing it
+    first = bisect_left(vocabulary, token[0])
+    for i in range(first, len(vocabulary)):
+      candidate = vocabulary[i]
+      if candidate[0] != token[0]:
+        break
+      if within_one_edit(token, candidate):
+        matches.append((candidate, TYPO))
+    return matches
+
+  def _sorted_vocabulary(self) -> List[str]:
+    if self._vocabulary_stale:
+      self._vocabulary = sorted(set().union(*self._postings))
+      self._vocabulary_stale = False
+    return self._vocabulary
@@ -0,0 +1,265 @@
+"""
+Command-line tools for a glossary directory, without Qt.
+
+Run from the ``src`` directory::
+
+    python glossary_cli.py regenerate path/to/glossary
+    python glossary_cli.py validate path/to/glossary
+    python glossary_cli.py stats path/to/glossary --json
+    python glossary_cli.py duplicates path/to/glossary
+    python glossary_cli.py lookup path/to/glossary temperature qTemp --expand
+    python glossary_cli.py export path/to/glossary --format csv -o entries.csv
+    python glossary_cli.py import path/to/glossary entries.csv --policy replace
+    python glossary_cli.py merge path/to/merged thesis paper1 paper2 --prefer majority
+
+Every subcommand imports the modules it needs when it runs, so starting
+the tool costs little more than starting Python and build scripts may call
+it many times; ``python benchmark.py cli`` measures it. Loading uses the
+parse cache unless --no-cache is given. The exit status is 0 on success
+and 1 when the glossary cannot be loaded or a subcommand finds problems.
+"""
+import argparse
+import sys
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional
+
+if TYPE_CHECKING:
+  from models import GlossaryManager
+
+# Columns of the csv export, and keys of every entry in the json export
+FIELDS = ('hash_name', 'symbol', 'description', 'sort_key')
+
+
+class CommandFailed(Exception):
+  """Raised by a subcommand that cannot do its work; the message is shown to the user."""
+
+
+def _manager(directory: Path) -> 'GlossaryManager':
+  from models import GlossaryManager
+  return GlossaryManager(directory)
+
+
+def _load(glossary: 'GlossaryManager', use_cache: bool) -> 'GlossaryManager':
+  """Load a glossary, reporting skipped lines on stderr."""
+  files = {'nomenclature.tex': glossary.files.nomenclature,
+           'def_vars.tex'    : glossary.files.def_vars,
+           'macros.tex'      : glossary.files.macros}
+  missing = [name for name, path in files.items() if not path.exists()]
+  if missing:
+    raise CommandFailed(f"{glossary.base_dir}: missing {', '.join(missing)}")
+  if not glossary.load(use_cache=use_cache):
+    raise CommandFailed(f"{glossary.base_dir}: the glossary cannot be read")
+  if glossary.load_errors:
+    print(f"{glossary.base_dir}: skipped {len(glossary.load_errors)} malformed lines", file=sys.stderr)
+  return glossary
+
+
+def cmd_regenerate(args: argparse.Namespace) -> int:
+  """Write def_vars.tex and macros.tex from nomenclature.tex, creating them if needed."""
+  glossary = _manager(args.directory)
+  if glossary.files.nomenclature.exists():
+    for path in (glossary.files.def_vars, glossary.files.macros):
+      if not path.exists():
+        path.touch()
+  _load(glossary, args.cache)
+  if not glossary.regenerate(durable=args.durable):
+    raise CommandFailed(f"{glossary.base_dir}: the generated files cannot be written")
+  return 0
+
+
+def cmd_validate(args: argparse.Namespace) -> int:
+  """Report malformed lines, entries LaTeX would reject, undefined or circular macros and outdated files."""
+  glossary = _load(_manager(args.directory), args.cache)
+  problems = 0
+  for number, line, reason in glossary.load_errors:
+    print(f"{glossary.files.nomenclature}:{number}: {reason}: {line}")
+    problems += 1
+  for issue in glossary.validate():
+    print(f"\\{issue.hash_name}: {issue.message}")
+    problems += 1
+  for macro, users in glossary.macro_graph.missing().items():
+    print(f"undefined macro \\{macro} used by {', '.join(users)}")
+    problems += 1
+  for cycle in glossary.macro_graph.cycles():
+    print(f"macros using each other: {', '.join(cycle)}")
+    problems += 1
+  for path in glossary.outdated_files():
+    print(f"{path}: out of date, run regenerate")
+    problems += 1
+  return 1 if problems else 0
+
+
+def cmd_stats(args: argparse.Namespace) -> int:
+  """Print the size of a glossary and the number of its problems."""
+  glossary = _load(_manager(args.directory), args.cache)
+  graph = glossary.macro_graph
+  stats = {
+          'entries'            : len(glossary.entries),
+          'malformed_lines'    : len(glossary.load_errors),
+          'symbols_with_macros': sum(1 for hash_name in glossary.entries if graph.dependencies(hash_name)),
+          'undefined_macros'   : len(graph.missing()),
+          'cycles'             : len(graph.cycles()),
+          'nomenclature_bytes' : glossary.files.nomenclature.stat().st_size,
+          }
+  if args.json:
+    import json
+    print(json.dumps(stats, indent=2))
+  else:
+    for key, value in stats.items():
+      print(f"{key:<20} {value}")
+  return 0
+
+
+def cmd_duplicates(args: argparse.Namespace) -> int:
+  """List the entries sharing a symbol, or a description, with other entries."""
+  glossary = _load(_manager(args.directory), args.cache)
+  symbols, descriptions = glossary.duplicate_index.duplicates()
+  for kind, shared in (('symbol', symbols), ('description', descriptions)):
+    for key, hash_names in shared.items():
+      print(f"same {kind} {key}: {', '.join(hash_names)}")
+  return 1 if symbols or descriptions else 0
+
+
+def cmd_lookup(args: argparse.Namespace) -> int:
+  """Print entries by hash name, one tab-separated line each."""
+  glossary = _load(_manager(args.directory), args.cache)
+  found: Dict[str, Dict[str, str]] = {}
+  for hash_name in args.names:
+    entry = glossary.entries.get(hash_name)
+    if entry is None:
+      print(f"unknown entry: {hash_name}", file=sys.stderr)
+      continue
+    found[hash_name] = dict(entry)
+    if args.expand:
+      found[hash_name]['symbol'] = glossary.expand_symbol(hash_name)
+
+  if args.json:
+    import json
+    print(json.dumps(found, indent=2, ensure_ascii=False))
+  else:
+    for hash_name, entry in found.items():
+      print("\t".join((hash_name, entry['symbol'], entry['description'], entry['sort_key'])))
+  return 0 if len(found) == len(set(args.names)) else 1
+
+
+def cmd_export(args: argparse.Namespace) -> int:
+  """Write all entries in hash name order as json or csv."""
+  glossary = _load(_manager(args.directory), args.cache)
+  output = sys.stdout if args.output is None else open(args.output, 'w', encoding='utf-8', newline='')
+  try:
+    if args.format == 'csv':
+      import csv
+      writer = csv.writer(output)
+      writer.writerow(FIELDS)
+      for hash_name in glossary.sorted_keys:
+        entry = glossary.entries[hash_name]
+        writer.writerow((hash_name, entry['symbol'], entry['description'], entry['sort_key']))
+    else:
+      import json
+      entries = [{'hash_name': hash_name, **glossary.entries[hash_name]} for hash_name in glossary.sorted_keys]
+      json.dump(entries, output, indent=2, ensure_ascii=False)
+      output.write("\n")
+  finally:
+    if output is not sys.stdout:
+      output.close()
+  return 0
+
+
+def cmd_import(args: argparse.Namespace) -> int:
+  """Add the entries of a csv or json file, as export writes them, and save once."""
+  from bulk_import import import_file
+  glossary = _manager(args.directory)
+  if glossary.files.nomenclature.exists():
+    _load(glossary, args.cache)
+  try:
+    report = import_file(glossary, args.file, args.policy)
+  except (OSError, ValueError) as e:
+    raise CommandFailed(f"{args.file}: {e}")
+  for number, reason in report.errors:
+    print(f"{args.file}:{number}: {reason}", file=sys.stderr)
+  for number, hash_name in report.conflicts:
+    print(f"{args.file}:{number}: {hash_name} differs from the existing entry", file=sys.stderr)
+  print(f"added {report.added}, replaced {report.replaced}, unchanged {report.unchanged}, "
+        f"skipped {report.skipped}, invalid {len(report.errors)}")
+  if (report.added or report.replaced) and not report.saved:
+    raise CommandFailed(f"{glossary.base_dir}: the glossary cannot be saved")
+  return 1 if report.errors or (report.conflicts and args.policy == 'reject') else 0
+
+
+def cmd_merge(args: argparse.Namespace) -> int:
+  """Merge glossary directories into a new one and report the conflicting entries."""
+  from glossary_merge import format_report, merge_directories, write_merged
+  target = args.directory.resolve()
+  sources = [source.resolve() for source in args.sources]
+  if target in sources:
+    raise CommandFailed(f"{args.directory}: is one of the sources; merge into a new directory")
+  if (target / 'nomenclature.tex').exists():
+    raise CommandFailed(f"{args.directory}: holds a glossary already")
+  try:
+    result = merge_directories(sources, args.prefer, use_cache=args.cache)
+  except ValueError as e:
+    raise CommandFailed(str(e))
+  report = format_report(result)
+  if args.report is None:
+    print(report, end="")
+  else:
+    args.report.write_text(report, encoding='utf-8')
+  target.mkdir(parents=True, exist_ok=True)
+  if not write_merged(result, target):
+    raise CommandFailed(f"{args.directory}: the merged glossary cannot be written")
+  return 1 if result.conflicts or result.errors or result.malformed else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+  arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+  arg_parser.add_argument('-v', '--verbose', action='store_true', help="log what the glossary does")
+  arg_parser.add_argument('--no-cache', dest='cache', action='store_false',
+                          help="parse nomenclature.tex instead of using and refreshing the parse cache")
+  subcommands = arg_parser.add_subparsers(dest='command', required=True)
+
+  def add(name: str, handler: Callable[[argparse.Namespace], int]) -> argparse.ArgumentParser:
+    command = subcommands.add_parser(name, help=handler.__doc__.splitlines()[0])
+    command.add_argument('directory', type=Path, help="directory holding nomenclature.tex")
+    command.set_defaults(handler=handler)
+    return command
+
+  add('regenerate', cmd_regenerate).add_argument('--durable', action='store_true',
+                                                 help="fsync the written files")
+  add('validate', cmd_validate)
+  add('stats', cmd_stats).add_argument('--json', action='store_true')
+  add('duplicates', cmd_duplicates)
+  lookup = add('lookup', cmd_lookup)
+  lookup.add_argument('names', nargs='+', metavar='hash_name')
+  lookup.add_argument('--expand', action='store_true', help="expand the glossary macros in symbols")
+  lookup.add_argument('--json', action='store_true')
+  export = add('export', cmd_export)
+  export.add_argument('--format', choices=('json', 'csv'), default='json')
+  export.add_argument('-o', '--output', type=Path, help="write to this file instead of stdout")
+  bulk = add('import', cmd_import)
+  bulk.add_argument('file', type=Path, help=".csv, .json, or .jsonl file")
+  bulk.add_argument('--policy', choices=('keep', 'replace', 'reject'), default='keep',
+                    help="for entries that exist with another content: keep them, replace them "
+                         "or import nothing")
+  merge = add('merge', cmd_merge)
+  merge.add_argument('sources', nargs='+', type=Path, help="glossary directories, the preferred first")
+  merge.add_argument('--prefer', choices=('first', 'last', 'majority', 'omit'), default='first',
+                     help="which variant of a conflicting entry to merge, or none")
+  merge.add_argument('--report', type=Path, help="write the conflict report to this file instead of stdout")
+  return arg_parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+  args = build_parser().parse_args(argv)
+  import logging
+  # Configured before GlossaryManager configures it, so that only errors show by default
+  logging.basicConfig(level=logging.INFO if args.verbose else logging.ERROR,
+                      format='%(levelname)s: %(message)s')
+  try:
+    return args.handler(args)
+  except CommandFailed as e:
+    print(e, file=sys.stderr)
+    return 1
+
+
+if __name__ == "__main__":
+  sys.exit(main())
@@ -0,0 +1,66 @@
+"""
+Loading a glossary on a worker thread.
+"""
+import threading
+from typing import Tuple
+
+from PyQt6 import QtCore
+
+from models import GlossaryManager
+
+
+class GlossaryLoader(QtCore.QObject):
+  """Load a glossary into a new GlossaryManager; meant to run on a QThread.
+
+  Exactly one of loaded, failed and cancelled is emitted when run() ends.
+  """
+
+  progress = QtCore.pyqtSignal(int)  # percent of the nomenclature file parsed
+  loaded = QtCore.pyqtSignal(object)  # the GlossaryManager; see its load_errors
+  failed = QtCore.pyqtSignal(str)
+  cancelled = QtCore.pyqtSignal()
+  finished = QtCore.pyqtSignal()
+
+  def __init__(self, dir_path: str):
+    super().__init__()
+    self.dir_path = dir_path
+    self._stop = threading.Event()
+
+  def cancel(self) -> None:
+    """Ask the loader to stop; may be called from any thread."""
+    self._stop.set()
+
+  def run(self) -> None:
+    glossary = GlossaryManager(base_dir=self.dir_path)
+    try:
+      loaded = glossary.load(progress=self._report_progress, should_stop=self._stop.is_set)
+    except Exception as e:
+      self.failed.emit(str(e))
+    else:
+      if self._stop.is_set():
+        self.cancelled.emit()
+      elif loaded:
+        glossary.duplicate_index  # built here rather than on the first keystroke in the editor
+        self.loaded.emit(glossary)
+      else:
+        self.failed.emit("The glossary files are missing or unreadable. Check the log for details.")
+    self.finished.emit()
+
+  def _report_progress(self, done: int, total: int) -> None:
+    self.progress.emit(done * 100 // total if total else 100)
+
+
+def start_loading(dir_path: str, parent: QtCore.QObject) -> Tuple[QtCore.QThread, GlossaryLoader]:
+  """Start loading ``dir_path`` on a new thread owned by ``parent``.
+
+  Connect to the loader's signals right away; they are delivered to the
+  receivers' threads. The thread quits when the loader finishes.
+  """
+  thread = QtCore.QThread(parent)
+  loader = GlossaryLoader(dir_path)
+  loader.moveToThread(thread)
+  thread.started.connect(loader.run)
+  loader.finished.connect(thread.quit)
+  loader.finished.connect(loader.deleteLater)
+  thread.finished.connect(thread.deleteLater)
+  return thread, loader
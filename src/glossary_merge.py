@@ -0,0 +1,190 @@
+"""
+Merge several glossary repositories into one, reporting conflicting entries.
+
+Every entry is reduced to a content hash of its fields. An entry is kept
+whole only for the first source that has its hash name; the variants of a
+hash name are remembered only once a second source has it. Merging is thus
+linear in the total number of entries, whatever the number of sources, and
+the sources may be added in any order.
+"""
+import hashlib
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, NamedTuple, Optional, Sequence, Tuple, Union
+
+from batch_loader import load_many
+from models import GlossaryEntry, GlossaryManager
+
+# Which variant of a conflicting entry is merged
+FIRST, LAST, MAJORITY, OMIT = 'first', 'last', 'majority', 'omit'
+PREFERENCES = (FIRST, LAST, MAJORITY, OMIT)
+
+
+def entry_digest(entry: GlossaryEntry) -> bytes:
+  """Hash the content of an entry."""
+  content = "\x00".join((entry['symbol'], entry['description'], entry['sort_key']))
+  return hashlib.blake2b(content.encode('utf-8'), digest_size=16).digest()
+
+
+class Variant(NamedTuple):
+  entry: GlossaryEntry
+  sources: List[str]
+
+
+@dataclass
+class MergeConflict:
+  hash_name: str
+  variants: List[Variant]  # in the order of their first source
+  chosen: Optional[int]  # index of the merged variant, None if the entry was left out
+
+
+@dataclass
+class MergeResult:
+  entries: Dict[str, GlossaryEntry] = field(default_factory=dict)
+  unique: int = 0  # entries found in one source only
+  identical: int = 0  # entries found identical in several sources
+  conflicts: List[MergeConflict] = field(default_factory=list)  # sorted by hash name
+  errors: List[Tuple[str, str]] = field(default_factory=list)  # (source, reason) of sources not loaded
+  # (source, line number, reason) of the malformed lines skipped while loading
+  malformed: List[Tuple[str, int, str]] = field(default_factory=list)
+
+
+class GlossaryMerger:
+  """Collect the entries of several sources, then merge them with result()."""
+
+  def __init__(self, sources: Sequence[str], prefer: str = FIRST):
+    """
+    Args:
+        sources: Names of the sources, in order of preference for FIRST and LAST
+        prefer: For conflicting entries, merge the variant of the FIRST or
+            LAST source having one, the variant most sources share
+            (MAJORITY, ties going to the first), or OMIT the entry
+
+    Raises:
+        ValueError: If the preference is unknown or a source is named twice,
+            which would make it agree with itself
+    """
+    if prefer not in PREFERENCES:
+      raise ValueError(f"Unknown preference {prefer!r}, expected one of {', '.join(PREFERENCES)}")
+    twice = sorted(source for source, count in Counter(sources).items() if count > 1)
+    if twice:
+      raise ValueError(f"Sources named more than once: {', '.join(twice)}")
+    self.sources = list(sources)
+    self.prefer = prefer
+    # hash name -> (source index, digest, entry) of the first source seen having it
+    self._first: Dict[str, Tuple[int, bytes, GlossaryEntry]] = {}
+    # hash name -> digest -> (entry, source indices), for names seen in several sources
+    self._shared: Dict[str, Dict[bytes, Tuple[GlossaryEntry, List[int]]]] = {}
+    self.errors: List[Tuple[str, str]] = []
+    self.malformed: List[Tuple[str, int, str]] = []
+
+  def add(self, source: int, entries: Mapping[str, GlossaryEntry]) -> None:
+    """Add the entries of ``self.sources[source]``."""
+    first = self._first
+    shared = self._shared
+    for hash_name, entry in entries.items():
+      digest = entry_digest(entry)
+      seen = first.get(hash_name)
+      if seen is None:
+        first[hash_name] = (source, digest, dict(entry))
+        continue
+      variants = shared.get(hash_name)
+      if variants is None:
+        variants = shared[hash_name] = {seen[1]: (seen[2], [seen[0]])}
+      variant = variants.get(digest)
+      if variant is None:
+        variants[digest] = (dict(entry), [source])
+      else:
+        variant[1].append(source)
+
+  def result(self) -> MergeResult:
+    """Merge the entries added so far."""
+    result = MergeResult(errors=sorted(self.errors), malformed=sorted(self.malformed))
+    for hash_name, (_source, _digest, entry) in self._first.items():
+      variants = self._shared.get(hash_name)
+      if variants is None:
+        result.unique += 1
+        result.entries[hash_name] = entry
+      elif len(variants) == 1:
+        result.identical += 1
+        result.entries[hash_name] = entry
+      else:
+        conflict = self._resolve(hash_name, variants.values())
+        result.conflicts.append(conflict)
+        if conflict.chosen is not None:
+          result.entries[hash_name] = conflict.variants[conflict.chosen].entry
+    result.conflicts.sort(key=lambda conflict: conflict.hash_name)
+    return result
+
+  def _resolve(self, hash_name: str, variants: Iterable[Tuple[GlossaryEntry, List[int]]]) -> MergeConflict:
+    ordered = sorted(((entry, sorted(indices)) for entry, indices in variants), key=lambda variant: variant[1][0])
+    if self.prefer == FIRST:
+      chosen = 0
+    elif self.prefer == LAST:
+      chosen = max(range(len(ordered)), key=lambda i: ordered[i][1][-1])
+    elif self.prefer == MAJORITY:
+      chosen = max(range(len(ordered)), key=lambda i: (len(ordered[i][1]), -i))
+    else:
+      chosen = None
+    return MergeConflict(hash_name, [Variant(entry, [self.sources[i] for i in indices])
+                                     for entry, indices in ordered], chosen)
+
+
+def merge_glossaries(glossaries: Sequence[GlossaryManager], prefer: str = FIRST) -> MergeResult:
+  """Merge loaded glossaries, named after their directories."""
+  merger = GlossaryMerger([str(glossary.base_dir) for glossary in glossaries], prefer)
+  for i, glossary in enumerate(glossaries):
+    with glossary.lock:
+      merger.add(i, glossary.entries)
+    merger.malformed += [(merger.sources[i], number, reason) for number, _line, reason in glossary.load_errors]
+  return merger.result()
+
+
+def merge_directories(base_dirs: Sequence[Union[str, Path]], prefer: str = FIRST,
+                      max_workers: Optional[int] = None, use_cache: bool = True) -> MergeResult:
+  """Load glossary directories in parallel and merge each as soon as it is loaded.
+
+  Directories that cannot be loaded are listed in the errors of the result,
+  lines skipped while loading in its malformed lines.
+
+  Raises:
+      ValueError: If the preference is unknown or a directory is given twice,
+          also under another path
+  """
+  sources = [str(Path(base_dir).resolve()) for base_dir in base_dirs]
+  merger = GlossaryMerger(sources, prefer)
+  index = {source: i for i, source in enumerate(sources)}
+  for loaded in load_many(sources, max_workers, use_cache):
+    if loaded.glossary is None:
+      merger.errors.append((loaded.base_dir, loaded.error))
+    else:
+      merger.add(index[loaded.base_dir], loaded.glossary.entries)
+      merger.malformed += [(loaded.base_dir, number, reason)
+                           for number, _line, reason in loaded.glossary.load_errors]
+  return merger.result()
+
+
+def write_merged(result: MergeResult, base_dir: Union[str, Path]) -> bool:
+  """Write the merged entries as a new glossary in ``base_dir``."""
+  glossary = GlossaryManager(base_dir)
+  glossary.adopt_entries(result.entries)
+  glossary.mark_dirty()
+  return glossary.save()
+
+
+def format_report(result: MergeResult) -> str:
+  """Describe the conflicts and errors of a merge, one variant per line."""
+  lines = [f"{len(result.entries)} entries merged: {result.unique} unique, {result.identical} identical, "
+           f"{len(result.conflicts)} conflicting"]
+  for source, reason in result.errors:
+    lines.append(f"not merged: {source}: {reason}")
+  for source, number, reason in result.malformed:
+    lines.append(f"skipped line {number} of {source}: {reason}")
+  for conflict in result.conflicts:
+    lines.append(f"\\{conflict.hash_name}")
+    for i, (entry, sources) in enumerate(conflict.variants):
+      mark = '*' if i == conflict.chosen else ' '
+      lines.append(f"  {mark} {{{entry['symbol']}}}{{{entry['description']}}}{{{entry['sort_key']}}}"
+                   f"  from {', '.join(sources)}")
+  return "\n".join(lines) + "\n"
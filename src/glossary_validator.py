@@ -0,0 +1,136 @@
+"""
+Checks of glossary entries that otherwise fail only when LaTeX compiles the document.
+"""
+import hashlib
+from typing import Dict, Iterable, List, Mapping, NamedTuple, Optional, Tuple
+
+from macro_graph import LATEX_COMMANDS
+
+# Commands that \def\<hash name> must not redefine: TeX primitives and
+# LaTeX commands that documents and packages rely on, besides the commands
+# symbols use (macro_graph.LATEX_COMMANDS)
+RESERVED_NAMES = LATEX_COMMANDS | frozenset('''
+    def edef gdef xdef let futurelet relax par end begin input include bye dump
+    if ifx ifnum ifdim ifcase ifmmode else fi or expandafter noexpand csname endcsname string
+    the number romannumeral advance multiply divide count dimen skip toks box
+    hbox vbox vtop hskip vskip kern penalty raise lower mark char chardef mathchar
+    catcode lccode uccode sfcode mathcode delcode uppercase lowercase
+    global long outer protected immediate write read openin openout closein closeout message
+    newcommand renewcommand providecommand newenvironment DeclareMathOperator
+    documentclass usepackage section subsection chapter part paragraph label ref cite caption
+    item emph textsf texttt footnote hline vline newline linebreak
+    AA aa AE ae OE oe O o L l i j ss b c d k r t u v H P S T
+    '''.split())
+
+# Codes of the issues found
+HASH_NAME, BRACES, RESERVED, SORT_KEY = 'hash_name', 'braces', 'reserved', 'sort_key'
+
+
+class Issue(NamedTuple):
+  hash_name: str
+  code: str
+  message: str
+
+
+def _brace_problem(text: str, tex: bool) -> Optional[str]:
+  depth = 0
+  escaped = False
+  for char in text:
+    if escaped:
+      escaped = False
+    elif char == '\\' and tex:
+      escaped = True
+    elif char == '{':
+      depth += 1
+    elif char == '}':
+      depth -= 1
+      if depth < 0:
+        return "closes a brace that is not open"
+  return f"leaves {depth} brace{'s' if depth > 1 else ''} open" if depth else None
+
+
+def brace_problem(text: str) -> Optional[str]:
+  """Describe unbalanced braces in ``text``, or return None.
+
+  Braces must balance for TeX, where ``\\{`` and ``\\}`` are characters,
+  and also when every brace counts, as for the nomenclature.tex parser.
+  """
+  if '{' not in text and '}' not in text:
+    return None
+  problem = _brace_problem(text, tex=True)
+  if problem is None and _brace_problem(text, tex=False):
+    problem = "has \\{ and \\} that do not pair up, which nomenclature.tex cannot hold"
+  return problem
+
+
+def check_entry(hash_name: str, entry: Mapping[str, str]) -> Tuple[Issue, ...]:
+  """Run every check on one entry."""
+  issues = []
+  if not (hash_name.isascii() and hash_name.isalnum() and hash_name[:1].isalpha()):
+    issues.append(Issue(hash_name, HASH_NAME, "is not a valid macro name (^[a-zA-Z][a-zA-Z0-9]*$)"))
+  elif hash_name in RESERVED_NAMES:
+    issues.append(Issue(hash_name, RESERVED, f"\\def\\{hash_name} redefines a LaTeX command"))
+  for field in ('symbol', 'description', 'sort_key'):
+    problem = brace_problem(entry[field])
+    if problem:
+      issues.append(Issue(hash_name, BRACES, f"the {field} {problem}"))
+  if not entry['sort_key'].strip():
+    issues.append(Issue(hash_name, SORT_KEY, "has no sort key"))
+  return tuple(issues)
+
+
+def _digest(hash_name: str, entry: Mapping[str, str]) -> bytes:
+  content = "\x00".join((hash_name, entry['symbol'], entry['description'], entry['sort_key']))
+  return hashlib.blake2b(content.encode('utf-8'), digest_size=16).digest()
+
+
+class EntryValidator:
+  """Validate all entries of a glossary, checking each content only once.
+
+  Results are cached by a hash of the entry's name and fields. Given the
+  hash names changed since the previous run, only those are looked at;
+  otherwise every entry is hashed, but only contents not seen before are
+  checked.
+  """
+
+  def __init__(self):
+    self._by_digest: Dict[bytes, Tuple[Issue, ...]] = {}
+    self._issues_of: Dict[str, Tuple[Issue, ...]] = {}  # entries with issues only
+    self.checked = 0  # entries checked, rather than found in the cache, by the last run
+
+  def validate(self, entries: Mapping[str, Mapping[str, str]],
+               changed: Optional[Iterable[str]] = None) -> List[Issue]:
+    """Return the issues of all entries, sorted by hash name.
+
+    Args:
+        entries: The entries
+        changed: The hash names added, changed or deleted since the previous
+            run, or None to look at every entry
+    """
+    self.checked = 0
+    if changed is None:
+      cached = self._by_digest
+      self._by_digest = {}  # keep only the results of current contents
+      self._issues_of = {}
+      for hash_name, entry in entries.items():
+        self._update(hash_name, entry, cached)
+    else:
+      for hash_name in changed:
+        entry = entries.get(hash_name)
+        if entry is None:
+          self._issues_of.pop(hash_name, None)
+        else:
+          self._update(hash_name, entry, self._by_digest)
+    return [issue for hash_name in sorted(self._issues_of) for issue in self._issues_of[hash_name]]
+
+  def _update(self, hash_name: str, entry: Mapping[str, str], cached: Dict[bytes, Tuple[Issue, ...]]) -> None:
+    digest = _digest(hash_name, entry)
+    issues = cached.get(digest)
+    if issues is None:
+      issues = check_entry(hash_name, entry)
+      self.checked += 1
+    self._by_digest[digest] = issues
+    if issues:
+      self._issues_of[hash_name] = issues
+    else:
+      self._issues_of.pop(hash_name, None)
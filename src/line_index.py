@@ -0,0 +1,125 @@
+"""
+Line-offset index of a nomenclature file for incremental reloads.
+
+Every entry is indexed by the byte range and content hash of the line it was
+read from. When the file changes, lines whose hash is already known are
+skipped and only the remaining ones are parsed.
+"""
+import hashlib
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, AbstractSet, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from nomenclature_parser import format_line, iter_lines, parse_line
+
+if TYPE_CHECKING:
+  from models import GlossaryEntry
+
+
+class IndexRecord(NamedTuple):
+  start: int
+  end: int
+  line_hash: bytes
+
+
+@dataclass
+class GlossaryDelta:
+  added: List[str] = field(default_factory=list)
+  changed: List[str] = field(default_factory=list)
+  removed: List[str] = field(default_factory=list)
+  # Entries with unsaved edits that the file changed as well; the edits are kept
+  conflicts: List[str] = field(default_factory=list)
+
+  def __bool__(self) -> bool:
+    return bool(self.added or self.changed or self.removed)
+
+
+def line_hash(raw: bytes) -> bytes:
+  """Hash a raw line, ignoring surrounding whitespace and the line terminator."""
+  return hashlib.blake2b(raw.strip(), digest_size=16).digest()
+
+
+def reindex(path: Path,
+            entries: Dict[str, 'GlossaryEntry'],
+            index: Optional[Dict[str, IndexRecord]],
+            use_mmap: bool = False,
+            on_error: Optional[Callable[[int, str, str], None]] = None,
+            pending: AbstractSet[str] = frozenset()
+            ) -> Tuple[GlossaryDelta, Dict[str, 'GlossaryEntry'], Dict[str, IndexRecord]]:
+  """Compare the file against ``entries``, parsing only lines that are not in the index.
+
+  Args:
+      path: The nomenclature file
+      entries: The entries currently held in memory
+      index: The index of the previous scan, or None to assume the file was
+          written from ``entries``
+      use_mmap: Map the file into memory instead of reading it through a buffer
+      on_error: Optional callback receiving (line number, line, reason) of malformed lines
+      pending: Hash names with unsaved edits, added, changed or deleted;
+          their entries are left as they are, and listed as conflicts where
+          the file changed them since the previous scan
+
+  Returns:
+      The delta, the new or changed entries to apply, and the new index
+  """
+  if index is None:
+    known = {line_hash(format_line(hash_name, entry).encode('utf-8')): hash_name
+             for hash_name, entry in entries.items()}
+  else:
+    known = {record.line_hash: hash_name for hash_name, record in index.items()}
+
+  new_index = {}
+  parsed = {}  # hash name -> parsed entry, or None if its line is unchanged or the entry pending
+  conflicts = set()
+  for number, (start, end, raw) in enumerate(iter_lines(path, use_mmap), 1):
+    digest = line_hash(raw)
+    hash_name = known.get(digest)
+    if hash_name is not None and hash_name in entries:
+      parsed[hash_name] = None
+      new_index[hash_name] = IndexRecord(start, end, digest)
+      continue
+
+    line = raw.decode('utf-8').strip()
+    if not line or line.startswith('%'):
+      continue
+    try:
+      hash_name, symbol, description, sort_key = parse_line(line)
+    except ValueError as e:
+      if on_error is not None:
+        on_error(number, line, str(e))
+      continue
+    entry = {
+            'symbol'     : symbol,
+            'description': description,
+            'sort_key'   : sort_key
+            }
+    if hash_name in pending:
+      if index is not None and digest not in known and entries.get(hash_name) != entry:
+        conflicts.add(hash_name)
+      entry = None
+    parsed[hash_name] = entry
+    new_index[hash_name] = IndexRecord(start, end, digest)
+
+  delta = GlossaryDelta()
+  updates = {}
+  for hash_name, entry in parsed.items():
+    if entry is None:
+      continue
+    current = entries.get(hash_name)
+    if current is None:
+      delta.added.append(hash_name)
+    elif current != entry:
+      delta.changed.append(hash_name)
+    else:
+      continue
+    updates[hash_name] = entry
+  for hash_name in entries:
+    if hash_name in parsed:
+      continue
+    if hash_name not in pending:
+      delta.removed.append(hash_name)
+    elif index is not None and hash_name in index:
+      conflicts.add(hash_name)  # deleted from the file
+  delta.removed.sort()
+  delta.conflicts = sorted(conflicts)
+  return delta, updates, new_index
@@ -20,12 +20,13 @@ class Ui_Dialog(object):
         Dialog.setSizePolicy(sizePolicy)
         Dialog.setToolTip("")
         Dialog.setWhatsThis("")
-        self.listMacros = QtWidgets.QListWidget(parent=Dialog)
+        self.listMacros = QtWidgets.QListView(parent=Dialog)
         self.listMacros.setGeometry(QtCore.QRect(10, 130, 321, 621))
         self.listMacros.setMaximumSize(QtCore.QSize(2000, 2000))
         self.listMacros.setSizeIncrement(QtCore.QSize(200, 200))
         self.listMacros.setToolTip("")
         self.listMacros.setWhatsThis("")
+        self.listMacros.setUniformItemSizes(True)
         self.listMacros.setObjectName("listMacros")
         self.horizontalLayoutWidget = QtWidgets.QWidget(parent=Dialog)
         self.horizontalLayoutWidget.setGeometry(QtCore.QRect(10, 30, 321, 80))
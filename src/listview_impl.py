@@ -8,13 +8,17 @@ Created on 8 Apr 2015
 from PyQt6 import QtCore
 from PyQt6 import QtWidgets
 from PyQt6.QtWidgets import QApplication
-from PyQt6.QtWidgets import QListWidgetItem
 
+from filter_worker import FilterWorker
 from listview import Ui_Dialog
+from macro_list_model import MacroFilterProxyModel
+from macro_list_model import MacroListModel
 
 
 class UI_ListView(QtWidgets.QDialog):
     newSelection = QtCore.pyqtSignal(str)
+    # Emitted from the filter thread; queued to the GUI thread
+    filtered = QtCore.pyqtSignal(int, str, object)
 
     def __init__(self, pattern="%s", parent=None):
         super().__init__(parent)
@@ -25,23 +29,34 @@ class UI_ListView(QtWidgets.QDialog):
         self.ui.listMacros.setToolTip("select macro --> clipboard")
         self.setWindowTitle("List View")
 
-        # Connect the search functionality
-        self.ui.lineEdit.textChanged.connect(self.filter_items)
-        self.original_items = []  # Store the original list of items
+        # The view only asks the proxy for the rows it paints
+        self.proxy = MacroFilterProxyModel(self)
+        self.ui.listMacros.setModel(self.proxy)
+
+        # Connect the search functionality: typing is debounced and
+        # matched off the GUI thread, only the last result is shown
+        self._filter_worker = FilterWorker(self.proxy.search, self.filtered.emit)
+        # The thread would outlive the dialog and emit on a deleted object
+        self.destroyed.connect(lambda _obj=None, worker=self._filter_worker: worker.shutdown())
+        self.filtered.connect(self._on_filtered)
+        self.ui.lineEdit.textChanged.connect(self._schedule_filter)
 
     def build(self, macro_list):
-        self.ui.listMacros.clear()
-        self.original_items = macro_list.copy()  # Save the original list
-        self.no_items = len(macro_list)
-        if self.no_items > 50:
-            self.no_items = 50
-        self.max_letters = 0
-        for i in macro_list:
-            _item = QListWidgetItem()
-            _item.setText(i)
-            self.ui.listMacros.addItem(_item)
-            if len(i) > self.max_letters:
-                self.max_letters = len(i)
+        """Show a fixed list of macros."""
+        model = MacroListModel(self)
+        model.set_keys(macro_list)
+        self.open_model(model)
+
+    def open_model(self, model):
+        """Show the macros of ``model``, which may be shared between openings.
+
+        Reopening with the same, unchanged model creates nothing new.
+        """
+        self._filter_worker.cancel()
+        self.proxy.set_source_model(model)
+        self.ui.lineEdit.clear()
+        self.no_items = min(model.rowCount(), 50)
+        self.max_letters = model.max_length
         self.__resizeMe()
         self.show()
 
@@ -58,30 +73,38 @@ class UI_ListView(QtWidgets.QDialog):
         self.resize(s)
 
     def filter_items(self, search_text):
-        """Filter the list to show only items containing the search text."""
-        search_text = search_text.lower()
+        """Filter the list to show only items matching the search text, right away."""
+        self._filter_worker.cancel()
+        self._show_filtered(search_text, self.proxy.search(search_text))
 
-        # If search is empty, show all items
-        if not search_text.strip():
-            for i in range(self.ui.listMacros.count()):
-                self.ui.listMacros.item(i).setHidden(False)
-            return
+    def _schedule_filter(self, search_text):
+        if search_text.strip():
+            self._filter_worker.submit(search_text)
+        else:
+            self.filter_items(search_text)  # showing everything needs no search
 
-        # Show/hide items based on search
-        for i in range(self.ui.listMacros.count()):
-            item = self.ui.listMacros.item(i)
-            item_text = item.text().lower()
-            item.setHidden(search_text not in item_text)
+    def _on_filtered(self, generation, search_text, rows):
+        if generation == self._filter_worker.generation:
+            self._show_filtered(search_text, rows)
+
+    def _show_filtered(self, search_text, rows):
+        self.proxy.set_rows(search_text, rows)
 
         # Optional: Select first visible item
-        for i in range(self.ui.listMacros.count()):
-            if not self.ui.listMacros.item(i).isHidden():
-                self.ui.listMacros.setCurrentRow(i)
-                break
+        if search_text.strip() and self.proxy.rowCount():
+            self.ui.listMacros.setCurrentIndex(self.proxy.index(0))
+
+    def closeEvent(self, event):
+        self._filter_worker.cancel()
+        super().closeEvent(event)
+
+    def shutdown(self):
+        """Stop filtering for good; the dialog is not opened again."""
+        self._filter_worker.shutdown()
 
-    def on_listMacros_itemClicked(self, _item):
-        _s = str(_item.text())
+    def on_listMacros_clicked(self, index):
+        _s = self.proxy.key(index.row())
         a = self.pattern % _s
         self.clipboard.clear()
         self.clipboard.setText(a)
-        self.newSelection.emit(_s)
\ No newline at end of file
+        self.newSelection.emit(_s)
@@ -0,0 +1,225 @@
+"""
+Dependency graph of the macros a glossary defines.
+
+The symbol of an entry may use the macros of other entries, as
+``\\NomenclaturEntry{qTemp}{\\temperature^2}{...}{T}`` uses ``\\temperature``.
+"""
+import re
+from typing import Dict, FrozenSet, Iterable, List, Mapping, Optional, Set
+
+# Macro names such as \temperature, spelled like hash names (^[a-zA-Z][a-zA-Z0-9]*$);
+# control symbols (\{, \,) cannot name entries
+MACRO_REFERENCE = re.compile(r'\\([a-zA-Z][a-zA-Z0-9]*)')
+
+# Commands that symbols use without the glossary defining them. A reference
+# to anything else that is not an entry is reported as missing.
+LATEX_COMMANDS = frozenset('''
+    Var gls
+    alpha beta gamma delta epsilon varepsilon zeta eta theta vartheta iota kappa lambda mu nu xi
+    pi varpi rho varrho sigma varsigma tau upsilon phi varphi chi psi omega
+    Gamma Delta Theta Lambda Xi Pi Sigma Upsilon Phi Psi Omega
+    hat widehat bar overline tilde widetilde dot ddot vec check breve acute grave underline
+    overrightarrow overleftarrow
+    mathbf mathrm mathit mathsf mathtt mathcal mathbb mathfrak boldsymbol text textrm textit
+    textbf operatorname
+    frac dfrac tfrac sqrt sum prod int oint partial nabla infty cdot cdots ldots times div pm mp
+    left right big Big bigg Bigg langle rangle lvert rvert lVert rVert
+    leq geq neq approx equiv sim propto in notin subset cup cap to rightarrow leftarrow mapsto
+    prime ell hbar Re Im exp ln log sin cos tan min max lim det
+    quad qquad
+    '''.split())
+
+
+def references(symbol: str) -> FrozenSet[str]:
+  """Return the names of the macros a symbol uses."""
+  return frozenset(MACRO_REFERENCE.findall(symbol))
+
+
+class MacroGraph:
+  """Which entries each symbol references, kept up to date entry by entry.
+
+  Updating an entry costs O(references of its old and new symbol). Missing
+  targets are tracked under the same updates; cycles are looked for from
+  the changed entry only, through the entries it reaches.
+  """
+
+  def __init__(self, entries: Optional[Mapping[str, Mapping[str, str]]] = None,
+               known_commands: Iterable[str] = LATEX_COMMANDS):
+    self.known_commands = frozenset(known_commands)
+    self._references: Dict[str, FrozenSet[str]] = {}  # entry -> macros its symbol uses
+    self._referenced_by: Dict[str, Set[str]] = {}  # macro -> entries using it, defined or not
+    self._missing: Set[str] = set()  # referenced macros that are neither entries nor known
+    for hash_name, entry in (entries or {}).items():
+      self.set(hash_name, entry['symbol'])
+
+  def __contains__(self, hash_name: object) -> bool:
+    return hash_name in self._references
+
+  def __len__(self) -> int:
+    return len(self._references)
+
+  def set(self, hash_name: str, symbol: str) -> None:
+    """Add an entry or change its symbol."""
+    new = references(symbol)
+    old = self._references.get(hash_name)
+    self._references[hash_name] = new
+    if old is None:
+      self._missing.discard(hash_name)  # defined now
+    else:
+      for target in old - new:
+        self._unlink(hash_name, target)
+      new = new - old
+    for target in new:
+      self._referenced_by.setdefault(target, set()).add(hash_name)
+      if target not in self._references and target not in self.known_commands:
+        self._missing.add(target)
+
+  def remove(self, hash_name: str) -> bool:
+    """Remove an entry; returns False if it was not in the graph."""
+    old = self._references.pop(hash_name, None)
+    if old is None:
+      return False
+    for target in old:
+      self._unlink(hash_name, target)
+    if hash_name in self._referenced_by and hash_name not in self.known_commands:
+      self._missing.add(hash_name)  # still used by other entries
+    return True
+
+  def _unlink(self, hash_name: str, target: str) -> None:
+    users = self._referenced_by[target]
+    users.discard(hash_name)
+    if not users:
+      del self._referenced_by[target]
+      self._missing.discard(target)
+
+  def dependencies(self, hash_name: str) -> Set[str]:
+    """Return the entries the symbol of ``hash_name`` uses."""
+    return {target for target in self._references.get(hash_name, ()) if target in self._references}
+
+  def dependents(self, hash_name: str) -> Set[str]:
+    """Return the entries whose symbols use ``hash_name``."""
+    return set(self._referenced_by.get(hash_name, ()))
+
+  def transitive_dependents(self, hash_names: Iterable[str]) -> Set[str]:
+    """Return the entries using any of ``hash_names``, directly or through other entries."""
+    found: Set[str] = set()
+    stack = list(hash_names)
+    while stack:
+      for user in self._referenced_by.get(stack.pop(), ()):
+        if user not in found:
+          found.add(user)
+          stack.append(user)
+    return found
+
+  def missing(self) -> Dict[str, List[str]]:
+    """Return every macro that is used but not defined, with the entries using it."""
+    return {target: sorted(self._referenced_by[target]) for target in sorted(self._missing)}
+
+  def missing_references(self, hash_name: str) -> List[str]:
+    """Return the undefined macros the symbol of ``hash_name`` uses."""
+    return sorted(self._references.get(hash_name, frozenset()) & self._missing)
+
+  def find_cycle(self, hash_name: str) -> Optional[List[str]]:
+    """Return a cycle through ``hash_name`` as [hash_name, ..., hash_name], or None."""
+    if hash_name not in self._references:
+      return None
+    parents: Dict[str, str] = {}
+    stack = [hash_name]
+    while stack:
+      current = stack.pop()
+      for target in self._references.get(current, ()):
+        if target == hash_name:
+          path = [current]
+          while path[-1] != hash_name:
+            path.append(parents[path[-1]])
+          return path[::-1] + [hash_name]
+        if target in self._references and target not in parents:
+          parents[target] = current
+          stack.append(target)
+    return None
+
+  def cycles(self) -> List[List[str]]:
+    """Return the strongly connected groups of entries that use each other, each sorted."""
+    index: Dict[str, int] = {}
+    low: Dict[str, int] = {}
+    on_stack: Set[str] = set()
+    stack: List[str] = []
+    groups = []
+    for root in sorted(self._references):
+      if root in index:
+        continue
+      # Iterative Tarjan: (node, iterator over its dependencies)
+      work = [(root, iter(sorted(self.dependencies(root))))]
+      index[root] = low[root] = len(index)
+      stack.append(root)
+      on_stack.add(root)
+      while work:
+        node, targets = work[-1]
+        for target in targets:
+          if target not in index:
+            index[target] = low[target] = len(index)
+            stack.append(target)
+            on_stack.add(target)
+            work.append((target, iter(sorted(self.dependencies(target)))))
+            break
+          if target in on_stack:
+            low[node] = min(low[node], index[target])
+        else:
+          work.pop()
+          if work:
+            parent = work[-1][0]
+            low[parent] = min(low[parent], low[node])
+          if low[node] == index[node]:
+            group = []
+            while True:
+              member = stack.pop()
+              on_stack.discard(member)
+              group.append(member)
+              if member == node:
+                break
+            if len(group) > 1 or node in self._references[node]:
+              groups.append(sorted(group))
+    return groups
+
+  def ordered(self, keys: Iterable[str]) -> List[str]:
+    """Order ``keys`` so that every entry follows the entries it uses.
+
+    Otherwise the order of ``keys`` is kept, so sorted keys stay sorted
+    where no dependency requires a change. Entries on a cycle keep an
+    arbitrary order among themselves.
+    """
+    keys = list(keys)
+    users = self._entries_using_entries()
+    if not users:
+      return keys
+
+    placed: Set[str] = set()
+    ordered = []
+    for key in keys:
+      if key in placed:
+        continue
+      placed.add(key)
+      if key not in users:
+        ordered.append(key)
+        continue
+      # Depth first: emit the dependencies of an entry before the entry
+      work = [(key, iter(sorted(self.dependencies(key))))]
+      while work:
+        node, targets = work[-1]
+        for target in targets:
+          if target not in placed:
+            placed.add(target)
+            work.append((target, iter(sorted(self.dependencies(target)))))
+            break
+        else:
+          work.pop()
+          ordered.append(node)
+    return ordered
+
+  def _entries_using_entries(self) -> Set[str]:
+    """Return the entries that use at least one other entry."""
+    users: Set[str] = set()
+    for target, referencing in self._referenced_by.items():
+      if target in self._references:
+        users.update(referencing)
+    return users
@@ -0,0 +1,200 @@
+"""
+Lazy list models for the macro picker.
+
+The view asks the model only for the rows it paints, so opening the list
+costs the same for ten or a million macros. Filtering is done by a proxy
+that maps its rows to the source rows found by a search: a ranked fuzzy
+search over all fields for the keys of a glossary, followed by the keys
+containing the text, or only the substring search for a plain list of keys.
+"""
+import threading
+from typing import Dict, List, Optional, Sequence
+
+from PyQt6 import QtCore
+
+from fuzzy_search import FuzzySearchIndex, merge_substring_hits
+from models import GlossaryManager
+from search_index import SubstringIndex
+
+
+class MacroListModel(QtCore.QAbstractListModel):
+  """Hash names in display order, served on demand to the view."""
+
+  # Most rows a ranked search shows
+  RESULT_LIMIT = 200
+
+  def __init__(self, parent: Optional[QtCore.QObject] = None):
+    super().__init__(parent)
+    self._keys: List[str] = []
+    self._search_index: Optional[SubstringIndex] = None
+    self._rows_by_key: Optional[Dict[str, int]] = None
+    self._index_lock = threading.Lock()  # search may run on a worker thread
+    self._synced_with = None  # (SortedKeyIndex, version) the keys were copied from
+    self.max_length = 0
+    # Ranked search over the glossary last synced with; it is brought up to
+    # date on the searching thread, never on the one syncing
+    self._glossary: Optional[GlossaryManager] = None
+    self._fuzzy: Optional[FuzzySearchIndex] = None
+    self._fuzzy_source = None  # (glossary, revision) the ranked index reflects
+    self._fuzzy_lock = threading.Lock()
+
+  def set_keys(self, keys: Sequence[str]) -> None:
+    """Replace the hash names shown; they are searched as plain substrings."""
+    self._set_keys(keys)
+    self._glossary = None
+
+  def _set_keys(self, keys: Sequence[str]) -> None:
+    self.beginResetModel()
+    with self._index_lock:
+      self._keys = list(keys)
+      self._search_index = None
+      self._rows_by_key = None
+    self._synced_with = None
+    self.max_length = max(map(len, self._keys), default=0)
+    self.endResetModel()
+
+  def sync(self, glossary: GlossaryManager) -> bool:
+    """Show the keys of a glossary, copying them unless unchanged since the last sync.
+
+    Returns:
+        Whether the model was reset
+    """
+    self._glossary = glossary
+    sorted_keys = glossary.sorted_keys
+    if self._synced_with == (sorted_keys, sorted_keys.version):
+      return False
+    self._set_keys(list(sorted_keys))
+    self._synced_with = (sorted_keys, sorted_keys.version)
+    return True
+
+  def key(self, row: int) -> str:
+    return self._keys[row]
+
+  def search(self, text: str) -> List[int]:
+    """Return the rows matching ``text``, best first for a glossary.
+
+    The indexes are built on first use. Safe to call from another thread
+    than the one changing the keys.
+    """
+    glossary = self._glossary
+    with self._index_lock:
+      if self._search_index is None:
+        self._search_index = SubstringIndex(self._keys)
+      index = self._search_index
+      keys = self._keys
+    if glossary is None:
+      return index.search(text)
+
+    ranked = self._fuzzy_index(glossary).search(text, self.RESULT_LIMIT)
+    results = merge_substring_hits(ranked, (keys[row] for row in index.search(text)), self.RESULT_LIMIT)
+    with self._index_lock:
+      if self._rows_by_key is None:
+        self._rows_by_key = {key: row for row, key in enumerate(self._keys)}
+      rows_by_key = self._rows_by_key
+    return [rows_by_key[key] for key, _score in results if key in rows_by_key]
+
+  def _fuzzy_index(self, glossary: GlossaryManager) -> FuzzySearchIndex:
+    """Return the ranked index of ``glossary``, updated with its changes since last time."""
+    with self._fuzzy_lock:
+      if self._fuzzy_source == (glossary, glossary.revision):
+        return self._fuzzy
+      with glossary.lock:
+        revision = glossary.revision
+        changed = None
+        if self._fuzzy_source is not None and self._fuzzy_source[0] is glossary:
+          changed = glossary.changes_since(self._fuzzy_source[1])
+        if changed is None:
+          entries = glossary.entries.copy()
+        else:
+          entries = {hash_name: glossary.entries.get(hash_name) for hash_name in changed}
+
+      if changed is None:
+        self._fuzzy = FuzzySearchIndex(entries)
+      else:
+        for hash_name, entry in entries.items():
+          if entry is None:
+            self._fuzzy.remove(hash_name)
+          else:
+            self._fuzzy.add(hash_name, entry)
+      self._fuzzy_source = (glossary, revision)
+      return self._fuzzy
+
+  def rowCount(self, parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> int:
+    return 0 if parent.isValid() else len(self._keys)
+
+  def data(self, index: QtCore.QModelIndex, role: int = QtCore.Qt.ItemDataRole.DisplayRole):
+    if index.isValid() and role == QtCore.Qt.ItemDataRole.DisplayRole:
+      return self._keys[index.row()]
+    return None
+
+
+class MacroFilterProxyModel(QtCore.QAbstractListModel):
+  """Rows of a MacroListModel that match the filter text, in the order found.
+
+  Unlike QSortFilterProxyModel, which calls filterAcceptsRow once per source
+  row, the accepted rows come from the source's search index in one call.
+  """
+
+  def __init__(self, parent: Optional[QtCore.QObject] = None):
+    super().__init__(parent)
+    self._source: Optional[MacroListModel] = None
+    self._rows: Optional[List[int]] = None  # None: no filter, every row accepted
+    self._filter_text = ''
+
+  def set_source_model(self, source: MacroListModel) -> None:
+    if source is self._source:
+      return
+    if self._source is not None:
+      self._source.modelReset.disconnect(self._on_source_reset)
+    self.beginResetModel()
+    self._source = source
+    self._rows = None
+    self._filter_text = ''
+    self.endResetModel()
+    source.modelReset.connect(self._on_source_reset)
+
+  def set_filter(self, text: str) -> None:
+    """Show only rows matching ``text``; blank text shows all."""
+    self.set_rows(text, self.search(text))
+
+  def search(self, text: str) -> Optional[List[int]]:
+    """Return the source rows to show for ``text`` without applying them; None shows all."""
+    source = self._source
+    if source is None or not text.strip():
+      return None
+    return source.search(text)
+
+  def set_rows(self, text: str, rows: Optional[List[int]]) -> None:
+    """Apply rows found by search() for ``text``."""
+    self.beginResetModel()
+    self._filter_text = text
+    self._rows = rows
+    self.endResetModel()
+
+  def _on_source_reset(self) -> None:
+    self.set_filter(self._filter_text)
+
+  def key(self, row: int) -> str:
+    return self._source.key(self.source_row(row))
+
+  def source_row(self, row: int) -> int:
+    return row if self._rows is None else self._rows[row]
+
+  def proxy_row(self, source_row: int) -> int:
+    """Return the row showing ``source_row``, or -1 if it is filtered out."""
+    if self._rows is None:
+      return source_row
+    try:
+      return self._rows.index(source_row)
+    except ValueError:
+      return -1
+
+  def rowCount(self, parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> int:
+    if parent.isValid() or self._source is None:
+      return 0
+    return self._source.rowCount() if self._rows is None else len(self._rows)
+
+  def data(self, index: QtCore.QModelIndex, role: int = QtCore.Qt.ItemDataRole.DisplayRole):
+    if index.isValid() and role == QtCore.Qt.ItemDataRole.DisplayRole:
+      return self.key(index.row())
+    return None
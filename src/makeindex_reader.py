@@ -0,0 +1,154 @@
+"""
+Streaming readers for the makeindex files of a nomenclature.
+
+LaTeX writes one record per use of an entry to the ``.ndn`` file::
+
+    \\glossaryentry{T?\\glossentry{temperature}|setentrycounter[]{page}\\glsnumberformat}{1}
+
+makeindex sorts and merges them into the ``.nld`` file, one
+``\\glossentry{temperature}{\\glossaryentrynumbers{...}}`` block per entry.
+Both are read line by line; memory grows with the number of distinct
+(entry, page) pairs only.
+"""
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Mapping, NamedTuple, Optional, Tuple, Union
+
+# The makeindex characters of the glossaries package style (see the .ist file)
+ACTUAL, ENCAP, LEVEL, QUOTE = '?', '|', '!', '"'
+
+_NDN_RECORD = re.compile(r'\\glossaryentry\{(.*)\}\{([^{}]*)\}\s*$')
+# The entry of the last level: \glossentry{name} or \subglossentry{level}{name}
+_ENTRY = re.compile(r'\\(?:sub)?glossentry(?:\{\d+\})?\{([^{}]+)\}')
+_NLD_START = re.compile(r'\\(?:sub)?glossentry(?:\{\d+\})?\{([^{}]+)\}\{')
+_NLD_PAGE = re.compile(r'\\setentrycounter\[[^\]]*\]\{[^{}]*\}\\[a-zA-Z]+\{([^{}]*)\}')
+
+
+class UsageRecord(NamedTuple):
+  hash_name: str
+  page: str
+  encap: str  # formatting of the page number, with '(' or ')' opening or closing a range
+  line: int
+
+
+@dataclass
+class EntryUsage:
+  # Pages in the order first seen, as a dict used as an ordered set
+  pages: Dict[str, None] = field(default_factory=dict)
+  count: int = 0  # number of references; in a .nld file, of distinct pages
+
+  def add(self, page: str) -> None:
+    self.pages[page] = None
+    self.count += 1
+
+
+def _split_unquoted(text: str, separator: str) -> Tuple[str, Optional[str]]:
+  """Split at the first ``separator`` that makeindex's quote character does not escape."""
+  i = 0
+  while i < len(text):
+    char = text[i]
+    if char == QUOTE:
+      i += 2
+      continue
+    if char == separator:
+      return text[:i], text[i + 1:]
+    i += 1
+  return text, None
+
+
+def iter_ndn_records(path: Union[str, Path],
+                     on_error: Optional[Callable[[int, str, str], None]] = None) -> Iterator[UsageRecord]:
+  """Stream the records of a .ndn file.
+
+  Args:
+      path: The .ndn file
+      on_error: Optional callback receiving (line number, line, reason) of unreadable lines
+  """
+  with open(path, encoding='utf-8', errors='replace') as f:
+    for number, line in enumerate(f, 1):
+      line = line.strip()
+      if not line:
+        continue
+      record = _NDN_RECORD.match(line)
+      if record is None:
+        if on_error is not None:
+          on_error(number, line, "Not a \\glossaryentry record")
+        continue
+      key, page = record.groups()
+      key, encap = _split_unquoted(key, ENCAP)
+      actual = _split_unquoted(key.rsplit(LEVEL, 1)[-1], ACTUAL)[1] or key
+      entries = _ENTRY.findall(actual)
+      if not entries:
+        if on_error is not None:
+          on_error(number, line, "No \\glossentry in the record")
+        continue
+      yield UsageRecord(entries[-1], page, encap or '', number)
+
+
+def read_ndn(path: Union[str, Path],
+             on_error: Optional[Callable[[int, str, str], None]] = None) -> Dict[str, EntryUsage]:
+  """Aggregate the records of a .ndn file into the pages and number of uses of each entry."""
+  usage: Dict[str, EntryUsage] = {}
+  for record in iter_ndn_records(path, on_error):
+    entry_usage = usage.get(record.hash_name)
+    if entry_usage is None:
+      entry_usage = usage[record.hash_name] = EntryUsage()
+    entry_usage.add(record.page)
+  return usage
+
+
+def _block_end(text: str, depth: int) -> Tuple[int, int]:
+  """Return where the braces open at ``depth`` close in ``text`` (-1 if not there) and the depth reached."""
+  for i, char in enumerate(text):
+    if char == '{':
+      depth += 1
+    elif char == '}':
+      depth -= 1
+      if depth == 0:
+        return i, 0
+  return -1, depth
+
+
+def read_nld(path: Union[str, Path]) -> Dict[str, EntryUsage]:
+  """Read the pages of every entry from a .nld file written by makeindex."""
+  usage: Dict[str, EntryUsage] = {}
+  hash_name = None
+  block: List[str] = []  # the entry's page list, possibly spread over lines
+  depth = 0
+  with open(path, encoding='utf-8', errors='replace') as f:
+    for line in f:
+      while line:
+        if hash_name is None:
+          start = _NLD_START.search(line)
+          if start is None:
+            break
+          hash_name, line, depth = start.group(1), line[start.end():], 1
+        end, depth = _block_end(line, depth)
+        if end < 0:
+          block.append(line)
+          break
+        block.append(line[:end])
+        entry_usage = usage.setdefault(hash_name, EntryUsage())
+        for page in _NLD_PAGE.findall("".join(block)):
+          entry_usage.add(page)
+        hash_name, block, line = None, [], line[end + 1:]
+  return usage
+
+
+def read_usage(path: Union[str, Path]) -> Dict[str, EntryUsage]:
+  """Read a .ndn or a .nld file, chosen by its suffix."""
+  return read_nld(path) if Path(path).suffix == '.nld' else read_ndn(path)
+
+
+def map_to_entries(usage: Mapping[str, EntryUsage],
+                   entries: Mapping[str, object]) -> Tuple[Dict[str, EntryUsage], List[str]]:
+  """Map usage onto glossary entries, e.g. ``GlossaryManager.entries``.
+
+  Returns:
+      The usage of every entry, empty for unused ones, and the names used
+      in the document that are not entries
+  """
+  mapped = {hash_name: usage.get(hash_name) or EntryUsage() for hash_name in entries}
+  unknown = sorted(hash_name for hash_name in usage if hash_name not in entries)
+  return mapped, unknown
@@ -1,8 +1,26 @@
+import hashlib
+import os
+import shutil
+import threading
+from collections import deque
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Optional, TypedDict
+from typing import TYPE_CHECKING, Callable, Deque, Dict, Iterable, Iterator, List, MutableMapping, Optional, Set, Tuple, TypedDict
 import logging
 
+from entry_store import ColumnarEntryStore
+from line_index import GlossaryDelta, IndexRecord, reindex
+from nomenclature_parser import ParsedEntry, format_line, iter_entries, parse_line
+from parse_cache import Fingerprint, fingerprint, read_cache, write_cache
+from sorted_index import SortedKeyIndex
+
+if TYPE_CHECKING:
+  # Imported where the indexes are first built, so loading a glossary does not pay for them
+  from glossary_validator import EntryValidator, Issue
+  from macro_graph import MacroGraph
+  from symbol_index import DuplicateIndex
+  from symbol_resolver import SymbolResolver
+
 
 class GlossaryEntry(TypedDict):
   symbol: str
@@ -16,21 +34,71 @@ class GlossaryFiles:
   def_vars: Path
   macros: Path
   log: Path
+  cache: Path
+  journal: Path
 
 
 class GlossaryManager:
-  def __init__(self, base_dir: Path):
+  # Number of recent changes changes_since() can report
+  CHANGE_LOG_SIZE = 10000
+  # Entries parsed between two progress reports of load()
+  PROGRESS_INTERVAL = 2000
+
+  def __init__(self, base_dir: Path, compact: bool = False):
+    """
+    Args:
+        base_dir: Directory holding the glossary files
+        compact: Keep entries in a ColumnarEntryStore instead of a dict,
+            trading some access time for much less memory per entry
+    """
     self.base_dir = Path(base_dir)
     self.files = self._setup_file_paths()
-    self.entries: Dict[str, GlossaryEntry] = {}
+    self.compact = compact
+    self.entries: MutableMapping[str, GlossaryEntry] = self._new_entries()
+    # Hash names in sorted order, shared by the writers and the views
+    self.sorted_keys = SortedKeyIndex()
+    # Byte range and line hash of every entry, built by reload()
+    self.index: Optional[Dict[str, IndexRecord]] = None
+    self._indexed_stat: Optional[Tuple[int, int]] = None
+    # (line number, line, reason) of the malformed lines skipped by the last load()
+    self.load_errors: List[Tuple[int, str, str]] = []
+    # Unsaved changes and the output files they affect
+    self._added: Set[str] = set()
+    self._changed: Set[str] = set()
+    self._deleted: Set[str] = set()
+    self._stale_files: Set[str] = set()
+    # (mtime_ns, size) and content digest of every file as save() last wrote it
+    self._written: Dict[Path, Tuple[Tuple[int, int], bytes]] = {}
+    # Raised by every change of the entries; the log holds (revision, hash name)
+    # of the latest changes, complete for revisions after _change_log_start
+    self.revision = 0
+    self._change_log: Deque[Tuple[int, str]] = deque(maxlen=self.CHANGE_LOG_SIZE)
+    self._change_log_start = 0
+    # Which entries each symbol uses; built on first use, then kept up to date
+    self._macro_graph: Optional['MacroGraph'] = None
+    # Remembered symbol expansions, forgotten for the entries depending on a change
+    self._resolver: Optional['SymbolResolver'] = None
+    # Entries by normalized symbol and description; built on first use, then kept up to date
+    self._duplicate_index: Optional['DuplicateIndex'] = None
+    # Issues of every entry, re-checked for the entries changed since the last validate()
+    self._validator: Optional['EntryValidator'] = None
+    self._validated_revision = 0
+    # Guards entries and change tracking when save() runs on another thread
+    self.lock = threading.RLock()
+    self._save_lock = threading.Lock()
     self._setup_logging()
 
+  def _new_entries(self) -> MutableMapping[str, GlossaryEntry]:
+    return ColumnarEntryStore() if self.compact else {}
+
   def _setup_file_paths(self) -> GlossaryFiles:
     return GlossaryFiles(
             nomenclature=self.base_dir / 'nomenclature.tex',
             def_vars=self.base_dir / 'def_vars.tex',
             macros=self.base_dir / 'macros.tex',
-            log=self.base_dir / 'nomenclature.log'
+            log=self.base_dir / 'nomenclature.log',
+            cache=self.base_dir / '.nomenclature.cache',
+            journal=self.base_dir / '.nomenclature.journal'
             )
 
   def _setup_logging(self) -> None:
@@ -40,8 +108,26 @@ class GlossaryManager:
             )
     self.logger = logging.getLogger(__name__)
 
-  def load(self) -> bool:
-    """Load and parse all glossary data."""
+  def load(self, use_mmap: bool = False, use_cache: bool = True,
+           progress: Optional[Callable[[int, int], None]] = None,
+           should_stop: Optional[Callable[[], bool]] = None) -> bool:
+    """Load and parse all glossary data.
+
+    With ``use_cache`` the entries are restored from the parse cache next to
+    the glossary when it matches the nomenclature file, and the cache is
+    refreshed after a real parse. Malformed lines are skipped and listed in
+    ``load_errors``; the entries of all other lines are kept.
+
+    Args:
+        use_mmap: Map the nomenclature file into memory while parsing
+        use_cache: Use and refresh the parse cache
+        progress: Called with (bytes parsed, file size) while parsing
+        should_stop: Polled while parsing; loading is cancelled when it returns True
+
+    Returns:
+        Whether the glossary was loaded; False if files are missing, reading
+        failed or loading was cancelled
+    """
     # Check if all required files exist
     required_files = {
         'nomenclature': self.files.nomenclature,
@@ -56,31 +142,481 @@ class GlossaryManager:
         return False
 
     try:
-        self.entries = {}  # Clear existing entries
-        with self.files.nomenclature.open('r', encoding='utf-8') as f:
-            for line in f:
-                line = line.strip()
-                if line:  # Skip empty lines
-                    self._process_line(line)
-        
+        self._invalidate_index()
+        self._reset_changes()
+        self._written = {}
+        self.load_errors = []
+        source = fingerprint(self.files.nomenclature) if use_cache else None
+        if source and self._restore_from_cache(source):
+            return True
+
+        size = self.files.nomenclature.stat().st_size
+        self.entries = self._new_entries()  # Clear existing entries
+        for count, entry in enumerate(self.iter_entries(use_mmap, self.load_errors.append), 1):
+            self.entries[entry.hash_name] = {
+                    'symbol'     : entry.symbol,
+                    'description': entry.description,
+                    'sort_key'   : entry.sort_key
+                    }
+            if count % self.PROGRESS_INTERVAL == 0:
+                if should_stop is not None and should_stop():
+                    self.logger.info("Loading cancelled")
+                    self.entries = self._new_entries()
+                    self.sorted_keys = SortedKeyIndex()
+                    self._record_replacement()
+                    return False
+                if progress is not None:
+                    progress(entry.end, size)
+
+        self.sorted_keys = SortedKeyIndex(self.entries)
+        self._record_replacement()
+        if progress is not None:
+            progress(size, size)
         self.logger.info("Successfully loaded %d entries", len(self.entries))
+        if source and not self.load_errors:
+            # Keep parsing a file with malformed lines, so that they are reported every time
+            self._store_in_cache(source)
         return True
         
     except Exception as e:
         self.logger.error("Error loading glossary: %s", str(e), exc_info=True)
-        self.entries = {}  # Clear partial data on error
+        self.entries = self._new_entries()  # Clear partial data on error
+        self.sorted_keys = SortedKeyIndex()
+        self._record_replacement()
         return False
 
-  def save(self) -> bool:
-    """Save all glossary data back to files."""
+  def reload(self, use_mmap: bool = False) -> GlossaryDelta:
+    """Apply changes made to the nomenclature file since it was last read or written.
+
+    Only lines missing from the line index are parsed, and unlike load() the
+    entries are updated in place. The first reload after load() or save()
+    builds the index, assuming unchanged lines look as save() writes them.
+    Entries with unsaved changes keep them; where the file changed them as
+    well they are listed in ``conflicts``. The file as save() last wrote it
+    is not read again.
+    """
+    try:
+      stat = self._nomenclature_stat()
+      if self.index is not None and stat == self._indexed_stat:
+        return GlossaryDelta()
+      written = self._written.get(self.files.nomenclature)
+      if written is not None and written[0] == stat:
+        return GlossaryDelta()  # our own write, e.g. by a background save
+
+      def log_malformed(number: int, line: str, reason: str) -> None:
+        self.logger.warning("Skipping malformed line %d: %s - %s", number, line, reason)
+
+      with self.lock:
+        pending = self._added | self._changed | self._deleted
+      delta, updates, index = reindex(self.files.nomenclature, self.entries, self.index,
+                                      use_mmap, log_malformed, pending)
+    except (OSError, UnicodeDecodeError) as e:
+      self.logger.error("Error reloading glossary: %s", e, exc_info=True)
+      return GlossaryDelta()
+
+    with self.lock:
+      if self._added | self._changed | self._deleted != pending:
+        # edited while the file was read; compare again with those edits pending
+        return self.reload(use_mmap)
+      self.index = index
+      self._indexed_stat = stat
+      self.entries.update(updates)
+      for hash_name in delta.added:
+        self.sorted_keys.add(hash_name)
+      for hash_name in delta.removed:
+        del self.entries[hash_name]
+        self.sorted_keys.discard(hash_name)
+      for hash_name in (*delta.added, *delta.changed, *delta.removed):
+        self._record_change(hash_name)
+      if delta:
+        # nomenclature.tex already holds the changes, the generated files may not
+        self._stale_files.update(('def_vars', 'macros'))
+      self.logger.info("Reloaded glossary: %d added, %d changed, %d removed",
+                       len(delta.added), len(delta.changed), len(delta.removed))
+      if delta.conflicts:
+        self.logger.warning("Keeping unsaved changes of entries also changed in the file: %s",
+                            ", ".join(delta.conflicts))
+    return delta
+
+  def _nomenclature_stat(self) -> Tuple[int, int]:
+    stat = self.files.nomenclature.stat()
+    return stat.st_mtime_ns, stat.st_size
+
+  def _invalidate_index(self) -> None:
+    """Forget the line index after the nomenclature file was read or written as a whole."""
+    self.index = None
+    self._indexed_stat = None
+
+  def _restore_from_cache(self, source: Fingerprint) -> bool:
+    """Restore entries from the parse cache if it matches ``source``."""
     try:
-      self._save_nomenclature()
-      self._save_def_vars()
-      self._save_macros()
+      entries = read_cache(self.files.cache, source)
+    except (OSError, ValueError) as e:
+      self.logger.warning("Ignoring corrupt parse cache %s: %s", self.files.cache, e)
+      return False
+    if entries is None:
+      return False
+    self.adopt_entries(entries)
+    self.logger.info("Successfully loaded %d entries from cache", len(self.entries))
+    return True
+
+  def adopt_entries(self, entries: Dict[str, GlossaryEntry]) -> None:
+    """Take over entries parsed elsewhere (cache, worker process) as if load() had read them."""
+    with self.lock:
+      self._invalidate_index()
+      self._reset_changes()
+      self._written = {}
+      self.entries = ColumnarEntryStore(entries) if self.compact else entries
+      self.sorted_keys = SortedKeyIndex(self.entries)  # cheap, saved files are sorted already
+      self._record_replacement()
+
+  def _store_in_cache(self, source: Fingerprint) -> None:
+    """Write the parsed entries to the parse cache unless the file changed meanwhile."""
+    try:
+      stat = self.files.nomenclature.stat()
+      if (stat.st_mtime_ns, stat.st_size) != (source.mtime_ns, source.size):
+        return
+      if not write_cache(self.files.cache, source, self.entries):
+        self.logger.info("Entries cannot be cached; parse cache not written")
+    except OSError as e:
+      self.logger.warning("Could not write parse cache %s: %s", self.files.cache, e)
+
+  def iter_entries(self, use_mmap: bool = False,
+                   on_error: Optional[Callable[[Tuple[int, str, str]], None]] = None) -> Iterator[ParsedEntry]:
+    """Stream parsed entries from the nomenclature file with their byte offsets.
+
+    Nothing is stored on the manager, so memory stays bounded by the longest
+    line. Malformed lines are logged and skipped.
+
+    Args:
+        use_mmap: Map the file into memory instead of reading it through a buffer
+        on_error: Also receives (line number, line, reason) of every malformed line
+    """
+    def log_malformed(number: int, line: str, reason: str) -> None:
+      self.logger.warning("Skipping malformed line %d: %s - %s", number, line, reason)
+      if on_error is not None:
+        on_error((number, line, reason))
+
+    return iter_entries(self.files.nomenclature, use_mmap, log_malformed)
+
+  def set_entry(self, hash_name: str, symbol: str, description: str, sort_key: str) -> None:
+    """Add or update an entry, recording it for the next save."""
+    entry: GlossaryEntry = {
+            'symbol'     : symbol,
+            'description': description,
+            'sort_key'   : sort_key
+            }
+    with self.lock:
+      current = self.entries.get(hash_name)
+      if current == entry:
+        return
+      self.entries[hash_name] = entry
+      self._record_change(hash_name)
+
+      self._stale_files.add('nomenclature')
+      if current is None:
+        self.sorted_keys.add(hash_name)
+        self._stale_files.update(('def_vars', 'macros'))
+        if hash_name in self._deleted:
+          self._deleted.discard(hash_name)
+          self._changed.add(hash_name)
+        else:
+          self._added.add(hash_name)
+      else:
+        if current['symbol'] != symbol:
+          self._stale_files.add('macros')
+        if hash_name not in self._added:
+          self._changed.add(hash_name)
+
+  def delete_entry(self, hash_name: str) -> None:
+    """Delete an entry, recording it for the next save.
+
+    Raises:
+        KeyError: If there is no such entry
+    """
+    with self.lock:
+      del self.entries[hash_name]
+      self.sorted_keys.discard(hash_name)
+      self._record_change(hash_name)
+      self._stale_files.update(('nomenclature', 'def_vars', 'macros'))
+      if hash_name in self._added:
+        self._added.discard(hash_name)
+      else:
+        self._changed.discard(hash_name)
+        self._deleted.add(hash_name)
+
+  def mark_dirty(self, hash_names: Optional[Iterable[str]] = None) -> None:
+    """Record changes made to ``entries`` directly instead of through set_entry/delete_entry.
+
+    Args:
+        hash_names: The entries added, changed or deleted, or None if unknown;
+            every file is regenerated on the next save either way
+    """
+    with self.lock:
+      self._stale_files.update(('nomenclature', 'def_vars', 'macros'))
+      if hash_names is None:
+        self.sorted_keys = SortedKeyIndex(self.entries)
+        self._record_replacement()
+        return
+      for hash_name in hash_names:
+        self._record_change(hash_name)
+        if hash_name in self.entries:
+          self.sorted_keys.add(hash_name)
+        else:
+          self.sorted_keys.discard(hash_name)
+        if hash_name not in self._added:
+          self._changed.add(hash_name)
+
+  def changes_since(self, revision: int) -> Optional[Set[str]]:
+    """Return the hash names added, changed or deleted after ``revision``.
+
+    Returns:
+        The hash names, or None if the changes are no longer known, e.g.
+        because the glossary was loaded again; then everything may have changed
+    """
+    with self.lock:
+      if revision < self._change_log_start:
+        return None
+      return {hash_name for changed_at, hash_name in self._change_log if changed_at > revision}
+
+  @property
+  def macro_graph(self) -> 'MacroGraph':
+    """The dependency graph of the macros, built on first use."""
+    with self.lock:
+      if self._macro_graph is None:
+        from macro_graph import MacroGraph
+        self._macro_graph = MacroGraph(self.entries)
+      return self._macro_graph
+
+  @property
+  def duplicate_index(self) -> 'DuplicateIndex':
+    """The entries by normalized symbol and description, built on first use."""
+    with self.lock:
+      if self._duplicate_index is None:
+        from symbol_index import DuplicateIndex
+        self._duplicate_index = DuplicateIndex(self.entries)
+      return self._duplicate_index
+
+  def validate(self) -> List['Issue']:
+    """Check every entry for problems LaTeX would only report when compiling; see glossary_validator.
+
+    Only entries changed since the previous call are checked again, and
+    after a load only contents that were not checked before.
+    """
+    with self.lock:
+      if self._validator is None:
+        from glossary_validator import EntryValidator
+        self._validator = EntryValidator()
+        changed = None
+      else:
+        changed = self.changes_since(self._validated_revision)
+      issues = self._validator.validate(self.entries, changed)
+      self._validated_revision = self.revision
+      return issues
+
+  def expand_symbol(self, hash_name: str) -> str:
+    """Return the symbol of an entry with the glossary macros it uses expanded.
+
+    Raises:
+        KeyError: If there is no such entry
+    """
+    with self.lock:
+      return self._symbol_resolver().expand(hash_name)
+
+  def expand_symbols(self, hash_names: Optional[Iterable[str]] = None) -> Dict[str, str]:
+    """Expand the symbols of many entries, all of them by default, in one pass."""
+    with self.lock:
+      return self._symbol_resolver().expand_all(self.sorted_keys if hash_names is None else hash_names)
+
+  def _symbol_resolver(self) -> 'SymbolResolver':
+    if self._resolver is None:
+      from symbol_resolver import SymbolResolver
+      self._resolver = SymbolResolver(self.entries, self.macro_graph)
+    return self._resolver
+
+  def _record_change(self, hash_name: str) -> None:
+    if self._duplicate_index is not None or self._macro_graph is not None:
+      entry = self.entries.get(hash_name)
+    if self._duplicate_index is not None:
+      if entry is None:
+        self._duplicate_index.remove(hash_name)
+      else:
+        self._duplicate_index.set(hash_name, entry)
+    if self._macro_graph is not None:
+      if entry is None:
+        self._macro_graph.remove(hash_name)
+      else:
+        self._macro_graph.set(hash_name, entry['symbol'])
+      if self._resolver is not None:
+        self._resolver.invalidate(hash_name)
+    self.revision += 1
+    if len(self._change_log) == self._change_log.maxlen:
+      self._change_log_start = self._change_log[0][0]  # about to be dropped
+    self._change_log.append((self.revision, hash_name))
+
+  def _record_replacement(self) -> None:
+    """Record that all entries were replaced at once."""
+    self._macro_graph = None
+    self._resolver = None
+    self._duplicate_index = None
+    self.revision += 1
+    self._change_log.clear()
+    self._change_log_start = self.revision
+
+  @property
+  def is_dirty(self) -> bool:
+    """Whether there are changes that save() has not written yet."""
+    return bool(self._stale_files)
+
+  def pending_changes(self) -> Tuple[Set[str], Set[str], Set[str]]:
+    """Return the entries added, changed and deleted since the last save."""
+    return set(self._added), set(self._changed), set(self._deleted)
+
+  def _reset_changes(self) -> None:
+    self._added.clear()
+    self._changed.clear()
+    self._deleted.clear()
+    self._stale_files.clear()
+
+  def save(self, durable: bool = False) -> bool:
+    """Save glossary data back to the files affected by unsaved changes.
+
+    The files are written exactly as a full rewrite would write them, but a
+    file is only rendered when it may have changed and only written when its
+    content differs from what is on disk. Every file is written to a
+    temporary file first and moved into place, so a crash never leaves a
+    truncated file behind.
+
+    Args:
+        durable: fsync the written files and their directory before returning
+    """
+    with self._save_lock:
+      with self.lock:
+        outputs = [(name, path, render) for name, path, render in self._outputs()
+                   if self._needs_rendering(name, path)]
+        # render outside the lock from a snapshot
+        entries = self.entries.copy()
+        keys = list(self.sorted_keys)
+        # macros.tex defines every macro after the macros its symbol uses
+        macro_keys = (self.macro_graph.ordered(keys) if any(name == 'macros' for name, _, _ in outputs)
+                      else keys)
+        unsaved = (set(self._added), set(self._changed), set(self._deleted), set(self._stale_files))
+        self._reset_changes()
+
+      try:
+        rendered = [(path, render(entries, macro_keys if name == 'macros' else keys))
+                    for name, path, render in outputs]
+        written = self._write_files(rendered, durable)
+      except Exception as e:
+        self.logger.error("Error saving glossary: %s", e, exc_info=True)
+        with self.lock:  # keep the changes for the next attempt
+          self._added |= unsaved[0]
+          self._changed |= unsaved[1]
+          self._deleted |= unsaved[2]
+          self._stale_files |= unsaved[3] | {name for name, _, _ in outputs}
+        return False
+
+      if self.files.nomenclature in written:
+        with self.lock:
+          self._invalidate_index()
       return True
-    except Exception as e:
-      self.logger.error("Error saving glossary: %s", e, exc_info=True)
+
+  def regenerate(self, durable: bool = False) -> bool:
+    """Write def_vars.tex and macros.tex from the entries, leaving nomenclature.tex as it is.
+
+    Like save(), only files whose content changed are written.
+    """
+    with self._save_lock:
+      with self.lock:
+        unsaved = self._stale_files & {'def_vars', 'macros'}
+        self._stale_files -= unsaved
+        rendered = self._render_generated()
+      try:
+        self._write_files(rendered, durable)
+      except Exception as e:
+        self.logger.error("Error regenerating glossary files: %s", e, exc_info=True)
+        with self.lock:
+          self._stale_files |= unsaved
+        return False
+      return True
+
+  def outdated_files(self) -> List[Path]:
+    """Return the generated files whose content differs from the rendering of the entries."""
+    with self.lock:
+      rendered = self._render_generated()
+    return [path for path, content in rendered
+            if not path.exists() or path.read_bytes() != self._encoded(content)]
+
+  def _render_generated(self) -> List[Tuple[Path, str]]:
+    """Render def_vars.tex and macros.tex; the caller holds the lock."""
+    keys = list(self.sorted_keys)
+    return [(self.files.def_vars, self._render_def_vars(self.entries, keys)),
+            (self.files.macros, self._render_macros(self.entries, self.macro_graph.ordered(keys)))]
+
+  def _outputs(self) -> List[Tuple[str, Path, Callable[[MutableMapping[str, GlossaryEntry], List[str]], str]]]:
+    return [('nomenclature', self.files.nomenclature, self._render_nomenclature),
+            ('def_vars', self.files.def_vars, self._render_def_vars),
+            ('macros', self.files.macros, self._render_macros)]
+
+  def _needs_rendering(self, name: str, path: Path) -> bool:
+    """Whether the file may differ from the rendering of the current entries."""
+    return name in self._stale_files or not self._is_unchanged_since_written(path)
+
+  def _is_unchanged_since_written(self, path: Path) -> bool:
+    written = self._written.get(path)
+    if written is None:
       return False
+    try:
+      stat = path.stat()
+    except FileNotFoundError:
+      return False
+    return written[0] == (stat.st_mtime_ns, stat.st_size)
+
+  def _write_files(self, rendered: List[Tuple[Path, str]], durable: bool) -> Set[Path]:
+    """Atomically write every file whose content changed; returns the paths written."""
+    replacements = []
+    for path, content in rendered:
+      data = self._encoded(content)
+      digest = hashlib.blake2b(data, digest_size=16).digest()
+      if self._is_unchanged_since_written(path):
+        unchanged = self._written[path][1] == digest
+      else:
+        unchanged = path.exists() and path.read_bytes() == data
+      if unchanged:
+        self._remember_written(path, digest)
+        continue
+
+      temp_path = path.with_name(f".{path.name}.tmp")
+      with temp_path.open('wb') as f:
+        f.write(data)
+        if durable:
+          f.flush()
+          os.fsync(f.fileno())
+      if path.exists():
+        shutil.copymode(path, temp_path)
+      replacements.append((path, temp_path, digest))
+
+    for path, temp_path, digest in replacements:
+      os.replace(temp_path, path)
+      self._remember_written(path, digest)
+
+    if durable and replacements and os.name == 'posix':
+      directory = os.open(self.base_dir, os.O_RDONLY)
+      try:
+        os.fsync(directory)  # one fsync makes all renames durable
+      finally:
+        os.close(directory)
+    return {path for path, _, _ in replacements}
+
+  @staticmethod
+  def _encoded(content: str) -> bytes:
+    if os.linesep != '\n':
+      content = content.replace('\n', os.linesep)  # as text mode would write it
+    return content.encode('utf-8')
+
+  def _remember_written(self, path: Path, digest: bytes) -> None:
+    stat = path.stat()
+    self._written[path] = ((stat.st_mtime_ns, stat.st_size), digest)
 
   def _process_line(self, line: str) -> None:
     """Process a single line from the nomenclature file."""
@@ -94,69 +630,26 @@ class GlossaryManager:
               'description': description,
               'sort_key'   : sort_key
               }
+      self.sorted_keys.add(hash_name)
+      self._record_change(hash_name)
     except ValueError as e:
       self.logger.warning("Skipping malformed line: %s - %s", line, e)
 
   def _parse_line(self, line: str) -> tuple[str, str, str, str]:
     """Parse a single line into its components."""
-    if not line.startswith(r'\NomenclaturEntry'):
-      raise ValueError("Line does not start with \\NomenclaturEntry")
-
-    # Remove the \NomenclaturEntry command
-    line = line[len(r'\NomenclaturEntry'):].strip()
-
-    # Handle the case where the first argument is empty
-    if line.startswith('{}'):
-      line = line[2:].lstrip()  # Remove the empty first argument
-    elif line.startswith('{'):
-      # Normal case where first argument is not empty
-      pass
-    else:
-      raise ValueError("Invalid format: missing opening brace")
-
-    # Now parse the remaining arguments
-    args = []
-    current = []
-    in_braces = 0
-
-    for char in line:
-      if char == '{':
-        if in_braces > 0:  # Nested brace
-          current.append(char)
-        in_braces += 1
-      elif char == '}':
-        in_braces -= 1
-        if in_braces == 0:
-          args.append(''.join(current))
-          current = []
-        else:
-          current.append(char)
-      elif in_braces > 0:
-        current.append(char)
-
-      if len(args) == 4:  # We have all required arguments
-        break
-
-    if len(args) != 4:
-      raise ValueError(f"Expected 4 arguments, got {len(args)}")
-
-    return tuple(args)
-
-  def _save_nomenclature(self) -> None:
-    """Save entries to the nomenclature file."""
-    with self.files.nomenclature.open('w', encoding='utf-8') as f:
-      for hash_name, entry in sorted(self.entries.items()):
-        line = f"\\NomenclaturEntry{{{hash_name}}}{{{entry['symbol']}}}{{{entry['description']}}}{{{entry['sort_key']}}}\n"
-        f.write(line)
-
-  def _save_def_vars(self) -> None:
-    """Save variable definitions."""
-    with self.files.def_vars.open('w', encoding='utf-8') as f:
-      for hash_name in sorted(self.entries):
-        f.write(f"\\def\\{hash_name}{{\\Var{{{hash_name}}}}}\n")
-
-  def _save_macros(self) -> None:
-    """Save macro definitions."""
-    with self.files.macros.open('w', encoding='utf-8') as f:
-      for hash_name, entry in sorted(self.entries.items()):
-        f.write(f"\\def\\{hash_name}{{{{{entry['symbol']}}}}}\n")
\ No newline at end of file
+    return parse_line(line)
+
+  @staticmethod
+  def _render_nomenclature(entries: MutableMapping[str, GlossaryEntry], keys: List[str]) -> str:
+    """Render the nomenclature file."""
+    return "".join(format_line(hash_name, entries[hash_name]) + "\n" for hash_name in keys)
+
+  @staticmethod
+  def _render_def_vars(entries: MutableMapping[str, GlossaryEntry], keys: List[str]) -> str:
+    """Render the variable definitions."""
+    return "".join(f"\\def\\{hash_name}{{\\Var{{{hash_name}}}}}\n" for hash_name in keys)
+
+  @staticmethod
+  def _render_macros(entries: MutableMapping[str, GlossaryEntry], keys: List[str]) -> str:
+    """Render the macro definitions in the order of ``keys``."""
+    return "".join(f"\\def\\{hash_name}{{{{{entries[hash_name]['symbol']}}}}}\n" for hash_name in keys)
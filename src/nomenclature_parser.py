@@ -0,0 +1,188 @@
+"""
+Brace-aware scanner for \\NomenclaturEntry lines.
+
+The scanner jumps between braces with ``str.find`` and a compiled regular
+expression instead of walking the line one character at a time.
+"""
+import mmap
+import re
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+if TYPE_CHECKING:
+  from models import GlossaryEntry
+
+COMMAND = r'\NomenclaturEntry'
+ARGUMENT_COUNT = 4
+
+_BRACE = re.compile(r'[{}]')
+# Arguments nested at most one brace level deep cover nearly every symbol and
+# are matched in one go; anything else, including an empty or brace-led first
+# argument, is left to the scanner.
+_SHALLOW_ARGUMENT = r'\{([^{}]%s(?:\{[^{}]*\}[^{}]*)*)\}'
+_SHALLOW_ENTRY = re.compile(r'\\NomenclaturEntry\s*' + _SHALLOW_ARGUMENT % '+'
+                            + (r'[^{}]*?' + _SHALLOW_ARGUMENT % '*') * (ARGUMENT_COUNT - 1))
+_WHITESPACE = re.compile(r'\s*')
+
+# (line number, line, reason) of a line that could not be parsed
+ParseError = Tuple[int, str, str]
+
+
+class ParsedEntry(NamedTuple):
+  hash_name: str
+  symbol: str
+  description: str
+  sort_key: str
+  start: int  # byte offset of the line in the file
+  end: int  # byte offset just past the line terminator
+
+
+def _argument_end(line: str, start: int) -> int:
+  """Return the index of the brace closing the argument opened before ``start``, or -1."""
+  close = line.find('}', start)
+  if close < 0:
+    return -1
+  if line.find('{', start, close) < 0:
+    return close  # fast path: no nested braces
+
+  depth = 1
+  for match in _BRACE.finditer(line, start):
+    if match.group() == '{':
+      depth += 1
+    else:
+      depth -= 1
+      if depth == 0:
+        return match.start()
+  return -1
+
+
+def parse_line(line: str) -> Tuple[str, str, str, str]:
+  """Parse a single \\NomenclaturEntry line into hash, symbol, description and sort key."""
+  if not line.startswith(COMMAND):
+    raise ValueError("Line does not start with \\NomenclaturEntry")
+
+  shallow = _SHALLOW_ENTRY.match(line)
+  if shallow is not None:
+    return shallow.groups()  # fast path
+
+  pos = _WHITESPACE.match(line, len(COMMAND)).end()
+
+  # Handle the case where the first argument is empty
+  if line.startswith('{}', pos):
+    pos += 2
+  elif not line.startswith('{', pos):
+    raise ValueError("Invalid format: missing opening brace")
+
+  args = []
+  while len(args) < ARGUMENT_COUNT:
+    opening = line.find('{', pos)
+    if opening < 0:
+      break
+    if line.find('}', pos, opening) >= 0:
+      raise ValueError("Unbalanced closing brace")
+    closing = _argument_end(line, opening + 1)
+    if closing < 0:
+      break
+    args.append(line[opening + 1:closing])
+    pos = closing + 1
+
+  if len(args) != ARGUMENT_COUNT:
+    raise ValueError(f"Expected {ARGUMENT_COUNT} arguments, got {len(args)}")
+
+  return tuple(args)
+
+
+def format_line(hash_name: str, entry: 'GlossaryEntry') -> str:
+  """Render an entry as a \\NomenclaturEntry line without line terminator."""
+  return f"\\NomenclaturEntry{{{hash_name}}}{{{entry['symbol']}}}{{{entry['description']}}}{{{entry['sort_key']}}}"
+
+
+def parse_many(lines: Iterable[str],
+               errors: Optional[List[ParseError]] = None) -> Dict[str, 'GlossaryEntry']:
+  """Parse all lines at once.
+
+  Args:
+      lines: Raw lines of a nomenclature file; blank and comment lines are skipped
+      errors: Optional list collecting (line number, line, reason) of malformed lines
+
+  Returns:
+      Mapping of hash name to entry, later duplicates overriding earlier ones
+  """
+  entries = {}
+  shallow_match = _SHALLOW_ENTRY.match
+  for number, line in enumerate(lines, 1):
+    line = line.strip()
+    if not line or line.startswith('%'):
+      continue
+    shallow = shallow_match(line)
+    if shallow is not None:
+      hash_name, symbol, description, sort_key = shallow.groups()
+    else:
+      try:
+        hash_name, symbol, description, sort_key = parse_line(line)
+      except ValueError as e:
+        if errors is not None:
+          errors.append((number, line, str(e)))
+        continue
+    entries[hash_name] = {
+            'symbol'     : symbol,
+            'description': description,
+            'sort_key'   : sort_key
+            }
+  return entries
+
+
+def iter_lines(path: Path, use_mmap: bool = False) -> Iterator[Tuple[int, int, bytes]]:
+  """Yield (start, end, raw bytes) for every line of a file without reading it whole."""
+  with open(path, 'rb') as f:
+    if not use_mmap:
+      start = 0
+      for raw in f:
+        end = start + len(raw)
+        yield start, end, raw
+        start = end
+      return
+
+    size = f.seek(0, 2)
+    if size == 0:
+      return  # empty files cannot be mapped
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+      start = 0
+      while start < size:
+        newline = mapped.find(b'\n', start)
+        end = size if newline < 0 else newline + 1
+        yield start, end, mapped[start:end]
+        start = end
+
+
+def iter_entries(path: Path, use_mmap: bool = False,
+                 on_error: Optional[Callable[[int, str, str], None]] = None) -> Iterator[ParsedEntry]:
+  """Lazily parse a nomenclature file, one entry at a time.
+
+  Args:
+      path: The nomenclature file
+      use_mmap: Map the file into memory instead of reading it through a buffer
+      on_error: Optional callback receiving (line number, line, reason) of malformed lines
+
+  Yields:
+      Parsed entries with the byte range of their line, in file order
+  """
+  shallow_match = _SHALLOW_ENTRY.match
+  for number, (start, end, raw) in enumerate(iter_lines(path, use_mmap), 1):
+    try:
+      line = raw.decode('utf-8').strip()
+    except UnicodeDecodeError as e:
+      if on_error is not None:
+        on_error(number, raw.decode('utf-8', 'replace').strip(), f"Invalid UTF-8: {e.reason}")
+      continue
+    if not line or line.startswith('%'):
+      continue
+    shallow = shallow_match(line)
+    if shallow is not None:
+      yield ParsedEntry(*shallow.groups(), start, end)
+      continue
+    try:
+      yield ParsedEntry(*parse_line(line), start, end)
+    except ValueError as e:
+      if on_error is not None:
+        on_error(number, line, str(e))
@@ -0,0 +1,116 @@
+"""
+Binary sidecar cache of parsed nomenclature entries.
+
+The cache stores the entries of a nomenclature file together with the
+fingerprint (mtime, size and BLAKE2b content hash) of the file they were
+parsed from. It is only used when the fingerprint still matches; anything
+unexpected in the cache file makes the reader report a miss.
+"""
+import hashlib
+import os
+import struct
+import zlib
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Mapping, NamedTuple, Optional
+
+if TYPE_CHECKING:
+  from models import GlossaryEntry
+
+MAGIC = b'GLSC'
+VERSION = 1
+FIELD_SEPARATOR = '\x00'
+
+# magic, version, mtime_ns, size, digest, entry count, payload length, payload crc32
+_HEADER = struct.Struct('<4sHqq32sIII')
+_CHUNK_SIZE = 1 << 20
+
+
+class Fingerprint(NamedTuple):
+  mtime_ns: int
+  size: int
+  digest: bytes
+
+
+def fingerprint(path: Path) -> Fingerprint:
+  """Fingerprint a file by mtime, size and content hash."""
+  stat = os.stat(path)
+  digest = hashlib.blake2b(digest_size=32)
+  with open(path, 'rb') as f:
+    for chunk in iter(lambda: f.read(_CHUNK_SIZE), b''):
+      digest.update(chunk)
+  return Fingerprint(stat.st_mtime_ns, stat.st_size, digest.digest())
+
+
+def read_cache(cache_path: Path, source: Fingerprint) -> Optional[Dict[str, 'GlossaryEntry']]:
+  """Return the cached entries if the cache matches ``source``, otherwise None.
+
+  Raises:
+      ValueError: If the cache file exists but is corrupt
+  """
+  try:
+    data = cache_path.read_bytes()
+  except FileNotFoundError:
+    return None
+
+  if len(data) < _HEADER.size:
+    raise ValueError("Truncated cache header")
+  magic, version, mtime_ns, size, digest, count, length, crc = _HEADER.unpack_from(data)
+  if magic != MAGIC or version != VERSION:
+    raise ValueError("Unknown cache format")
+  if Fingerprint(mtime_ns, size, digest) != source:
+    return None  # stale
+
+  payload = data[_HEADER.size:]
+  if len(payload) != length or zlib.crc32(payload) != crc:
+    raise ValueError("Cache payload checksum mismatch")
+  try:
+    text = zlib.decompress(payload).decode('utf-8')
+  except (zlib.error, UnicodeDecodeError) as e:
+    raise ValueError(f"Cache payload cannot be decoded: {e}") from e
+  return unpack_entries(text, count)
+
+
+def pack_entries(entries: Mapping[str, 'GlossaryEntry']) -> Optional[str]:
+  """Flatten entries into one separator-joined string, or None if a field contains the separator.
+
+  This is much cheaper to store or send to another process than the entry dicts.
+  """
+  fields = []
+  for hash_name, entry in entries.items():
+    fields += (hash_name, entry['symbol'], entry['description'], entry['sort_key'])
+  text = FIELD_SEPARATOR.join(fields)
+  if text.count(FIELD_SEPARATOR) != max(len(fields) - 1, 0):
+    return None
+  return text
+
+
+def unpack_entries(text: str, count: int) -> Dict[str, 'GlossaryEntry']:
+  """Rebuild ``count`` entries from the output of pack_entries.
+
+  Raises:
+      ValueError: If the text does not hold ``count`` entries
+  """
+  if count == 0:
+    return {}
+  fields = text.split(FIELD_SEPARATOR)
+  if len(fields) != 4 * count:
+    raise ValueError(f"Expected {4 * count} packed fields, got {len(fields)}")
+
+  values = iter(fields)
+  return {hash_name: {'symbol': symbol, 'description': description, 'sort_key': sort_key}
+          for hash_name, symbol, description, sort_key in zip(values, values, values, values)}
+
+
+def write_cache(cache_path: Path, source: Fingerprint, entries: Mapping[str, 'GlossaryEntry']) -> bool:
+  """Atomically write ``entries`` to the cache; returns False if they cannot be encoded."""
+  text = pack_entries(entries)
+  if text is None:
+    return False  # a field contains the separator
+
+  payload = zlib.compress(text.encode('utf-8'), 1)
+  header = _HEADER.pack(MAGIC, VERSION, source.mtime_ns, source.size, source.digest,
+                        len(entries), len(payload), zlib.crc32(payload))
+  temp_path = cache_path.with_name(cache_path.name + '.tmp')
+  temp_path.write_bytes(header + payload)
+  os.replace(temp_path, cache_path)
+  return True
@@ -0,0 +1,125 @@
+"""
+Write-behind saving of a glossary on a worker thread.
+"""
+import threading
+import time
+from typing import Callable, Optional
+
+from models import GlossaryManager
+
+
+class SaveScheduler:
+  """Coalesce save requests and run GlossaryManager.save() off the calling thread.
+
+  A save starts ``delay`` seconds after the last request, so a burst of
+  edits is written once, but never later than ``max_delay`` seconds after
+  the first request of the burst. Saves are durable (fsynced).
+  """
+
+  def __init__(self, glossary: GlossaryManager, delay: float = 0.5, max_delay: float = 5.0,
+               on_error: Optional[Callable[[], None]] = None):
+    """
+    Args:
+        glossary: The glossary to save
+        delay: Seconds to wait for further requests before saving
+        max_delay: Upper bound of the wait after the first pending request
+        on_error: Called from the worker thread when a save fails
+    """
+    self.glossary = glossary
+    self.delay = delay
+    self.max_delay = max_delay
+    self.on_error = on_error
+    self._condition = threading.Condition()
+    self._requested = 0  # number of the latest request
+    self._saved = 0  # number of the latest request covered by a finished save
+    self._first_pending_at: Optional[float] = None
+    self._last_request_at = 0.0
+    self._flush_now = False
+    self._stopping = False
+    self._last_result = True
+    self._thread = threading.Thread(target=self._run, name="glossary-saver", daemon=True)
+    self._thread.start()
+
+  def request(self) -> None:
+    """Schedule a save of the glossary."""
+    with self._condition:
+      if self._stopping:
+        raise RuntimeError("SaveScheduler has been shut down")
+      self._request()
+
+  def _request(self) -> None:
+    now = time.monotonic()
+    if self._requested == self._saved:
+      self._first_pending_at = now
+    self._last_request_at = now
+    self._requested += 1
+    self._condition.notify_all()
+
+  @property
+  def pending(self) -> bool:
+    """Whether requested changes have not been saved yet."""
+    with self._condition:
+      return self._requested != self._saved
+
+  def flush(self, timeout: Optional[float] = None) -> bool:
+    """Save pending changes now and wait for it.
+
+    Changes left unsaved by a failed save, or made without a request, are
+    saved as well.
+
+    Returns:
+        Whether the save succeeded within ``timeout`` and left nothing unsaved
+    """
+    with self._condition:
+      if self._requested == self._saved and self.glossary.is_dirty and not self._stopping:
+        self._request()
+      target = self._requested
+      if self._saved < target:
+        self._flush_now = True
+        self._condition.notify_all()
+        if not self._condition.wait_for(lambda: self._saved >= target, timeout):
+          return False
+      return self._last_result and not self.glossary.is_dirty
+
+  def shutdown(self, timeout: Optional[float] = None) -> bool:
+    """Flush pending changes and stop the worker thread.
+
+    Returns:
+        Whether everything was saved
+    """
+    result = self.flush(timeout)
+    with self._condition:
+      self._stopping = True
+      self._condition.notify_all()
+    self._thread.join(timeout)
+    return result
+
+  def _due_in(self) -> float:
+    """Seconds until the pending request is due."""
+    if self._flush_now or self._stopping:
+      return 0.0
+    due = min(self._last_request_at + self.delay, self._first_pending_at + self.max_delay)
+    return due - time.monotonic()
+
+  def _run(self) -> None:
+    while True:
+      with self._condition:
+        while self._requested == self._saved and not self._stopping:
+          self._condition.wait()
+        if self._requested == self._saved:
+          return  # stopping with nothing left to save
+        while (remaining := self._due_in()) > 0:
+          self._condition.wait(remaining)
+        target = self._requested
+        self._flush_now = False
+
+      result = self.glossary.save(durable=True)
+
+      with self._condition:
+        self._saved = target
+        self._last_result = result
+        if self._requested != self._saved:
+          self._first_pending_at = time.monotonic()
+        self._condition.notify_all()
+      if not result and self.on_error is not None:
+        self.on_error()
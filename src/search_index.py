@@ -0,0 +1,79 @@
+"""
+Case-insensitive substring search over a fixed list of strings.
+"""
+from array import array
+from bisect import bisect_right
+from typing import List, Sequence, Tuple
+
+_SEPARATOR = '\n'
+
+
+class SubstringIndex:
+  """Lower-cased strings joined into one text, with the offset where each starts.
+
+  A search jumps from match to match with ``str.find`` over the joined text
+  and maps every hit to its row by binary search over the offsets. After a
+  hit the search resumes at the start of the next row, so each matching row
+  is touched once and non-matching rows are never visited from Python.
+  Building the index is a single join.
+
+  When a query occurs in a large share of the rows, a plain pass over the
+  lower-cased strings is cheaper than jumping. Queries of DENSE_LENGTH
+  characters or fewer, which usually do, get one right away; longer ones
+  finish with one once that share of all rows is found. While typing, a
+  query that extends the previous one only re-checks the previous matches.
+  """
+
+  DENSE_FRACTION = 0.25
+  DENSE_LENGTH = 1
+
+  def __init__(self, texts: Sequence[str]):
+    lowered = [text.lower().replace(_SEPARATOR, ' ') for text in texts]
+    self._lowered = lowered
+    self._text = _SEPARATOR.join(lowered) + _SEPARATOR
+    self._starts = array('L', [0] * (len(lowered) + 1))
+    offset = 0
+    for row, text in enumerate(lowered):
+      self._starts[row] = offset
+      offset += len(text) + 1
+    self._starts[len(lowered)] = offset
+    # (query, rows) of the previous search, replaced as one so searches may run concurrently
+    self._last: Tuple[str, List[int]] = ('', [])
+
+  def __len__(self) -> int:
+    return len(self._starts) - 1
+
+  def search(self, query: str) -> List[int]:
+    """Return the rows containing ``query``, ignoring case, in ascending order."""
+    query = query.lower()
+    if not query:
+      return list(range(len(self)))
+    if _SEPARATOR in query:
+      return []
+
+    lowered = self._lowered
+    last_query, last_rows = self._last
+    if last_query and last_query in query:
+      rows = [row for row in last_rows if query in lowered[row]]
+    elif len(query) <= self.DENSE_LENGTH:
+      rows = [row for row, text in enumerate(lowered) if query in text]
+    else:
+      rows = self._jump_search(query)
+    self._last = (query, rows)
+    return rows
+
+  def _jump_search(self, query: str) -> List[int]:
+    rows = []
+    dense = self.DENSE_FRACTION * len(self)
+    starts = self._starts
+    find = self._text.find
+    pos = find(query)
+    while pos >= 0:
+      row = bisect_right(starts, pos) - 1
+      rows.append(row)
+      if len(rows) > dense:
+        lowered = self._lowered
+        rows += [rest for rest in range(row + 1, len(lowered)) if query in lowered[rest]]
+        break
+      pos = find(query, starts[row + 1])
+    return rows
@@ -0,0 +1,120 @@
+"""
+Sorted set of hash names kept up to date under insertion and deletion.
+"""
+from bisect import bisect_left
+from itertools import chain, islice
+from typing import Iterable, Iterator, List, Optional
+
+
+class SortedKeyIndex:
+  """Sorted set of strings stored as a list of bounded, sorted buckets.
+
+  Locating a key is a binary search over the bucket maxima followed by one
+  inside a bucket, so add, discard and membership tests cost O(log n) plus
+  shifting at most ``2 * BUCKET_SIZE`` references. Iteration is in order.
+  ``version`` counts the changes, so a copy of the keys can tell it is stale.
+  """
+
+  BUCKET_SIZE = 1000
+
+  def __init__(self, keys: Iterable[str] = ()):
+    ordered = sorted(set(keys))
+    size = self.BUCKET_SIZE
+    self._buckets: List[List[str]] = [ordered[i:i + size] for i in range(0, len(ordered), size)]
+    self._maxes: List[str] = [bucket[-1] for bucket in self._buckets]
+    self._len = len(ordered)
+    self.version = 0
+
+  def __len__(self) -> int:
+    return self._len
+
+  def __iter__(self) -> Iterator[str]:
+    return chain.from_iterable(self._buckets)
+
+  def __contains__(self, key: object) -> bool:
+    i = bisect_left(self._maxes, key)
+    if i == len(self._maxes):
+      return False
+    bucket = self._buckets[i]
+    j = bisect_left(bucket, key)
+    return j < len(bucket) and bucket[j] == key
+
+  def __repr__(self) -> str:
+    return f"{type(self).__name__}({len(self)} keys)"
+
+  def add(self, key: str) -> bool:
+    """Insert a key; returns False if it was already present."""
+    if not self._buckets:
+      self._buckets.append([key])
+      self._maxes.append(key)
+      self._len = 1
+      self.version += 1
+      return True
+
+    i = bisect_left(self._maxes, key)
+    if i == len(self._maxes):
+      i -= 1  # beyond the largest key: append to the last bucket
+    bucket = self._buckets[i]
+    j = bisect_left(bucket, key)
+    if j < len(bucket) and bucket[j] == key:
+      return False
+    bucket.insert(j, key)
+    self._maxes[i] = bucket[-1]
+    self._len += 1
+    self.version += 1
+
+    if len(bucket) > 2 * self.BUCKET_SIZE:
+      half = len(bucket) // 2
+      self._buckets.insert(i + 1, bucket[half:])
+      del bucket[half:]
+      self._maxes.insert(i, bucket[-1])
+    return True
+
+  def discard(self, key: str) -> bool:
+    """Remove a key; returns False if it was not present."""
+    i = bisect_left(self._maxes, key)
+    if i == len(self._maxes):
+      return False
+    bucket = self._buckets[i]
+    j = bisect_left(bucket, key)
+    if j == len(bucket) or bucket[j] != key:
+      return False
+    del bucket[j]
+    self._len -= 1
+    self.version += 1
+    if bucket:
+      self._maxes[i] = bucket[-1]
+    else:
+      del self._buckets[i]
+      del self._maxes[i]
+    return True
+
+  def first(self) -> Optional[str]:
+    """Return the smallest key, or None if the index is empty."""
+    return self._buckets[0][0] if self._buckets else None
+
+  def irange(self, start: Optional[str] = None, stop: Optional[str] = None) -> Iterator[str]:
+    """Iterate in order over the keys k with start <= k < stop; None leaves a side open."""
+    if start is None:
+      i = j = 0
+    else:
+      i = bisect_left(self._maxes, start)
+      if i == len(self._maxes):
+        return
+      j = bisect_left(self._buckets[i], start)
+
+    for bucket in islice(self._buckets, i, None):
+      if stop is not None and bucket[-1] >= stop:
+        yield from islice(bucket, j, bisect_left(bucket, stop))
+        return
+      yield from islice(bucket, j, None)
+      j = 0
+
+  def prefixed(self, prefix: str) -> Iterator[str]:
+    """Iterate in order over the keys starting with ``prefix``."""
+    if not prefix:
+      return iter(self)
+    # The smallest string greater than every string with this prefix
+    stop = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    return self.irange(prefix, stop)
+
@@ -0,0 +1,125 @@
+"""
+Reverse index from symbols and descriptions to the entries using them.
+"""
+import re
+from typing import Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+# Control words, control symbols and single characters; whitespace is dropped
+_TOKEN = re.compile(r'\\[a-zA-Z]+|\\.|\S', re.DOTALL)
+
+
+def normalize_symbol(symbol: str) -> str:
+  """Reduce a symbol to a form shared by spellings that render alike.
+
+  Spaces are dropped, and braces around a single token or the whole symbol
+  removed, so ``\\hat {T}``, ``{\\hat{T}}`` and ``\\hat T`` all become ``\\hat T``.
+  """
+  tokens: List[str] = []
+  for token in _TOKEN.findall(symbol):
+    if token == '}' and len(tokens) >= 2 and tokens[-2] == '{' and tokens[-1] not in '{}':
+      tokens[-2:] = tokens[-1:]
+    else:
+      tokens.append(token)
+  while len(tokens) > 2 and tokens[0] == '{' and _closing_brace(tokens) == len(tokens) - 1:
+    tokens = tokens[1:-1]  # the macro groups the whole symbol anyway
+  parts = []
+  for previous, token in zip([''] + tokens, tokens):
+    if previous[:1] == '\\' and previous[1:].isalpha() and token[:1].isalpha():
+      parts.append(' ')  # \alpha b is not \alphab
+    parts.append(token)
+  return "".join(parts)
+
+
+def _closing_brace(tokens: List[str]) -> int:
+  """Return the position of the brace closing ``tokens[0]``, or -1."""
+  depth = 0
+  for i, token in enumerate(tokens):
+    if token == '{':
+      depth += 1
+    elif token == '}':
+      depth -= 1
+      if depth == 0:
+        return i
+  return -1
+
+
+def normalize_description(description: str) -> str:
+  """Ignore case and spacing in a description."""
+  return " ".join(description.casefold().split())
+
+
+class ReverseIndex:
+  """Hash names by key, with the keys shared by several names tracked as they change."""
+
+  def __init__(self):
+    self._names: Dict[str, Set[str]] = {}
+    self._key_of: Dict[str, str] = {}
+    self._shared: Set[str] = set()
+
+  def set(self, hash_name: str, key: str) -> None:
+    """File ``hash_name`` under ``key``; an empty key removes it."""
+    old = self._key_of.get(hash_name)
+    if old == key:
+      return
+    if old is not None:
+      self.remove(hash_name)
+    if not key:
+      return
+    self._key_of[hash_name] = key
+    names = self._names.setdefault(key, set())
+    names.add(hash_name)
+    if len(names) > 1:
+      self._shared.add(key)
+
+  def remove(self, hash_name: str) -> None:
+    key = self._key_of.pop(hash_name, None)
+    if key is None:
+      return
+    names = self._names[key]
+    names.discard(hash_name)
+    if len(names) < 2:
+      self._shared.discard(key)
+      if not names:
+        del self._names[key]
+
+  def get(self, key: str) -> Set[str]:
+    return set(self._names.get(key, ()))
+
+  def shared(self) -> Dict[str, List[str]]:
+    """Return every key filed under several names, with the names, sorted."""
+    return {key: sorted(self._names[key]) for key in sorted(self._shared)}
+
+
+class DuplicateIndex:
+  """Entries by normalized symbol and by normalized description.
+
+  Updating an entry costs one normalization of each field; the duplicates
+  are known at any time without looking at the other entries.
+  """
+
+  def __init__(self, entries: Optional[Mapping[str, Mapping[str, str]]] = None):
+    self.symbols = ReverseIndex()
+    self.descriptions = ReverseIndex()
+    for hash_name, entry in (entries or {}).items():
+      self.set(hash_name, entry)
+
+  def set(self, hash_name: str, entry: Mapping[str, str]) -> None:
+    """Add an entry or update it."""
+    self.symbols.set(hash_name, normalize_symbol(entry['symbol']))
+    self.descriptions.set(hash_name, normalize_description(entry['description']))
+
+  def remove(self, hash_name: str) -> None:
+    self.symbols.remove(hash_name)
+    self.descriptions.remove(hash_name)
+
+  def with_symbol(self, symbol: str, exclude: Iterable[str] = ()) -> List[str]:
+    """Return the entries whose symbol renders like ``symbol``, except ``exclude``."""
+    return sorted(self.symbols.get(normalize_symbol(symbol)).difference(exclude))
+
+  def with_description(self, description: str, exclude: Iterable[str] = ()) -> List[str]:
+    """Return the entries with ``description``, ignoring case and spacing, except ``exclude``."""
+    return sorted(self.descriptions.get(normalize_description(description)).difference(exclude))
+
+  def duplicates(self) -> Tuple[Dict[str, List[str]], Dict[str, List[str]]]:
+    """Return the normalized symbols, and descriptions, shared by several entries, with the entries."""
+    return self.symbols.shared(), self.descriptions.shared()
@@ -0,0 +1,126 @@
+"""
+Symbols with the glossary macros they use expanded.
+"""
+import re
+from typing import Dict, Iterable, Mapping, Set
+
+from macro_graph import MACRO_REFERENCE, MacroGraph
+
+# A single character or control word needs no braces where it replaces a macro
+_ATOM = re.compile(r'.|\\[a-zA-Z]+', re.DOTALL)
+
+
+def _is_group(text: str) -> bool:
+  """Whether text is one brace group, like ``{T^2}`` but not ``{a}{b}``."""
+  if not text.startswith('{'):
+    return False
+  depth = 0
+  for i, char in enumerate(text):
+    if char == '{':
+      depth += 1
+    elif char == '}':
+      depth -= 1
+      if depth == 0:
+        return i == len(text) - 1
+  return False
+
+
+def _as_atom(expansion: str) -> str:
+  """Brace an expansion so that it binds like the macro it replaces, as in ``\\qTemp^2``."""
+  if _ATOM.fullmatch(expansion) or _is_group(expansion):
+    return expansion
+  return "{" + expansion + "}"
+
+
+class SymbolResolver:
+  """Expand the glossary macros in symbols, remembering every expansion.
+
+  ``\\qTemp`` with the symbol ``\\temperature^2`` and ``\\temperature`` with
+  ``T`` expand to ``T^2``. Shared macros are expanded once. When an entry
+  changes, only its expansion and those of the entries using it, directly or
+  not, are forgotten.
+
+  A macro that uses itself, directly or through others, is left unexpanded
+  where it recurs, and so is any macro whose expansion would exceed
+  ``MAX_LENGTH`` characters. Such partial expansions are not remembered.
+  """
+
+  MAX_LENGTH = 10000
+
+  def __init__(self, entries: Mapping[str, Mapping[str, str]], graph: MacroGraph):
+    self.entries = entries
+    self.graph = graph
+    self._expanded: Dict[str, str] = {}
+
+  def __len__(self) -> int:
+    """Number of remembered expansions."""
+    return len(self._expanded)
+
+  def invalidate(self, hash_name: str) -> None:
+    """Forget the expansions that depend on the entry ``hash_name``."""
+    self._expanded.pop(hash_name, None)
+    if self._expanded:
+      for dependent in self.graph.transitive_dependents([hash_name]):
+        self._expanded.pop(dependent, None)
+
+  def clear(self) -> None:
+    self._expanded.clear()
+
+  def expand(self, hash_name: str) -> str:
+    """Return the symbol of ``hash_name`` with all glossary macros expanded.
+
+    Raises:
+        KeyError: If there is no such entry
+    """
+    expanded = self._expanded.get(hash_name)
+    if expanded is not None:
+      return expanded
+    if hash_name not in self.entries:
+      raise KeyError(hash_name)
+
+    # Depth first without recursion: expand the macros an entry uses before the entry
+    partial: Dict[str, str] = {}  # expansions that left a recurring macro unexpanded
+    path: Set[str] = {hash_name}
+    work = [(hash_name, iter(self.graph.dependencies(hash_name)))]
+    while work:
+      name, dependencies = work[-1]
+      for dependency in dependencies:
+        if dependency not in self._expanded and dependency not in partial and dependency not in path:
+          path.add(dependency)
+          work.append((dependency, iter(self.graph.dependencies(dependency))))
+          break
+      else:
+        work.pop()
+        path.discard(name)
+        self._expand_one(name, partial)
+    return self._expanded.get(hash_name, partial.get(hash_name))
+
+  def _expand_one(self, hash_name: str, partial: Dict[str, str]) -> None:
+    """Expand one symbol once the macros it uses are expanded or found recurring."""
+    symbol = self.entries[hash_name]['symbol']
+    complete = True
+
+    def replace(match: 're.Match') -> str:
+      nonlocal complete
+      target = match.group(1)
+      expansion = self._expanded.get(target)
+      if expansion is None:
+        expansion = partial.get(target)
+        if expansion is None:
+          if target in self.entries:
+            complete = False  # recurring: keep \target
+          return match.group(0)
+        complete = False
+      return _as_atom(expansion)
+
+    expanded = MACRO_REFERENCE.sub(replace, symbol)
+    if len(expanded) > self.MAX_LENGTH:
+      expanded, complete = symbol, False
+    if complete:
+      self._expanded[hash_name] = expanded
+    else:
+      partial[hash_name] = expanded
+
+  def expand_all(self, hash_names: Iterable[str]) -> Dict[str, str]:
+    """Expand many entries in one pass, each after the entries it uses."""
+    return {hash_name: self.expand(hash_name) for hash_name in self.graph.ordered(hash_names)}
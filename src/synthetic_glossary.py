@@ -0,0 +1,66 @@
+"""
+Synthetic glossaries of any size for benchmarks and tests.
+
+Entries look like real ones: hash names follow the editor's
+``^[a-zA-Z][a-zA-Z0-9]*$`` rule, symbols use nested braces (``\\hat{x}_{3}``)
+and some refer to earlier entries the way ``qTemp`` uses ``\\temperature^2``.
+References always point backwards, so the macros never form a cycle.
+"""
+import random
+from pathlib import Path
+from typing import Dict, List
+
+from models import GlossaryEntry, GlossaryManager
+from nomenclature_parser import format_line
+
+_STEMS = ['temperature', 'pressure', 'velocity', 'density', 'concentration',
+          'flux', 'enthalpy', 'mass', 'volume', 'area', 'time', 'rate']
+_LETTERS = 'TPvrcJHmVAtkxyzabn'
+_DECORATIONS = [r'\hat{%s}', r'\bar{%s}', r'\tilde{%s}', r'\dot{%s}', r'\mathbf{%s}']
+
+
+def generate_entries(count: int, seed: int = 0) -> Dict[str, GlossaryEntry]:
+  """Generate ``count`` entries, the same ones for the same seed.
+
+  About a third of the symbols have nested braces and a tenth refer to an
+  earlier entry.
+  """
+  rng = random.Random(seed)
+  entries: Dict[str, GlossaryEntry] = {}
+  names: List[str] = []
+  for i in range(count):
+    stem = _STEMS[i % len(_STEMS)]
+    hash_name = f"{stem}{i}"
+    letter = _LETTERS[i % len(_LETTERS)]
+
+    kind = rng.random()
+    if names and kind < 0.1:
+      symbol = f"\\{rng.choice(names)}^{rng.randint(2, 3)}"
+    elif kind < 0.4:
+      symbol = f"{rng.choice(_DECORATIONS) % letter}_{{{i}}}"
+    else:
+      symbol = f"{letter}_{i}"
+
+    entries[hash_name] = {
+            'symbol'     : symbol,
+            'description': f"{stem} of unit {i // len(_STEMS)}",
+            'sort_key'   : letter
+            }
+    names.append(hash_name)
+  return entries
+
+
+def synthetic_lines(count: int, seed: int = 0) -> List[str]:
+  """Generate the lines of a nomenclature file with ``count`` entries, in file order."""
+  entries = generate_entries(count, seed)
+  return [format_line(hash_name, entries[hash_name]) + "\n" for hash_name in sorted(entries)]
+
+
+def write_glossary(base_dir: Path, count: int, seed: int = 0) -> GlossaryManager:
+  """Write a complete synthetic glossary repository to ``base_dir``."""
+  manager = GlossaryManager(base_dir)
+  for hash_name, entry in generate_entries(count, seed).items():
+    manager.set_entry(hash_name, entry['symbol'], entry['description'], entry['sort_key'])
+  if not manager.save():
+    raise OSError(f"Could not write synthetic glossary to {base_dir}")
+  return manager
@@ -0,0 +1,33 @@
+from pathlib import Path
+
+from batch_loader import load_many
+from synthetic_glossary import generate_entries, write_glossary
+
+
+def test_load_many_reports_results_and_errors(tmp_path: Path):
+  good = []
+  for i in range(3):
+    base_dir = tmp_path / f"repo{i}"
+    base_dir.mkdir()
+    write_glossary(base_dir, 50, seed=i)
+    good.append(str(base_dir))
+  missing = str(tmp_path / 'missing')
+
+  results = {result.base_dir: result for result in load_many(good + [missing], max_workers=2)}
+  assert set(results) == set(good) | {missing}
+  for i, base_dir in enumerate(good):
+    assert results[base_dir].error is None
+    assert dict(results[base_dir].glossary.entries) == generate_entries(50, seed=i)
+  assert results[missing].glossary is None
+  assert "Missing required files" in results[missing].error
+
+
+def test_load_many_keeps_the_malformed_lines(tmp_path: Path):
+  write_glossary(tmp_path, 20, seed=1)
+  nomenclature = tmp_path / 'nomenclature.tex'
+  nomenclature.write_text(nomenclature.read_text() + "\\NomenclaturEntry{broken}{x}\n")
+
+  [result] = load_many([str(tmp_path)], max_workers=1, use_cache=False)
+  assert result.error is None and len(result.glossary.entries) == 20
+  assert [(number, line) for number, line, _reason in result.glossary.load_errors] == \
+         [(21, "\\NomenclaturEntry{broken}{x}")]
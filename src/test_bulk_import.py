@@ -0,0 +1,87 @@
+import json
+import re
+from pathlib import Path
+
+import pytest
+
+import bulk_import
+from bulk_import import KEEP, REJECT, REPLACE, import_file, iter_records, valid_hash_names
+from models import GlossaryManager
+
+
+def _glossary(base_dir: Path) -> GlossaryManager:
+  base_dir.mkdir()
+  glossary = GlossaryManager(base_dir)
+  glossary.set_entry('temperature', 'T', 'temperature', 'T')
+  glossary.save()
+  return glossary
+
+
+def test_hash_names_follow_the_editor_rule():
+  names = ['temperature', 'qTemp2', 'T', '2T', '', 'q_T', 'qT ', 'é', 'ab\n']
+  assert valid_hash_names(names) == [re.fullmatch(r'[a-zA-Z][a-zA-Z0-9]*', name) is not None for name in names]
+
+
+def test_csv_import_with_policies(tmp_path: Path, monkeypatch):
+  monkeypatch.setattr(bulk_import, 'BATCH_SIZE', 2)
+  rows = tmp_path / 'old.csv'
+  rows.write_text('hash_name,symbol,description,sort_key\n'
+                  'temperature,\\theta,new temperature,T\n'
+                  'pressure,p,"pressure, absolute",p\n'
+                  '2bad,x,x,x\n'
+                  'volume,{V,unbalanced,V\n'
+                  'temperature,T,temperature,t\n'
+                  'mass,m,mass,\n'
+                  'density,rho\n')
+  same = tmp_path / 'same.csv'
+  same.write_text('hash_name,symbol,description,sort_key\ntemperature,T,temperature,T\n')
+  (tmp_path / 'no_sort_key.csv').write_text('hash_name,symbol,description\ntemperature,T,temperature\n')
+
+  glossary = _glossary(tmp_path / 'keep')
+  report = import_file(glossary, rows, KEEP)
+  assert (report.added, report.replaced, report.skipped, report.saved) == (1, 0, 2, True)
+  assert report.conflicts == [(2, 'temperature'), (6, 'temperature')]
+  assert [number for number, _reason in report.errors] == [4, 5, 7, 8]  # invalid, or lacking fields
+  assert glossary.entries['temperature']['symbol'] == 'T'
+  assert glossary.entries['pressure'] == {'symbol': 'p', 'description': 'pressure, absolute', 'sort_key': 'p'}
+  assert "\\def\\pressure{{p}}" in glossary.files.macros.read_text()
+  assert import_file(glossary, same).unchanged == 1
+  with pytest.raises(ValueError, match="sort_key"):
+    import_file(glossary, tmp_path / 'no_sort_key.csv')
+
+  glossary = _glossary(tmp_path / 'replace')
+  report = import_file(glossary, rows, REPLACE)
+  assert (report.added, report.replaced, report.skipped) == (1, 2, 0)
+  assert glossary.entries['temperature']['sort_key'] == 't'
+
+  glossary = _glossary(tmp_path / 'reject')
+  report = import_file(glossary, rows, REJECT)
+  assert (report.added, report.replaced, report.saved) == (0, 0, False)
+  assert set(glossary.entries) == {'temperature'}
+
+
+def test_json_array_and_lines_are_streamed(tmp_path: Path, monkeypatch):
+  monkeypatch.setattr(bulk_import, '_CHUNK_SIZE', 16)
+  entries = [{'hash_name': f'name{i}', 'symbol': f'x_{{{i}}}', 'description': 'ä, {b}', 'sort_key': 'x'}
+             for i in range(50)]
+  (tmp_path / 'rows.json').write_text(json.dumps(entries, indent=1, ensure_ascii=False))
+  assert [record for _number, record in iter_records(tmp_path / 'rows.json')] == entries
+
+  (tmp_path / 'rows.jsonl').write_text("\n".join(json.dumps(entry) for entry in entries[:2]) + "\n[1]\n{\n"
+                                       '{"hash_name": "x", "symbol": "x"}\n')
+  glossary = GlossaryManager(tmp_path)
+  report = import_file(glossary, tmp_path / 'rows.jsonl')
+  assert report.added == 2 and [number for number, _reason in report.errors] == [3, 4, 5]
+  assert GlossaryManager(tmp_path).load() and glossary.entries['name1']['symbol'] == 'x_{1}'
+
+
+def test_a_file_failing_part_way_changes_nothing(tmp_path: Path, monkeypatch):
+  monkeypatch.setattr(bulk_import, 'BATCH_SIZE', 1)
+  rows = [{'hash_name': 'temperature', 'symbol': '\\theta', 'description': 'temperature', 'sort_key': 'T'},
+          {'hash_name': 'pressure', 'symbol': 'p', 'description': 'pressure', 'sort_key': 'p'}]
+  (tmp_path / 'cut.json').write_text(json.dumps(rows)[:-1] + ', {"hash_name": "vol')
+  glossary = _glossary(tmp_path / 'glossary')
+
+  with pytest.raises(ValueError):
+    import_file(glossary, tmp_path / 'cut.json', REPLACE)
+  assert dict(glossary.entries) == {'temperature': {'symbol': 'T', 'description': 'temperature', 'sort_key': 'T'}}
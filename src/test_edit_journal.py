@@ -0,0 +1,110 @@
+from pathlib import Path
+
+import pytest
+
+from edit_journal import EditJournal, JournalConflict
+from models import GlossaryManager
+
+
+def _loaded(base_dir: Path) -> GlossaryManager:
+  glossary = GlossaryManager(base_dir)
+  assert glossary.load(use_cache=False)
+  return glossary
+
+
+def test_undo_redo_and_recovery_after_a_crash(tmp_path: Path):
+  glossary = GlossaryManager(tmp_path)
+  glossary.set_entry('temperature', 'T', 'temperature', 'T')
+  assert glossary.save()
+
+  journal = EditJournal(glossary, durable=False)
+  journal.set_entry('pressure', 'p', 'pressure', 'p')
+  journal.record({'theta': dict(glossary.entries['temperature']), 'temperature': None})  # a rename
+  journal.delete_entry('pressure')
+  assert journal.set_entry('theta', 'T', 'temperature', 'T') is None  # no change, not journaled
+
+  assert journal.undo() and set(glossary.entries) == {'theta', 'pressure'}
+  assert journal.undo() and set(glossary.entries) == {'temperature', 'pressure'}
+  assert journal.redo() and set(glossary.entries) == {'theta', 'pressure'}
+  assert journal.can_undo and journal.can_redo
+  journal.close()
+
+  # Crash: nothing saved since the first entry; the last record is cut short
+  with open(glossary.files.journal, 'ab') as f:
+    f.write(b'{"kind":"edit","st')
+  recovered = _loaded(tmp_path)
+  assert set(recovered.entries) == {'temperature'}
+  journal = EditJournal(recovered, durable=False)
+  assert journal.recover() == 6
+  assert dict(recovered.entries) == dict(glossary.entries)
+  assert recovered.is_dirty and glossary.files.journal.read_bytes().endswith(b']]}\n')
+
+  # The history is rebuilt: one more redo deletes pressure again
+  assert journal.redo() and set(recovered.entries) == {'theta'}
+  assert journal.compact() and glossary.files.journal.read_text().count("\n") == 1  # the base record
+  assert set(_loaded(tmp_path).entries) == {'theta'}
+  assert journal.undo() and set(recovered.entries) == {'theta', 'pressure'}  # history outlives compaction
+
+  # Replaying records that were already saved changes nothing
+  journal.close()
+  again = _loaded(tmp_path)
+  assert EditJournal(again).recover() == 1 and set(again.entries) == {'theta', 'pressure'}
+
+
+def test_journal_compacts_itself(tmp_path: Path):
+  glossary = GlossaryManager(tmp_path)
+  journal = EditJournal(glossary, durable=False)
+  journal.COMPACT_AFTER = 3
+  for i in range(4):
+    journal.set_entry(f'x{i}', 'x', 'x', 'x')
+  assert glossary.pending_changes()[0] == {'x3'}
+  assert glossary.files.journal.read_text().count("\n") == 2  # the base record and x3
+  assert set(_loaded(tmp_path).entries) == {'x0', 'x1', 'x2'}
+
+
+def test_recovery_checks_changes_made_outside_the_editor(tmp_path: Path):
+  glossary = GlossaryManager(tmp_path)
+  glossary.set_entry('temperature', 'T', 'temperature', 'T')
+  glossary.set_entry('volume', 'V', 'volume', 'V')
+  assert glossary.save()
+  journal = EditJournal(glossary, durable=False)
+  journal.set_entry('temperature', '\\theta', 'temperature', 'T')
+  journal.set_entry('pressure', 'p', 'pressure', 'p')
+  assert glossary.save()  # a background save
+  journal.set_entry('pressure', 'P', 'pressure', 'p')
+  journal.close()
+
+  # Our own saves and outside changes of other entries are no reason to stop
+  other = _loaded(tmp_path)
+  other.set_entry('volume', 'v', 'volume', 'V')
+  assert other.save()
+  recovered = _loaded(tmp_path)
+  assert EditJournal(recovered, durable=False).recover() == 3
+  assert recovered.entries['pressure']['symbol'] == 'P' and recovered.entries['volume']['symbol'] == 'v'
+
+  # A journaled entry changed by another tool is not overwritten without asking
+  other.set_entry('temperature', '\\tau', 'temperature', 'T')
+  assert other.save()
+  recovered = _loaded(tmp_path)
+  journal = EditJournal(recovered, durable=False)
+  with pytest.raises(JournalConflict) as conflict:
+    journal.recover()
+  assert conflict.value.hash_names == ['temperature'] and not recovered.is_dirty
+  assert journal.recover(force=True) == 3 and recovered.entries['temperature']['symbol'] == '\\theta'
+  rejected = EditJournal(_loaded(tmp_path), durable=False)
+  assert rejected.set_aside().exists() and not glossary.files.journal.exists()
+
+
+def test_rebase_forgets_the_history_of_entries_changed_outside(tmp_path: Path):
+  glossary = GlossaryManager(tmp_path)
+  journal = EditJournal(glossary, durable=False)
+  journal.set_entry('temperature', 'T', 'temperature', 'T')
+  assert not journal.rebase(['volume'])
+  glossary.set_entry('temperature', '\\tau', 'temperature', 'T')  # as reload() applies it
+  assert journal.rebase(['temperature']) and not journal.can_undo
+  journal.close()
+
+  recovered = GlossaryManager(tmp_path)
+  journal = EditJournal(recovered, durable=False)
+  assert journal.recover() == 2 and recovered.entries['temperature']['symbol'] == '\\tau'
+  assert not journal.can_undo
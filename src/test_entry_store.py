@@ -0,0 +1,44 @@
+from pathlib import Path
+
+from entry_store import ColumnarEntryStore
+from models import GlossaryManager
+
+
+def test_store_behaves_like_a_dict():
+  store = ColumnarEntryStore({'a': {'symbol': 'A', 'description': 'alpha', 'sort_key': 'a'}})
+  store['b'] = {'symbol': 'B', 'description': 'beta', 'sort_key': 'a'}
+  assert store['b'] == {'symbol': 'B', 'description': 'beta', 'sort_key': 'a'}
+  assert store.get('c') is None and 'b' in store and len(store) == 2
+
+  del store['a']
+  store['c'] = {'symbol': 'C', 'description': 'gamma', 'sort_key': 'c'}
+  assert list(store) == ['b', 'c']
+  assert len(store._symbols) == 2  # the row of 'a' was reused
+
+  snapshot = store.copy()
+  store['b'] = {'symbol': 'X', 'description': 'beta', 'sort_key': 'b'}
+  assert snapshot['b']['symbol'] == 'B'
+
+  store['d'] = {'symbol': 'D', 'description': 'delta', 'sort_key': ''.join(['c'])}
+  assert store['d']['sort_key'] is store['c']['sort_key']  # interned
+
+  # Values leave the pool with their last use, and copies keep their own pool
+  assert 'B' not in store._pool and 'B' in snapshot._pool and 'X' not in snapshot._pool
+  del store['c'], store['d']
+  assert set(store._pool) == {'X', 'b'}
+  snapshot.clear()
+  assert set(store._pool) == {'X', 'b'} and store['b']['symbol'] == 'X'
+
+
+def test_compact_manager_round_trip(tmp_path: Path):
+  for name in ('nomenclature.tex', 'def_vars.tex', 'macros.tex'):
+    (tmp_path / name).write_text('')
+  manager = GlossaryManager(tmp_path, compact=True)
+  assert manager.load()
+  manager.set_entry('T', 'T', 'temperature', 'T')
+  assert manager.save()
+
+  reloaded = GlossaryManager(tmp_path, compact=True)
+  assert reloaded.load()
+  assert isinstance(reloaded.entries, ColumnarEntryStore)
+  assert dict(reloaded.entries) == {'T': {'symbol': 'T', 'description': 'temperature', 'sort_key': 'T'}}
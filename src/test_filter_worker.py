@@ -0,0 +1,55 @@
+import threading
+
+from filter_worker import FilterWorker
+from search_index import SubstringIndex
+
+
+def test_only_the_latest_query_is_searched_and_reported():
+  index = SubstringIndex([f"temperature{i}" for i in range(100)] + ['pressure'])
+  searched = []
+  results = []
+  done = threading.Event()
+
+  def search(query):
+    searched.append(query)
+    return index.search(query)
+
+  def on_result(generation, query, rows):
+    results.append((generation, query, rows))
+    done.set()
+
+  worker = FilterWorker(search, on_result, delay=0.2)
+  for query in ['p', 'pr', 'pre', 'pres']:
+    generation = worker.submit(query)
+  assert done.wait(timeout=10)
+  worker.shutdown(timeout=10)
+
+  assert searched == ['pres']
+  assert results == [(generation, 'pres', [100])]
+
+
+def test_cancelled_query_is_not_reported():
+  results = []
+  worker = FilterWorker(lambda query: [0], lambda *result: results.append(result), delay=0.05)
+  worker.submit('x')
+  worker.cancel()
+  worker.shutdown(timeout=10)
+  assert results == []
+
+
+def test_nothing_is_reported_after_shutdown():
+  results = []
+  searching = threading.Event()
+  release = threading.Event()
+
+  def search(query):
+    searching.set()
+    release.wait(timeout=10)
+    return [0]
+
+  worker = FilterWorker(search, lambda *result: results.append(result), delay=0)
+  worker.submit('x')
+  assert searching.wait(timeout=10)
+  threading.Timer(0.05, release.set).start()
+  worker.shutdown(timeout=10)
+  assert results == [] and not worker._thread.is_alive()
@@ -0,0 +1,65 @@
+from fuzzy_search import SUBSTRING_SCORE, FuzzySearchIndex, merge_substring_hits, tokenize, within_one_edit
+from search_index import SubstringIndex
+
+ENTRIES = {
+        'temperature': {'symbol': 'T', 'description': 'absolute temperature', 'sort_key': 'T'},
+        'qTemp'      : {'symbol': r'\temperature^2', 'description': 'squared temperature', 'sort_key': 'q'},
+        'pressure'   : {'symbol': 'p', 'description': 'static pressure', 'sort_key': 'p'},
+        'heatFlux'   : {'symbol': r'\hat{q}_{in}', 'description': 'heat flux into the tank', 'sort_key': 'q'},
+        }
+
+
+def test_tokenize_splits_camel_case_latex_and_numbers():
+  assert tokenize('qTemp') == ['q', 'temp']
+  assert tokenize(r'\hat{T}_{3}') == ['hat', 't', '3']
+  assert tokenize('heat flux, HTML') == ['heat', 'flux', 'html']
+  assert tokenize('HTMLParser x2Δp') == ['html', 'parser', 'x', '2', 'δp']
+  assert tokenize('Größe, θερμοκρασία ΔT') == ['grösse', 'θερμοκρασία', 'δt']
+  assert within_one_edit('presure', 'pressure') and within_one_edit('tank', 'tanks')
+  assert not within_one_edit('pressure', 'presume')
+
+
+def test_ranked_matches_over_all_fields():
+  index = FuzzySearchIndex(ENTRIES)
+  assert [name for name, _ in index.search('temperature')][:2] == ['temperature', 'qTemp']
+  assert index.search('T')[0][0] == 'temperature'  # matched through its symbol
+  assert [name for name, _ in index.search('flux tank')] == ['heatFlux']
+  assert [name for name, _ in index.search('presure')] == ['pressure']  # one typo
+  assert index.search('temp', limit=1) == index.search('temp')[:1]
+  assert index.search('nothing') == [] and index.search('') == []
+
+
+def test_non_ascii_descriptions_are_found():
+  index = FuzzySearchIndex({'size': {'symbol': 'L', 'description': 'charakteristische Größe', 'sort_key': 'L'},
+                            'theta': {'symbol': r'\theta', 'description': 'θερμοκρασία', 'sort_key': 't'}})
+  assert [name for name, _ in index.search('größe')] == ['size']
+  assert [name for name, _ in index.search('GRÖSSE')] == ['size']
+  assert [name for name, _ in index.search('θερμο')] == ['theta']  # prefix
+  assert [name for name, _ in index.search('charakteristishe')] == ['size']  # one typo
+
+
+def test_updates_and_removals():
+  index = FuzzySearchIndex(ENTRIES)
+  index.add('pressure', {'symbol': 'P', 'description': 'vapour pressure', 'sort_key': 'P'})
+  assert [name for name, _ in index.search('vapour')] == ['pressure']
+  assert index.search('static') == []
+  assert index.remove('qTemp') and not index.remove('qTemp')
+  assert 'qTemp' not in [name for name, _ in index.search('temperature')]
+  assert len(index) == 3
+
+
+def test_substring_hits_on_hash_names_follow_the_ranked_results():
+  entries = dict(ENTRIES, var1={'symbol': 'v_1', 'description': 'first variable', 'sort_key': 'v'})
+  index = FuzzySearchIndex(entries)
+  names = list(entries)
+  substrings = SubstringIndex(names)
+
+  def search(query, limit=50):
+    ranked = index.search(query, limit)
+    return merge_substring_hits(ranked, (names[row] for row in substrings.search(query)), limit)
+
+  for query, name in (('emp', 'temperature'), ('ature', 'temperature'), ('ar1', 'var1')):
+    assert index.search(query) == []
+    assert (name, SUBSTRING_SCORE) in search(query)
+  assert search('temp') == index.search('temp')  # found by the ranked search already
+  assert len(search('e', limit=2)) == 2
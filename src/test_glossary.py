@@ -23,4 +23,90 @@ def test_glossary_loading():
     # Test saving
     assert manager.save()
     assert (Path(tmpdir) / 'defvars.tex').exists()
-    assert (Path(tmpdir) / 'macros.tex').exists()
\ No newline at end of file
+    assert (Path(tmpdir) / 'macros.tex').exists()
+
+
+def _full_save(entries):
+  """Render the three files the way a complete rewrite does."""
+  ordered = sorted(entries.items())
+  # Macros using another entry follow it; the test data nests one level deep
+  by_dependency = sorted(ordered, key=lambda item: any(f"\\{h}" in item[1]['symbol'] for h in entries))
+  return (
+      "".join(f"\\NomenclaturEntry{{{h}}}{{{e['symbol']}}}{{{e['description']}}}{{{e['sort_key']}}}\n"
+              for h, e in ordered),
+      "".join(f"\\def\\{h}{{\\Var{{{h}}}}}\n" for h, _ in ordered),
+      "".join(f"\\def\\{h}{{{{{e['symbol']}}}}}\n" for h, e in by_dependency),
+      )
+
+
+def test_incremental_save_only_touches_changed_files(tmp_path):
+  for name in ('nomenclature.tex', 'def_vars.tex', 'macros.tex'):
+    (tmp_path / name).write_text('')
+  manager = GlossaryManager(tmp_path)
+  assert manager.load()
+  manager.set_entry('temperature', 'T', 'temperature', 'T')
+  manager.set_entry('qTemp', r'\temperature^2', 'temperature quadrat', 'T')
+  assert manager.pending_changes() == ({'temperature', 'qTemp'}, set(), set())
+  assert manager.save()
+  assert not manager.is_dirty
+
+  files = [tmp_path / name for name in ('nomenclature.tex', 'def_vars.tex', 'macros.tex')]
+  assert tuple(path.read_text() for path in files) == _full_save(manager.entries)
+  before = [path.stat().st_mtime_ns for path in files]
+
+  manager.set_entry('temperature', 'T', 'absolute temperature', 'T')
+  assert manager.save()
+  after = [path.stat().st_mtime_ns for path in files]
+  assert after[1:] == before[1:]  # only the description changed
+  assert tuple(path.read_text() for path in files) == _full_save(manager.entries)
+
+  manager.delete_entry('qTemp')
+  assert manager.pending_changes() == (set(), set(), {'qTemp'})
+  assert manager.save()
+  assert tuple(path.read_text() for path in files) == _full_save(manager.entries)
+
+
+def test_changes_since_reports_recent_changes(tmp_path: Path):
+  glossary = GlossaryManager(tmp_path)
+  glossary.set_entry('x', 'x', 'first', 'x')
+  start = glossary.revision
+  glossary.set_entry('y', 'y', 'second', 'y')
+  glossary.set_entry('x', 'x', 'first again', 'x')
+  glossary.delete_entry('y')
+  assert glossary.changes_since(start) == {'x', 'y'}
+  assert glossary.changes_since(glossary.revision) == set()
+
+  glossary.adopt_entries({'z': {'symbol': 'z', 'description': 'third', 'sort_key': 'z'}})
+  assert glossary.changes_since(start) is None
+
+
+def test_load_reports_progress_errors_and_cancellation(tmp_path: Path, monkeypatch):
+  monkeypatch.setattr(GlossaryManager, 'PROGRESS_INTERVAL', 10)
+  lines = [f"\\NomenclaturEntry{{x{i}}}{{x_{i}}}{{variable {i}}}{{x}}\n" for i in range(50)]
+  lines[3] = "\\NomenclaturEntry{broken}{x}\n"
+  (tmp_path / 'nomenclature.tex').write_bytes("".join(lines).encode() + b"\\NomenclaturEntry{bad}{\xff}{x}{x}\n")
+  for name in ('def_vars.tex', 'macros.tex'):
+    (tmp_path / name).write_text('')
+
+  reports = []
+  manager = GlossaryManager(tmp_path)
+  assert manager.load(progress=lambda done, total: reports.append((done, total)))
+  assert len(manager.entries) == 49
+  assert [number for number, _line, _reason in manager.load_errors] == [4, 51]
+  assert reports[-1][0] == reports[-1][1] and reports == sorted(reports)
+  assert not manager.files.cache.exists()  # reparsed, and reported, on every load
+
+  assert not manager.load(should_stop=lambda: True)
+  assert not manager.entries
+
+
+def test_expanded_symbols_follow_edits(tmp_path: Path):
+  glossary = GlossaryManager(tmp_path)
+  glossary.set_entry('temperature', 'T', 'temperature', 'T')
+  glossary.set_entry('qTemp', r'\temperature^2', 'temperature quadrat', 'T')
+  assert glossary.expand_symbols() == {'temperature': 'T', 'qTemp': 'T^2'}
+
+  glossary.set_entry('temperature', r'\vartheta', 'temperature', 'T')
+  assert glossary.expand_symbol('qTemp') == r'\vartheta^2'
+  glossary.delete_entry('temperature')
+  assert glossary.expand_symbol('qTemp') == r'\temperature^2'
@@ -0,0 +1,70 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+from glossary_cli import main
+
+
+def test_subcommands_on_a_glossary(tmp_path: Path, capsys):
+  (tmp_path / 'nomenclature.tex').write_text("\\NomenclaturEntry{temperature}{T}{temperature}{T}\n"
+                                             "\\NomenclaturEntry{qTemp}{\\temperature^2}{squared, \"quoted\"}{T}\n")
+  assert main(['validate', str(tmp_path)]) == 1  # def_vars.tex and macros.tex are missing
+  assert main(['regenerate', str(tmp_path)]) == 0
+  assert (tmp_path / 'macros.tex').read_text() == "\\def\\temperature{{T}}\n\\def\\qTemp{{\\temperature^2}}\n"
+  capsys.readouterr()
+
+  assert main(['validate', str(tmp_path)]) == 0
+  assert main(['lookup', str(tmp_path), 'qTemp', '--expand']) == 0
+  assert capsys.readouterr().out == "qTemp\tT^2\tsquared, \"quoted\"\tT\n"
+  assert main(['lookup', str(tmp_path), 'qTemp', 'pressure']) == 1
+  assert capsys.readouterr().err == "unknown entry: pressure\n"
+
+  assert main(['stats', str(tmp_path), '--json']) == 0
+  stats = json.loads(capsys.readouterr().out)
+  assert stats['entries'] == 2 and stats['symbols_with_macros'] == 1 and stats['undefined_macros'] == 0
+
+  assert main(['export', str(tmp_path), '--format', 'csv', '-o', str(tmp_path / 'entries.csv')]) == 0
+  assert (tmp_path / 'entries.csv').read_text().splitlines() == [
+          'hash_name,symbol,description,sort_key',
+          'qTemp,\\temperature^2,"squared, ""quoted""",T',
+          'temperature,T,temperature,T',
+          ]
+  copy = tmp_path / 'copy'
+  copy.mkdir()
+  assert main(['import', str(copy), str(tmp_path / 'entries.csv')]) == 0
+  assert capsys.readouterr().out == "added 2, replaced 0, unchanged 0, skipped 0, invalid 0\n"
+  assert (copy / 'macros.tex').read_text() == (tmp_path / 'macros.tex').read_text()
+
+  (tmp_path / 'macros.tex').write_text("")
+  with open(tmp_path / 'nomenclature.tex', 'a') as f:
+    f.write("\\NomenclaturEntry{bad}{x}\n")
+  capsys.readouterr()
+  assert main(['validate', str(tmp_path)]) == 1
+  report = capsys.readouterr().out
+  assert "nomenclature.tex:3:" in report and "macros.tex: out of date" in report
+
+
+def test_cli_imports_neither_qt_nor_the_glossary_until_needed():
+  code = ("import sys, glossary_cli; before = set(sys.modules); glossary_cli.build_parser(); "
+          "print('models' in before, any(name.startswith('PyQt') for name in sys.modules))")
+  output = subprocess.run([sys.executable, '-c', code], cwd=Path(__file__).parent,
+                          capture_output=True, text=True, check=True).stdout
+  assert output.split() == ['False', 'False']
+
+  code = ("import sys, models; print(sorted({'macro_graph', 'symbol_index', 'symbol_resolver', "
+          "'glossary_validator'} & set(sys.modules)))")
+  output = subprocess.run([sys.executable, '-c', code], cwd=Path(__file__).parent,
+                          capture_output=True, text=True, check=True).stdout
+  assert output.strip() == '[]'  # built, and imported, on first use
+
+
+def test_merge_refuses_a_target_among_the_sources(tmp_path: Path, capsys):
+  for name in ('a', 'b'):
+    (tmp_path / name).mkdir()
+    (tmp_path / name / 'nomenclature.tex').write_text("\\NomenclaturEntry{temperature}{T}{temperature}{T}\n")
+  assert main(['merge', str(tmp_path / 'a'), str(tmp_path / 'a'), str(tmp_path / 'b')]) == 1
+  assert "is one of the sources" in capsys.readouterr().err
+  assert main(['merge', str(tmp_path / 'c'), str(tmp_path / 'a'), str(tmp_path / 'b' / '..' / 'a')]) == 1
+  assert "more than once" in capsys.readouterr().err
+  assert not (tmp_path / 'c').exists()
@@ -0,0 +1,67 @@
+from pathlib import Path
+
+import pytest
+
+from glossary_merge import FIRST, LAST, MAJORITY, OMIT, GlossaryMerger, format_report, merge_directories, write_merged
+from models import GlossaryManager
+
+T = {'symbol': 'T', 'description': 'temperature', 'sort_key': 'T'}
+THETA = {'symbol': '\\theta', 'description': 'temperature', 'sort_key': 'T'}
+P = {'symbol': 'p', 'description': 'pressure', 'sort_key': 'p'}
+
+
+def _merged(prefer: str, order=(0, 1, 2)):
+  sources = [{'temperature': T, 'pressure': P}, {'temperature': THETA}, {'temperature': THETA, 'volume': P}]
+  merger = GlossaryMerger(['a', 'b', 'c'], prefer)
+  for i in order:
+    merger.add(i, sources[i])
+  return merger.result()
+
+
+def test_entries_are_merged_by_content_hash():
+  result = _merged(FIRST)
+  assert (result.unique, result.identical) == (2, 0)
+  [conflict] = result.conflicts
+  assert conflict.hash_name == 'temperature'
+  assert [(variant.entry, variant.sources) for variant in conflict.variants] == [(T, ['a']), (THETA, ['b', 'c'])]
+  assert result.entries == {'temperature': T, 'pressure': P, 'volume': P}
+
+  assert _merged(FIRST, order=(2, 1, 0)).entries == result.entries  # sources may come in any order
+  assert _merged(LAST).entries['temperature'] == THETA
+  assert _merged(MAJORITY).entries['temperature'] == THETA
+  omitted = _merged(OMIT)
+  assert 'temperature' not in omitted.entries and omitted.conflicts[0].chosen is None
+  assert "  * {\\theta}{temperature}{T}  from b, c" in format_report(_merged(LAST))
+
+  merger = GlossaryMerger(['a', 'b'])
+  merger.add(0, {'pressure': P})
+  merger.add(1, {'pressure': dict(P)})
+  assert (merger.result().identical, merger.result().conflicts) == (1, [])
+
+
+def test_directories_are_merged_into_a_new_glossary(tmp_path: Path):
+  sources = []
+  for name, entries in (('a', {'temperature': T}), ('b', {'temperature': THETA, 'pressure': P})):
+    (tmp_path / name).mkdir()
+    glossary = GlossaryManager(tmp_path / name)
+    for hash_name, entry in entries.items():
+      glossary.set_entry(hash_name, entry['symbol'], entry['description'], entry['sort_key'])
+    assert glossary.save()
+    sources.append(tmp_path / name)
+
+  with open(tmp_path / 'b' / 'nomenclature.tex', 'a') as f:
+    f.write("\\NomenclaturEntry{broken}\n")
+
+  result = merge_directories(sources + [tmp_path / 'missing'], max_workers=2)
+  assert [source for source, _reason in result.errors] == [str(tmp_path / 'missing')]
+  assert [(source, number) for source, number, _reason in result.malformed] == [(str(tmp_path / 'b'), 3)]
+  assert f"skipped line 3 of {tmp_path / 'b'}: " in format_report(result)
+  assert [conflict.hash_name for conflict in result.conflicts] == ['temperature']
+
+  with pytest.raises(ValueError, match="more than once"):
+    merge_directories([sources[0], tmp_path / 'b' / '..' / 'a'])  # would agree with itself
+
+  (tmp_path / 'merged').mkdir()
+  assert write_merged(result, tmp_path / 'merged')
+  merged = GlossaryManager(tmp_path / 'merged')
+  assert merged.load() and dict(merged.entries) == {'temperature': T, 'pressure': P}
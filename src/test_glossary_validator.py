@@ -0,0 +1,38 @@
+from pathlib import Path
+
+from glossary_validator import BRACES, HASH_NAME, RESERVED, SORT_KEY, EntryValidator, brace_problem, check_entry
+from models import GlossaryManager
+
+
+def test_checks():
+  assert brace_problem('\\hat{T}') is None and brace_problem('\\{a\\}') is None
+  assert brace_problem('{a') == "leaves 1 brace open"
+  assert brace_problem('a}{') == "closes a brace that is not open"
+  assert brace_problem('{\\}') == "leaves 1 brace open"
+  assert "cannot hold" in brace_problem('\\{')
+
+  codes = lambda hash_name, symbol, description, sort_key: [
+          issue.code for issue in check_entry(hash_name, {'symbol': symbol, 'description': description,
+                                                          'sort_key': sort_key})]
+  assert codes('temperature', 'T', 'temperature', 'T') == []
+  assert codes('T', 'T', 'temperature', 'T') == [RESERVED]
+  assert codes('alpha', 'T', 'temperature', 'T') == [RESERVED]
+  assert codes('q_T', '{T', 'heat {flow', ' ') == [HASH_NAME, BRACES, BRACES, SORT_KEY]
+
+
+def test_only_changed_contents_are_checked_again(tmp_path: Path):
+  entries = {f'x{i}': {'symbol': 'x', 'description': 'x', 'sort_key': 'x'} for i in range(100)}
+  entries['def'] = {'symbol': 'd', 'description': 'd', 'sort_key': ''}
+  validator = EntryValidator()
+  assert [issue.code for issue in validator.validate(entries)] == [RESERVED, SORT_KEY]
+  assert validator.checked == 101
+  assert len(validator.validate(dict(entries))) == 2 and validator.checked == 0  # all cached
+
+  glossary = GlossaryManager(tmp_path)
+  glossary.adopt_entries(entries)
+  assert len(glossary.validate()) == 2
+  glossary.set_entry('def', 'd', 'd', 'd')
+  glossary.set_entry('x1', '{x', 'x', 'x')
+  glossary.delete_entry('x2')
+  assert [(issue.hash_name, issue.code) for issue in glossary.validate()] == [('def', RESERVED), ('x1', BRACES)]
+  assert glossary._validator.checked == 2
@@ -0,0 +1,72 @@
+import os
+from pathlib import Path
+
+from models import GlossaryManager
+
+
+def _write(path: Path, text: str) -> None:
+  path.write_text(text)
+  stat = path.stat()
+  os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))  # make the change visible
+
+
+def test_reload_reports_deltas_and_keeps_entries(tmp_path: Path):
+  nomenclature = tmp_path / 'nomenclature.tex'
+  nomenclature.write_text("\\NomenclaturEntry{a}{A}{alpha}{a}\n"
+                          "\\NomenclaturEntry{b}{B}{beta}{b}\n"
+                          "\\NomenclaturEntry{c}{C}{gamma}{c}\n")
+  (tmp_path / 'def_vars.tex').write_text('')
+  (tmp_path / 'macros.tex').write_text('')
+
+  manager = GlossaryManager(tmp_path)
+  assert manager.load(use_cache=False)
+  entries = manager.entries
+  assert not manager.reload()
+  assert manager.index['b'].start == nomenclature.read_bytes().index(b'\\NomenclaturEntry{b}')
+
+  _write(nomenclature, "\\NomenclaturEntry{a}{A}{alpha}{a}\n"
+                       "\\NomenclaturEntry{c}{\\gamma}{gamma}{c}\n"
+                       "\\NomenclaturEntry{d}{D}{delta}{d}\n")
+  delta = manager.reload()
+  assert (delta.added, delta.changed, delta.removed) == (['d'], ['c'], ['b'])
+  assert manager.entries is entries
+  assert sorted(entries) == ['a', 'c', 'd']
+  assert entries['c']['symbol'] == '\\gamma'
+  assert manager.index['d'].end == nomenclature.stat().st_size
+
+  assert manager.save()
+  assert not manager.reload()
+
+
+def test_reload_keeps_unsaved_changes(tmp_path: Path):
+  nomenclature = tmp_path / 'nomenclature.tex'
+  nomenclature.write_text("\\NomenclaturEntry{temperature}{T}{temperature}{T}\n"
+                          "\\NomenclaturEntry{volume}{V}{volume}{V}\n")
+  (tmp_path / 'def_vars.tex').write_text('')
+  (tmp_path / 'macros.tex').write_text('')
+
+  manager = GlossaryManager(tmp_path)
+  assert manager.load(use_cache=False)
+  manager.set_entry('pressure', 'p', 'pressure', 'p')
+  manager.set_entry('temperature', '\\theta', 'temperature', 'T')
+  _write(nomenclature, nomenclature.read_text() + "\\NomenclaturEntry{mass}{m}{mass}{m}\n")
+  delta = manager.reload()
+  assert (delta.added, delta.changed, delta.removed, delta.conflicts) == (['mass'], [], [], [])
+  assert manager.entries['pressure']['symbol'] == 'p'
+  assert manager.entries['temperature']['symbol'] == '\\theta'
+
+  # Once indexed, changes of the file to entries with unsaved edits are reported
+  manager.delete_entry('volume')
+  _write(nomenclature, "\\NomenclaturEntry{mass}{m}{mass}{m}\n"
+                       "\\NomenclaturEntry{temperature}{\\tau}{temperature}{T}\n"
+                       "\\NomenclaturEntry{volume}{V}{volume}{V}\n")
+  delta = manager.reload()
+  assert not delta and delta.conflicts == ['temperature']
+  assert manager.entries['temperature']['symbol'] == '\\theta' and 'volume' not in manager.entries
+
+  assert manager.save()
+  saved = nomenclature.read_text()
+  assert "{pressure}{p}" in saved and "{temperature}{\\theta}" in saved and "{volume}" not in saved
+  manager.set_entry('pressure', 'P', 'pressure', 'p')
+  assert not manager.reload()  # the file as save() wrote it
+  assert manager.entries['pressure']['symbol'] == 'P'
@@ -0,0 +1,35 @@
+from macro_graph import MacroGraph, references
+
+
+def _entries(**symbols):
+  return {name: {'symbol': symbol, 'description': name, 'sort_key': name} for name, symbol in symbols.items()}
+
+
+def test_references_and_incremental_missing_targets():
+  assert references(r'\hat{\temperature2}^2 \,') == {'hat', 'temperature2'}
+  graph = MacroGraph(_entries(temperature='T', qTemp=r'\temperature^2', flux=r'\dot{\heat}'))
+  assert graph.dependencies('qTemp') == {'temperature'}
+  assert graph.dependents('temperature') == {'qTemp'}
+  assert graph.missing() == {'heat': ['flux']}
+
+  graph.set('heat', 'Q')
+  assert graph.missing() == {}
+  graph.remove('temperature')
+  assert graph.missing() == {'temperature': ['qTemp']}
+  assert graph.missing_references('qTemp') == ['temperature']
+  graph.set('qTemp', 'q')
+  assert graph.missing() == {}
+
+
+def test_cycles_and_dependency_order():
+  graph = MacroGraph(_entries(a=r'\b + \c', b=r'\c', c='x', d=r'\e', e=r'\a'))
+  assert graph.find_cycle('a') is None
+  assert graph.ordered(['a', 'b', 'c', 'd', 'e']) == ['c', 'b', 'a', 'e', 'd']
+  assert graph.transitive_dependents(['c']) == {'a', 'b', 'e', 'd'}
+
+  graph.set('c', r'\d')
+  assert graph.find_cycle('c') == ['c', 'd', 'e', 'a', 'c']
+  assert graph.cycles() == [['a', 'b', 'c', 'd', 'e']]
+  graph.set('x', r'\x')
+  assert graph.find_cycle('x') == ['x', 'x']
+  assert sorted(graph.ordered('abcdex')) == ['a', 'b', 'c', 'd', 'e', 'x']
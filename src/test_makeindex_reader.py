@@ -0,0 +1,40 @@
+from pathlib import Path
+
+from makeindex_reader import iter_ndn_records, map_to_entries, read_ndn, read_nld, read_usage
+
+USAGE = Path(__file__).parent.parent / 'usage'
+
+
+def test_ndn_records_are_aggregated_per_entry(tmp_path: Path):
+  usage = read_usage(USAGE / 'HelloWorld.ndn')
+  assert {name: (list(entry.pages), entry.count) for name, entry in usage.items()} == {
+          'temperature': (['1', '2'], 3),
+          'qTemp'      : (['1'], 1),
+          }
+
+  ndn = tmp_path / 'book.ndn'
+  ndn.write_text("\\glossaryentry{a\"?b?\\glossentry{ratio}|(setentrycounter[]{page}\\glsnumberformat}{iv}\n"
+                 "garbage\n"
+                 "\\glossaryentry{p?\\glossentry{parent}!c?\\subglossentry{1}{child}|hyperpage}{7}\n")
+  errors = []
+  records = list(iter_ndn_records(ndn, lambda *error: errors.append(error)))
+  assert [(r.hash_name, r.page, r.encap[:1], r.line) for r in records] == [('ratio', 'iv', '(', 1),
+                                                                          ('child', '7', 'h', 3)]
+  assert [number for number, _line, _reason in errors] == [2]
+  assert set(read_ndn(ndn)) == {'ratio', 'child'}
+
+
+def test_nld_pages_and_mapping_onto_entries(tmp_path: Path):
+  usage = read_nld(USAGE / 'HelloWorld.nld')
+  assert {name: list(entry.pages) for name, entry in usage.items()} == {'qTemp': ['1'], 'temperature': ['1']}
+
+  nld = tmp_path / 'book.nld'
+  nld.write_text("\\glossentry{a}{\\glossaryentrynumbers{\\relax \\setentrycounter[]{page}\\glsnumberformat{1}"
+                 "\\delimN \n\\setentrycounter[]{page}\\textbf{12}}}%\n"
+                 "\\glossentry{b}{\\glossaryentrynumbers{\\relax \\setentrycounter[]{page}\\glsnumberformat{3}}}%\n")
+  usage = read_nld(nld)
+  assert list(usage['a'].pages) == ['1', '12'] and usage['a'].count == 2
+
+  mapped, unknown = map_to_entries(usage, {'a': {}, 'c': {}})
+  assert mapped['a'].count == 2 and mapped['c'].count == 0
+  assert unknown == ['b']
@@ -0,0 +1,54 @@
+from pathlib import Path
+
+import pytest
+
+from benchmark import legacy_parse_line
+from nomenclature_parser import iter_entries, parse_line, parse_many
+from synthetic_glossary import synthetic_lines
+
+
+def test_parse_line_edge_cases():
+  assert parse_line(r"\NomenclaturEntry{T}{T}{temperature}{T}") == ('T', 'T', 'temperature', 'T')
+  assert parse_line(r"\NomenclaturEntry {}{a}{b}{c}{d}") == ('a', 'b', 'c', 'd')
+  assert parse_line(r"\NomenclaturEntry{q}{\frac{a}{b}^{2}}{x {y}}{q} % tail") == \
+         ('q', r'\frac{a}{b}^{2}', 'x {y}', 'q')
+
+  for line in [r"\nomenclature{a}{b}{c}{d}",
+               r"\NomenclaturEntry a{b}{c}{d}",
+               r"\NomenclaturEntry{a}{b}{c}",
+               r"\NomenclaturEntry{a}{b{c}{d}"]:
+    with pytest.raises(ValueError):
+      parse_line(line)
+
+
+def test_parse_line_matches_legacy_parser():
+  for line in synthetic_lines(300):
+    assert parse_line(line.strip()) == legacy_parse_line(line.strip())
+
+
+def test_parse_many_collects_errors():
+  errors = []
+  entries = parse_many(["% comment\n", "\n",
+                        "\\NomenclaturEntry{a}{A}{alpha}{a}\n",
+                        "\\NomenclaturEntry{b}{B}\n"], errors)
+  assert entries == {'a': {'symbol': 'A', 'description': 'alpha', 'sort_key': 'a'}}
+  assert [(number, reason) for number, _, reason in errors] == [(4, "Expected 4 arguments, got 2")]
+
+
+def test_iter_entries_yields_byte_offsets(tmp_path: Path):
+  path = tmp_path / 'nomenclature.tex'
+  content = "% header\n\\NomenclaturEntry{t}{\u03c4}{time}{t}\r\nbroken\n\\NomenclaturEntry{x}{x}{length}{x}"
+  path.write_bytes(content.encode('utf-8'))
+  data = path.read_bytes()
+
+  for use_mmap in (False, True):
+    errors = []
+    entries = list(iter_entries(path, use_mmap, lambda *error: errors.append(error)))
+    assert [entry.hash_name for entry in entries] == ['t', 'x']
+    assert entries[0].symbol == '\u03c4'
+    assert data[entries[0].start:entries[0].end].endswith(b'{t}\r\n')
+    assert entries[1].end == len(data)
+    assert errors == [(3, 'broken', "Line does not start with \\NomenclaturEntry")]
+
+  (tmp_path / 'empty.tex').write_bytes(b'')
+  assert list(iter_entries(tmp_path / 'empty.tex', use_mmap=True)) == []
@@ -0,0 +1,50 @@
+from pathlib import Path
+
+import pytest
+
+from models import GlossaryManager
+from parse_cache import fingerprint, read_cache, write_cache
+
+
+def _glossary_dir(tmp_path: Path, content: str) -> Path:
+  (tmp_path / 'nomenclature.tex').write_text(content)
+  (tmp_path / 'def_vars.tex').write_text('')
+  (tmp_path / 'macros.tex').write_text('')
+  return tmp_path
+
+
+def test_cache_round_trip_and_staleness(tmp_path: Path):
+  source_path = _glossary_dir(tmp_path, "\\NomenclaturEntry{T}{T}{temperature}{T}\n") / 'nomenclature.tex'
+  cache_path = tmp_path / '.nomenclature.cache'
+  entries = {'T': {'symbol': 'T', 'description': 'temperature', 'sort_key': 'T'}}
+  source = fingerprint(source_path)
+
+  assert read_cache(cache_path, source) is None
+  assert write_cache(cache_path, source, entries)
+  assert read_cache(cache_path, source) == entries
+
+  source_path.write_text("\\NomenclaturEntry{P}{p}{pressure}{P}\n")
+  assert read_cache(cache_path, fingerprint(source_path)) is None
+
+  cache_path.write_bytes(cache_path.read_bytes()[:-3])
+  with pytest.raises(ValueError):
+    read_cache(cache_path, source)
+
+
+def test_load_uses_cache_and_recovers_from_corruption(tmp_path: Path):
+  _glossary_dir(tmp_path, "\\NomenclaturEntry{T}{T}{temperature}{T}\n")
+  cache_path = tmp_path / '.nomenclature.cache'
+
+  manager = GlossaryManager(tmp_path)
+  assert manager.load()
+  assert cache_path.exists()
+
+  warm = GlossaryManager(tmp_path)
+  assert warm.load()
+  assert warm.entries == manager.entries
+
+  cache_path.write_bytes(b'garbage')
+  recovered = GlossaryManager(tmp_path)
+  assert recovered.load()
+  assert recovered.entries == manager.entries
+  assert read_cache(cache_path, fingerprint(tmp_path / 'nomenclature.tex')) == manager.entries
@@ -0,0 +1,63 @@
+from pathlib import Path
+
+from models import GlossaryManager
+from save_scheduler import SaveScheduler
+
+
+class CountingGlossary(GlossaryManager):
+  def __init__(self, base_dir):
+    super().__init__(base_dir)
+    self.saves = 0
+
+  def save(self, durable: bool = False) -> bool:
+    self.saves += 1
+    return super().save(durable)
+
+
+def test_requests_are_coalesced_and_flushed_atomically(tmp_path: Path):
+  glossary = CountingGlossary(tmp_path)
+  saver = SaveScheduler(glossary, delay=60)
+  for i in range(20):
+    glossary.set_entry(f"x{i}", f"x_{i}", f"variable {i}", f"x{i}")
+    saver.request()
+  assert saver.pending
+
+  assert saver.flush(timeout=10)
+  assert glossary.saves == 1
+  assert not saver.pending
+  assert len((tmp_path / 'nomenclature.tex').read_text().splitlines()) == 20
+  assert not list(tmp_path.glob('.*.tmp'))
+
+  glossary.delete_entry('x0')
+  saver.request()
+  assert saver.shutdown(timeout=10)
+  assert glossary.saves == 2
+  assert 'x0' not in (tmp_path / 'def_vars.tex').read_text()
+
+
+class FailingGlossary(GlossaryManager):
+  def __init__(self, base_dir):
+    super().__init__(base_dir)
+    self.failing = True
+
+  def _write_files(self, rendered, durable):
+    if self.failing:
+      raise OSError("disk full")
+    return super()._write_files(rendered, durable)
+
+
+def test_changes_of_a_failed_save_are_not_reported_saved(tmp_path: Path):
+  glossary = FailingGlossary(tmp_path)
+  failures = []
+  saver = SaveScheduler(glossary, delay=60, on_error=lambda: failures.append(1))
+  glossary.set_entry('x', 'x', 'x', 'x')
+  saver.request()
+  assert not saver.shutdown(timeout=10)
+  assert failures and glossary.is_dirty
+
+  # A new scheduler, as after refusing to close, knows nothing was requested
+  saver = SaveScheduler(glossary, delay=60)
+  assert not saver.flush(timeout=10)
+  glossary.failing = False
+  assert saver.shutdown(timeout=10) and not glossary.is_dirty
+  assert '{x}' in (tmp_path / 'nomenclature.tex').read_text()
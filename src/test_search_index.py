@@ -0,0 +1,22 @@
+from search_index import SubstringIndex
+
+
+def test_search_matches_linear_scan_while_typing():
+  keys = ['temperature', 'qTemp', 'pressure', 'Tau', 'ZETA', 'beta2', 'alpha12']
+  index = SubstringIndex(keys)
+  for query in ['', 't', 'te', 'tem', 'temp', 'TEMP', 'e', 'a1', 'a12', 'xyz', 'ta', 'z']:
+    assert index.search(query) == [row for row, key in enumerate(keys) if query.lower() in key.lower()]
+
+
+def test_dense_and_sparse_paths_agree():
+  keys = [f"key{i}" for i in range(200)]
+  index = SubstringIndex(keys)
+  assert index.search('key') == list(range(200))  # dense: plain pass
+  index = SubstringIndex(keys)
+  assert index.search('y19') == [19] + list(range(190, 200))  # sparse: jumps
+
+
+def test_search_turns_dense_part_way():
+  keys = [f"other{i}" for i in range(500)] + [f"key{i}" for i in range(500)] + ['monkey']
+  assert SubstringIndex(keys).search('key') == list(range(500, 1001))
+  assert SubstringIndex(keys).search('r1') == [row for row, key in enumerate(keys) if 'r1' in key]
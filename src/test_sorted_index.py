@@ -0,0 +1,36 @@
+import random
+
+from sorted_index import SortedKeyIndex
+
+
+def test_index_stays_sorted_under_updates(monkeypatch):
+  monkeypatch.setattr(SortedKeyIndex, 'BUCKET_SIZE', 4)  # exercise bucket splits
+  rng = random.Random(1)
+  keys = [f"k{rng.randrange(500)}" for _ in range(300)]
+  index = SortedKeyIndex(keys[:50])
+  reference = set(keys[:50])
+  for key in keys[50:]:
+    assert index.add(key) == (key not in reference)
+    reference.add(key)
+  for key in keys[::3]:
+    assert index.discard(key) == (key in reference)
+    reference.discard(key)
+
+  assert list(index) == sorted(reference)
+  assert len(index) == len(reference)
+  assert all(key in index for key in reference) and 'missing' not in index
+  assert index.first() == min(reference)
+  assert list(index.irange('k2', 'k3')) == sorted(k for k in reference if 'k2' <= k < 'k3')
+  assert list(index.irange(None, 'k1')) == sorted(k for k in reference if k < 'k1')
+  assert list(index.prefixed('k12')) == sorted(k for k in reference if k.startswith('k12'))
+
+
+def test_version_counts_only_real_changes():
+  index = SortedKeyIndex(['a', 'b'])
+  assert index.version == 0
+  index.add('a')
+  index.discard('missing')
+  assert index.version == 0
+  index.add('c')
+  index.discard('a')
+  assert index.version == 2
@@ -0,0 +1,35 @@
+from pathlib import Path
+
+from models import GlossaryManager
+from symbol_index import DuplicateIndex, normalize_description, normalize_symbol
+
+
+def test_spellings_that_render_alike_are_equal():
+  assert normalize_symbol('\\hat {T}') == normalize_symbol('\\hat T') == normalize_symbol('{\\hat{T}}') == '\\hat T'
+  assert normalize_symbol('\\frac{a}{b_{1}}') == '\\frac a{b_1}'
+  assert normalize_symbol('\\alpha b') != normalize_symbol('\\alphab')
+  assert normalize_symbol('T^{ab}') != normalize_symbol('T^ab')
+  assert normalize_description('  Heat  Flow') == normalize_description('heat flow')
+
+
+def test_duplicates_follow_every_change():
+  index = DuplicateIndex({'a': {'symbol': 'T', 'description': 'x'}, 'b': {'symbol': '{T}', 'description': 'y'}})
+  assert index.duplicates() == ({'T': ['a', 'b']}, {})
+  assert index.with_symbol(' T', exclude=['a']) == ['b']
+  index.set('b', {'symbol': 'p', 'description': 'X'})
+  assert index.duplicates() == ({}, {'x': ['a', 'b']})
+  index.remove('a')
+  assert index.duplicates() == ({}, {}) and index.with_description('x') == ['b']
+
+
+def test_glossary_keeps_its_index_up_to_date(tmp_path: Path):
+  glossary = GlossaryManager(tmp_path)
+  glossary.set_entry('temperature', 'T', 'temperature', 'T')
+  assert glossary.duplicate_index.with_symbol('T') == ['temperature']
+  glossary.set_entry('theta', 'T', 'angle', 't')
+  assert glossary.duplicate_index.duplicates()[0] == {'T': ['temperature', 'theta']}
+  glossary.set_entry('theta', '\\theta', 'angle', 't')
+  glossary.delete_entry('temperature')
+  assert glossary.duplicate_index.with_symbol('T') == []
+  glossary.mark_dirty()
+  assert glossary.duplicate_index.with_symbol('\\theta') == ['theta']
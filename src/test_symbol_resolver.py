@@ -0,0 +1,34 @@
+from macro_graph import MacroGraph
+from symbol_resolver import SymbolResolver
+
+
+def _resolver(**symbols):
+  entries = {name: {'symbol': symbol, 'description': name, 'sort_key': name} for name, symbol in symbols.items()}
+  return entries, SymbolResolver(entries, MacroGraph(entries))
+
+
+def test_expansions_are_remembered_and_invalidated_for_dependents_only():
+  entries, resolver = _resolver(temperature='T', qTemp=r'\temperature^2', flux=r'\hat{q}',
+                                ratio=r'\qTemp/\flux', pressure='p')
+  assert resolver.expand('qTemp') == 'T^2'
+  assert resolver.expand_all(entries) == {'temperature': 'T', 'qTemp': 'T^2', 'flux': r'\hat{q}',
+                                          'ratio': r'{T^2}/{\hat{q}}', 'pressure': 'p'}
+  assert len(resolver) == 5
+
+  entries['temperature']['symbol'] = r'\theta'
+  resolver.graph.set('temperature', r'\theta')
+  resolver.invalidate('temperature')
+  assert len(resolver) == 2  # flux and pressure are kept
+  assert resolver.expand('ratio') == r'{\theta^2}/{\hat{q}}'
+
+
+def test_recursion_is_cut_at_the_recurring_macro():
+  entries, resolver = _resolver(a=r'\b+1', b=r'\a', c=r'\b')
+  assert resolver.expand('a') == r'\a+1'
+  assert resolver.expand('c') == r'{\b+1}'
+  assert len(resolver) == 0  # partial expansions are not remembered
+
+  entries, resolver = _resolver(x='ab', y=r'\x\x', z=r'\y\y')
+  resolver.MAX_LENGTH = 10
+  assert resolver.expand('y') == '{ab}{ab}'
+  assert resolver.expand('z') == r'\y\y'
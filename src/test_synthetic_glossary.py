@@ -0,0 +1,23 @@
+import re
+
+from models import GlossaryManager
+from synthetic_glossary import generate_entries, write_glossary
+
+
+def test_generated_entries_are_valid_and_acyclic():
+  entries = generate_entries(500, seed=3)
+  assert entries == generate_entries(500, seed=3)
+  names = list(entries)
+  for position, (hash_name, entry) in enumerate(entries.items()):
+    assert re.fullmatch(r'[a-zA-Z][a-zA-Z0-9]*', hash_name)
+    for reference in re.findall(r'\\([a-zA-Z][a-zA-Z0-9]*)', entry['symbol']):
+      assert reference not in entries or names.index(reference) < position
+  assert any('{' in entry['symbol'] for entry in entries.values())
+  assert any(entry['symbol'].lstrip('\\').split('^')[0] in entries for entry in entries.values())
+
+
+def test_written_glossary_loads_back(tmp_path):
+  write_glossary(tmp_path, 200)
+  manager = GlossaryManager(tmp_path)
+  assert manager.load(use_cache=False)
+  assert dict(manager.entries) == generate_entries(200)
@@ -0,0 +1,34 @@
+from pathlib import Path
+
+from models import GlossaryManager
+from usage_scanner import scan_glossary_usage, scan_usage
+
+
+def test_uses_are_counted_with_locations_and_typos(tmp_path: Path):
+  chapters = tmp_path / 'chapters'
+  chapters.mkdir()
+  (chapters / 'one.tex').write_text("\\section{Heat}\n$\\temperature + \\qTemp$ % \\pressure\n"
+                                    "\\temperatureMax is not \\temperature\n")
+  (chapters / 'two.tex').write_text("$\\qTmp = \\hat{\\temperature}$ costs 5\\%\\qTemp\n")
+  (tmp_path / 'notes.txt').write_text("\\pressure\n")
+
+  names = ['temperature', 'qTemp', 'pressure']
+  for workers in (1, 2):
+    report = scan_usage(names, [tmp_path], max_workers=workers)
+    assert report.files == 2 and not report.errors
+    assert report.locations == {
+            'temperature': [(str(chapters / 'one.tex'), 2), (str(chapters / 'one.tex'), 3),
+                            (str(chapters / 'two.tex'), 1)],
+            'qTemp'      : [(str(chapters / 'one.tex'), 2), (str(chapters / 'two.tex'), 1)],
+            }
+    assert report.counts() == {'temperature': 3, 'qTemp': 2}
+    assert report.unused(names) == ['pressure']
+    assert report.suspected_typos(names) == {'qTmp': ['qTemp']}
+
+
+def test_glossary_files_are_not_counted(tmp_path: Path):
+  glossary = GlossaryManager(tmp_path)
+  glossary.set_entry('temperature', 'T', 'temperature', 'T')
+  assert glossary.save()
+  (tmp_path / 'thesis.tex').write_text("\\temperature\n")
+  assert scan_glossary_usage(glossary, [tmp_path]).counts() == {'temperature': 1}
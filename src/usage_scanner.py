@@ -0,0 +1,168 @@
+"""
+Find where the macros of a glossary are used in the .tex files of a document.
+"""
+import re
+import string
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple, Union
+
+from macro_graph import LATEX_COMMANDS, MACRO_REFERENCE
+from models import GlossaryManager
+
+# A comment runs from an unescaped % to the end of the line
+_COMMENT = re.compile(r'(?<!\\)%.*')
+_NAME_CHARACTERS = string.ascii_letters + string.digits
+# Shorter unknown macros are too close to too many hash names to suggest one
+MIN_TYPO_LENGTH = 4
+
+# Line numbers of the glossary macros used in one file, and counts of the other macros
+_FileUsage = Tuple[Dict[str, List[int]], Dict[str, int]]
+
+
+@dataclass
+class UsageReport:
+  # hash name -> (file, line number) of every use, in file order
+  locations: Dict[str, List[Tuple[str, int]]] = field(default_factory=dict)
+  # macros used that are neither glossary entries nor known LaTeX commands
+  unknown: Counter = field(default_factory=Counter)
+  files: int = 0
+  errors: List[Tuple[str, str]] = field(default_factory=list)  # (file, reason) of unreadable files
+
+  def counts(self) -> Dict[str, int]:
+    """Return the number of uses of every used entry."""
+    return {hash_name: len(uses) for hash_name, uses in self.locations.items()}
+
+  def unused(self, hash_names: Iterable[str]) -> List[str]:
+    """Return the entries among ``hash_names`` that are never used."""
+    return sorted(set(hash_names) - self.locations.keys())
+
+  def suspected_typos(self, hash_names: Iterable[str]) -> Dict[str, List[str]]:
+    """Return the unknown macros one edit away from an entry, with those entries."""
+    names = frozenset(hash_names)
+    typos = {}
+    for macro in sorted(self.unknown):
+      if len(macro) >= MIN_TYPO_LENGTH:
+        candidates = sorted(names.intersection(_one_edit_variants(macro)))
+        if candidates:
+          typos[macro] = candidates
+    return typos
+
+  def _merge(self, path: str, usage: _FileUsage) -> None:
+    used, unknown = usage
+    for hash_name, numbers in used.items():
+      self.locations.setdefault(hash_name, []).extend((path, number) for number in numbers)
+    self.unknown.update(unknown)
+    self.files += 1
+
+
+def _one_edit_variants(word: str) -> Iterator[str]:
+  """Every name reached from ``word`` by deleting, replacing or inserting one character."""
+  for i in range(len(word) + 1):
+    head, tail = word[:i], word[i:]
+    if tail:
+      yield head + tail[1:]
+    for char in _NAME_CHARACTERS:
+      if tail:
+        yield head + char + tail[1:]
+      yield head + char + tail
+
+
+def scan_file(path: Union[str, Path], hash_names: FrozenSet[str]) -> _FileUsage:
+  """Find the glossary macros used in one file, reading it line by line.
+
+  Every control word is looked up in ``hash_names`` as it is found, so all
+  entries are matched in a single pass whatever their number, and
+  ``\\temperature`` never matches inside ``\\temperatureMax``. Comments are
+  skipped.
+
+  Returns:
+      The line numbers where each entry is used, and the number of uses of
+      every other macro that is not a known LaTeX command
+  """
+  used: Dict[str, List[int]] = {}
+  unknown: Counter = Counter()
+  with open(path, encoding='utf-8', errors='replace') as f:
+    for number, line in enumerate(f, 1):
+      if '\\' not in line:
+        continue
+      if '%' in line:
+        line = _COMMENT.sub('', line)
+      for name in MACRO_REFERENCE.findall(line):
+        if name in hash_names:
+          used.setdefault(name, []).append(number)
+        elif name not in LATEX_COMMANDS:
+          unknown[name] += 1
+  return used, unknown
+
+
+# The hash names in a worker process, sent once by the pool initializer
+_worker_names: FrozenSet[str] = frozenset()
+
+
+def _init_worker(hash_names: FrozenSet[str]) -> None:
+  global _worker_names
+  _worker_names = hash_names
+
+
+def _scan_in_worker(path: str) -> _FileUsage:
+  return scan_file(path, _worker_names)
+
+
+def find_tex_files(paths: Iterable[Union[str, Path]], exclude: Iterable[Union[str, Path]] = ()) -> List[Path]:
+  """Return the given .tex files and those found below the given directories, sorted."""
+  excluded = {Path(path).resolve() for path in exclude}
+  found = set()
+  for path in map(Path, paths):
+    candidates = path.rglob('*.tex') if path.is_dir() else [path]
+    found.update(candidate for candidate in candidates if candidate.resolve() not in excluded)
+  return sorted(found)
+
+
+def scan_usage(hash_names: Iterable[str], paths: Iterable[Union[str, Path]],
+               max_workers: Optional[int] = None, exclude: Iterable[Union[str, Path]] = ()) -> UsageReport:
+  """Find where the entries ``hash_names`` are used in a set of .tex files.
+
+  Args:
+      hash_names: The entries to look for, e.g. ``GlossaryManager.entries``
+      paths: .tex files, and directories searched for them recursively
+      max_workers: Number of worker processes, default one per CPU; with 1,
+          or a single file, the files are scanned in this process
+      exclude: Files to skip
+
+  Returns:
+      Uses by entry, sorted by file and line
+  """
+  names = frozenset(hash_names)
+  files = [str(path) for path in find_tex_files(paths, exclude)]
+  report = UsageReport()
+
+  if max_workers == 1 or len(files) < 2:
+    for path in files:
+      try:
+        report._merge(path, scan_file(path, names))
+      except OSError as e:
+        report.errors.append((path, str(e)))
+  else:
+    with ProcessPoolExecutor(max_workers, initializer=_init_worker, initargs=(names,)) as pool:
+      futures = {pool.submit(_scan_in_worker, path): path for path in files}
+      for future in as_completed(futures):
+        path = futures[future]
+        try:
+          report._merge(path, future.result())
+        except OSError as e:
+          report.errors.append((path, str(e)))
+
+  for uses in report.locations.values():
+    uses.sort()
+  report.errors.sort()
+  return report
+
+
+def scan_glossary_usage(glossary: GlossaryManager, paths: Iterable[Union[str, Path]],
+                        max_workers: Optional[int] = None) -> UsageReport:
+  """Find where the entries of a glossary are used, skipping the files the glossary writes."""
+  own_files = (glossary.files.nomenclature, glossary.files.def_vars, glossary.files.macros)
+  return scan_usage(glossary.entries, paths, max_workers, exclude=own_files)